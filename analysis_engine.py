@@ -14,7 +14,8 @@ Original file is located at
 
 import os
 import json
-from urllib.parse import urlparse
+import queue
+import re
 
 # --- Configuration ---
 # Make sure you have authenticated with Google Cloud CLI and set your project:
@@ -24,23 +25,30 @@ from urllib.parse import urlparse
 # You can find your Project ID in the Google Cloud Console dashboard.
 # gcloud config set project YOUR_PROJECT_ID
 
-PROJECT_ID = "echo-mind-472808"
-
-LOCATION = "asia-south1"  # Mumbai, India - Better for Indian context and reduced latency
-
-from google.cloud import aiplatform
-import vertexai
-from vertexai.generative_models import GenerativeModel
-from google.cloud import bigquery
-import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime
 
-aiplatform.init(project=PROJECT_ID, location=LOCATION)
-vertexai.init(project=PROJECT_ID, location=LOCATION)
-
-print(f"✅ Vertex AI initialized for project: {PROJECT_ID}")
+from claim_cache import get_claim_cache, make_cache_key
+from claim_similarity import find_similar_claim
+# Vertex AI / BigQuery clients are created lazily, once per process (see clients.py)
+from clients import GEMINI_MODEL
+from context_store import get_context_store
+from database_helper import UNSTORED_VERDICTS
+from evidence_store import get_evidence_store
+import keyword_matcher
+from keyword_matcher import first_match, get_keyword_matcher
+from metrics import FALLBACKS, MODEL_PARSE_FAILURES, MODEL_RESPONSE_REPAIRS, span
+import resilience
+from prompt_builder import PROMPT_VERSION, build_batch_prompt, build_claim_prompt, get_analysis_model
+from response_parser import (
+    JsonFieldStream, JsonValueScanner, extract_json, generation_config, is_analysis, parse_analysis, parse_batch
+)
+from topic_keywords import CATEGORIES, SEARCH_TOPIC_KEYWORDS
+from text_utils import claim_hash
+from write_behind import get_write_behind, shutdown_write_behind
 
-GEMINI_MODEL = "gemini-2.5-pro" # Using Gemini 2.5 Pro for enhanced fact-checking capabilities
 TRUSTED_DOMAINS = [
     # Major Indian Sources
     "thehindu.com", "indiatoday.in", "timesofindia.indiatimes.com", "indianexpress.com", 
@@ -52,15 +60,9 @@ TRUSTED_DOMAINS = [
 def load_current_context():
     """
     Load current context from auto-updater system
+    (parsed once and reloaded only when the file changes)
     """
-    try:
-        import json
-        if os.path.exists('current_context.json'):
-            with open('current_context.json', 'r') as f:
-                return json.load(f)
-    except Exception as e:
-        print(f"Warning: Could not load current context: {e}")
-    return {}
+    return get_context_store().get()
 
 def get_current_date_info():
     """
@@ -81,9 +83,14 @@ def search_current_info(query, max_results=3):
     Search for current information using auto-updater context and fallback methods.
     This provides recent context for political and time-sensitive claims.
     """
+    with span("current_info"):
+        return _search_current_info(query, max_results)
+
+def _search_current_info(query, max_results=3):
     try:
         # Load current context from auto-updater
-        current_context = load_current_context()
+        context = get_context_store().snapshot()
+        current_context = context.data
         current_info = []
         
         # Add current date information
@@ -91,105 +98,83 @@ def search_current_info(query, max_results=3):
         current_info.append(f"Current Date: {date_info['current_date']} ({date_info['day_of_week']})")
         
         # For ALL topics, provide context from auto-updater or fallback
-        # Comprehensive topic detection
-        topic_keywords = {
-            'politics': ['cm', 'chief minister', 'prime minister', 'president', 'election', 'government', 'minister', 'parliament', 'assembly'],
-            'health': ['covid', 'vaccine', 'health', 'medical', 'disease', 'treatment', 'hospital', 'doctor', 'medicine', 'healthcare'],
-            'science': ['research', 'study', 'scientist', 'discovery', 'experiment', 'technology', 'innovation', 'space', 'climate change'],
-            'technology': ['tech', 'software', 'app', 'internet', 'cyber', 'data', 'ai', 'artificial intelligence', 'smartphone', 'computer'],
-            'business': ['stock', 'market', 'economy', 'finance', 'investment', 'banking', 'company', 'startup', 'industry'],
-            'sports': ['cricket', 'football', 'hockey', 'tennis', 'olympics', 'ipl', 'fifa', 'world cup', 'player', 'match'],
-            'entertainment': ['movie', 'film', 'bollywood', 'actor', 'actress', 'music', 'netflix', 'celebrity', 'award'],
-            'education': ['school', 'college', 'university', 'student', 'exam', 'jee', 'neet', 'upsc', 'degree']
-        }
-        
-        # Detect query topic
-        query_topic = 'general'
-        for topic, keywords in topic_keywords.items():
-            if any(keyword in query.lower() for keyword in keywords):
-                query_topic = topic
-                break
-        
-        # Get comprehensive updates from auto-updater
-        comprehensive_updates = current_context.get('comprehensive_updates', {})
-        categorized_updates = current_context.get('categorized_updates', {})
+        # Comprehensive topic detection (one pass over the shared keyword automaton)
+        topic_hits = get_keyword_matcher().scan(query, namespace=keyword_matcher.SEARCH_TOPIC)
+        query_topic = first_match(topic_hits, SEARCH_TOPIC_KEYWORDS)
         
-        if query_topic != 'general' or any(any(keyword in query.lower() for keyword in keywords) for keywords in topic_keywords.values()):
+        if query_topic != 'general':
             # Handle topic-specific information
             query_lower = query.lower()
             
             # Add topic-specific context
             current_info.append(f"Query Topic Detected: {query_topic.title()}")
             
-            # Get relevant updates for the detected topic
-            topic_updates = categorized_updates.get(query_topic, {})
+            # Get relevant updates for the detected topic (pre-sorted newest first)
+            topic_updates = context.updates_by_category.get(query_topic, [])
             if topic_updates:
                 current_info.append(f"Recent {query_topic.title()} Updates Available: {len(topic_updates)} items")
                 # Add most recent updates (limit to 3 most recent)
-                sorted_updates = sorted(topic_updates.items(), 
-                                      key=lambda x: x[1].get('date', ''), reverse=True)
-                for key, update in sorted_updates[:3]:
+                for update in topic_updates[:3]:
                     current_info.append(f"• {update['title']} - {update['source']} ({update['date'][:10]})")
             
             # Special handling for specific topics
             if query_topic == 'politics':
                 # Political-specific logic (keep existing detailed political handling)
-                political_updates = {k: v for k, v in comprehensive_updates.items() 
-                                   if v.get('category') == 'politics' or v.get('type', '').endswith('_update')}
+                political_updates = context.political_updates
                 
                 # Look for state-specific updates
-            indian_states = {
-                'andhra pradesh': ('Chandrababu Naidu', 'TDP', 'June 2024'),
-                'telangana': ('A. Revanth Reddy', 'Congress', 'December 2023'),
-                'karnataka': ('Siddaramaiah', 'Congress', '2023'),
-                'tamil nadu': ('M.K. Stalin', 'DMK', '2021'),
-                'kerala': ('Pinarayi Vijayan', 'CPI(M)', '2021'),
-                'maharashtra': ('Eknath Shinde', 'Shiv Sena', '2022'),
-                'west bengal': ('Mamata Banerjee', 'AITC', '2011'),
-                'uttar pradesh': ('Yogi Adityanath', 'BJP', '2017'),
-                'gujarat': ('Bhupendra Patel', 'BJP', '2021'),
-                'rajasthan': ('Ashok Gehlot', 'Congress', '2018')
-            }
+                indian_states = {
+                    'andhra pradesh': ('Chandrababu Naidu', 'TDP', 'June 2024'),
+                    'telangana': ('A. Revanth Reddy', 'Congress', 'December 2023'),
+                    'karnataka': ('Siddaramaiah', 'Congress', '2023'),
+                    'tamil nadu': ('M.K. Stalin', 'DMK', '2021'),
+                    'kerala': ('Pinarayi Vijayan', 'CPI(M)', '2021'),
+                    'maharashtra': ('Eknath Shinde', 'Shiv Sena', '2022'),
+                    'west bengal': ('Mamata Banerjee', 'AITC', '2011'),
+                    'uttar pradesh': ('Yogi Adityanath', 'BJP', '2017'),
+                    'gujarat': ('Bhupendra Patel', 'BJP', '2021'),
+                    'rajasthan': ('Ashok Gehlot', 'Congress', '2018')
+                }
+            
+                # Look for state-specific updates
+                for state, (cm_name, party, since) in indian_states.items():
+                    if state in query_lower and ('cm' in query_lower or 'chief minister' in query_lower):
+                        state_key = state.replace(' ', '_') + '_cm'
+                        if state_key in political_updates:
+                            update = political_updates[state_key]
+                            current_info.append(f"Latest News: {update['title']} - {update['source']} ({update['date'][:10]})")
+                            if update.get('state'):
+                                current_info.append(f"State: {update['state']}")
+                        else:
+                            # Fallback to known information
+                            current_info.append(f"Current CM of {state.title()}: {cm_name} ({party}) since {since}")
+                            current_info.append(f"Note: Please verify current status as political information changes frequently")
+                        break
             
-            # Look for state-specific updates
-            for state, (cm_name, party, since) in indian_states.items():
-                if state in query_lower and ('cm' in query_lower or 'chief minister' in query_lower):
-                    state_key = state.replace(' ', '_') + '_cm'
-                    if state_key in political_updates:
-                        update = political_updates[state_key]
+                # Check for PM updates
+                if 'prime minister' in query_lower or ' pm ' in query_lower:
+                    if 'prime_minister' in political_updates:
+                        update = political_updates['prime_minister']
                         current_info.append(f"Latest News: {update['title']} - {update['source']} ({update['date'][:10]})")
-                        if update.get('state'):
-                            current_info.append(f"State: {update['state']}")
                     else:
-                        # Fallback to known information
-                        current_info.append(f"Current CM of {state.title()}: {cm_name} ({party}) since {since}")
-                        current_info.append(f"Note: Please verify current status as political information changes frequently")
-                    break
-            
-            # Check for PM updates
-            if 'prime minister' in query_lower or ' pm ' in query_lower:
-                if 'prime_minister' in political_updates:
-                    update = political_updates['prime_minister']
-                    current_info.append(f"Latest News: {update['title']} - {update['source']} ({update['date'][:10]})")
-                else:
-                    current_info.append("Current PM: Narendra Modi (BJP) since 2014 - verify for any recent changes")
+                        current_info.append("Current PM: Narendra Modi (BJP) since 2014 - verify for any recent changes")
             
-            # Check for election updates
-            if any(term in query_lower for term in ['election', 'vote', 'poll', 'ballot']):
-                election_updates = {k: v for k, v in political_updates.items() if 'election' in k}
-                if election_updates:
-                    for election_type, update in election_updates.items():
-                        current_info.append(f"Election Update: {update['title']} - {update['source']} ({update['date'][:10]})")
+                # Check for election updates
+                if any(term in query_lower for term in ['election', 'vote', 'poll', 'ballot']):
+                    election_updates = {k: v for k, v in political_updates.items() if 'election' in k}
+                    if election_updates:
+                        for election_type, update in election_updates.items():
+                            current_info.append(f"Election Update: {update['title']} - {update['source']} ({update['date'][:10]})")
             
-            # Check for party updates
-            major_parties = ['bjp', 'congress', 'aap', 'brs', 'tdp', 'ysrcp', 'dmk', 'aiadmk']
-            for party in major_parties:
-                if party in query_lower:
-                    party_key = f'{party}_update'
-                    if party_key in political_updates:
-                        update = political_updates[party_key]
-                        current_info.append(f"{party.upper()} Update: {update['title']} - {update['source']} ({update['date'][:10]})")
-                    break
+                # Check for party updates
+                major_parties = ['bjp', 'congress', 'aap', 'brs', 'tdp', 'ysrcp', 'dmk', 'aiadmk']
+                for party in major_parties:
+                    if party in query_lower:
+                        party_key = f'{party}_update'
+                        if party_key in political_updates:
+                            update = political_updates[party_key]
+                            current_info.append(f"{party.upper()} Update: {update['title']} - {update['source']} ({update['date'][:10]})")
+                        break
             
             elif query_topic == 'health':
                 # Health-specific guidance
@@ -236,7 +221,7 @@ def search_current_info(query, max_results=3):
         # Add information about data freshness
         if current_context.get('last_updated'):
             last_updated = current_context['last_updated'][:10]  # Just date part
-            current_info.append(f"Data last updated: {last_updated} from {len(current_context.get('trusted_sources', []))} trusted sources")
+            current_info.append(f"Data last updated: {last_updated} from {context.trusted_source_count} trusted sources")
         
         # For non-political or when no specific updates found
         if len(current_info) <= 1:  # Only date info
@@ -252,95 +237,194 @@ def search_current_info(query, max_results=3):
         print(f"Current info search error: {e}")
         return ["Unable to fetch current information - verify with recent reliable sources"]
 
-def misinformation_detector_and_explainer(text):
-    if not text or text.strip() == "":
-        return {"classification": "NoText", "explanation": "No explanation (empty input).", "score": 0, "tips": []}
+# Claims per model call in batch analysis
+BATCH_PROMPT_SIZE = int(os.environ.get('ECHO_MIND_BATCH_PROMPT_SIZE', 8))
+# Extra model calls when a single-claim response has no usable analysis
+MODEL_PARSE_RETRIES = int(os.environ.get('ECHO_MIND_MODEL_PARSE_RETRIES', 1))
 
-    # Get current context for enhanced AI analysis
+def build_context_info():
+    """Builds the dynamic CURRENT CONTEXT line for model prompts"""
     current_context = load_current_context()
     date_info = get_current_date_info()
     
-    # Build dynamic context string
     context_info = f"Today's Date: {date_info['current_date']} ({date_info['day_of_week']})"
     if current_context.get('last_updated'):
         context_info += f" | Last Data Update: {current_context['last_updated'][:10]}"
     if current_context.get('trusted_sources'):
         sources_count = len(current_context.get('trusted_sources', []))
         context_info += f" | {sources_count} trusted sources monitored"
-    
-    model = GenerativeModel(GEMINI_MODEL)
-    prompt = f"""
-You are an expert fact-checking assistant with comprehensive knowledge across multiple domains. Your job is to provide accurate, detailed analysis of claims with special attention to current events and recent political changes.
-
-CURRENT CONTEXT:
-{context_info}
-
-CRITICAL CONTEXT FOR CURRENT CLAIMS:
-- ALWAYS verify political office holders against the most recent information
-- My knowledge cutoff is around April 2024, so I may not have information about very recent events
-- FOCUS ON INDIAN CONTEXT: Prioritize Indian political, social, and cultural context in analysis
-- Indian Politics Update (2024): Chandrababu Naidu (TDP) is the current CM of Andhra Pradesh since June 2024, NOT Jagan Mohan Reddy
-- For any political claims about "current" office holders, double-check against recent election results
-- Pay special attention to time-sensitive information that may have changed recently
-- For claims about events after April 2024, acknowledge knowledge limitations and suggest verification
-- Indian Regional Context: Consider state-specific politics, languages, cultures, and current affairs
-- Trusted Indian Sources: The Hindu, India Today, Times of India, Indian Express, NDTV, etc.
-
-ANALYSIS INSTRUCTIONS:
-1. Carefully examine the claim for factual accuracy, especially recent political changes
-2. For political claims about current office holders, verify against the most recent information
-3. Consider the context, source credibility, and supporting evidence
-4. Provide a thorough, multi-paragraph explanation (minimum 3-4 sentences)
-5. Include specific details about WHY the claim is classified as it is
-6. Mention any scientific consensus, expert opinions, or reliable sources that support or contradict the claim
-7. If the claim is false or suspicious, explain what makes it problematic and provide the correct current information
-8. If the claim is trustworthy, explain what evidence supports it
-9. For outdated information, clearly state what the current accurate information is
-
-CLASSIFICATION RULES:
-- **Trustworthy**: Factually accurate claims supported by credible sources, scientific consensus, or established facts
-- **Suspicious**: Claims that lack sufficient evidence, are misleading, or contain partial truths mixed with speculation
-- **False**: Claims that are demonstrably incorrect, debunked by experts, contain clear misinformation, OR are outdated political information
-- **SPECIAL**: Political office holder claims must be verified against current (2024) information
-- If the text is from trusted news outlets (BBC, Reuters, The Hindu, NY Times, etc.), lean towards Trustworthy unless the content itself is clearly problematic
-
-Claim to analyze:
-{text}
-
-Provide your response in JSON format with these keys:
-- "classification": one of [Trustworthy, Suspicious, False]
-- "explanation": a detailed, comprehensive explanation (3-5 sentences minimum) that thoroughly explains your reasoning, includes relevant context, provides specific details about why this classification was chosen, and if applicable, states the current correct information
-- "score": confidence score from 0-100 (where 100 means completely certain)
-- "tips": array of 2-4 specific, actionable tips for fact-checking similar claims, especially emphasizing verification of current information for political claims
-
-IMPORTANT: Make the explanation detailed and educational. Don't just state the classification - explain the reasoning, context, provide current accurate information when relevant, and give valuable insights that help users understand the topic better.
-"""
-    response = None
+    return context_info
+
+def parse_model_json(output):
+    """Parses the first JSON value in model output, repairing common formatting defects"""
+    return extract_json(output)[0]
+
+def _response_text(response):
+    # .text raises when the response was blocked or has no text part
     try:
-        response = model.generate_content(prompt)
-        if not response.text:
-            raise ValueError("Model returned an empty response.")
+        return response.text or ""
+    except Exception:
+        return ""
+
+def _generation_kwargs(batch=False):
+    """Structured-output config for generate_content (nothing if disabled)"""
+    config = generation_config(batch)
+    return {"generation_config": config} if config is not None else {}
 
-        output = response.text.strip()
+class GenerationCancelled(Exception):
+    """The caller stopped waiting for a streamed generation"""
 
-        # Clean markdown fences
-        if output.startswith("```json"):
-            output = output[7:].strip()
-        elif output.startswith("```"):
-            output = output[3:].strip()
-        if output.endswith("```"):
-            output = output[:-3].strip()
+def _call_timeout(deadline):
+    """Timeout for one model call: the dependency's own, cut short by the caller's deadline"""
+    if deadline is None:
+        return None
+    return min(resilience.MODEL.timeout, deadline - time.monotonic())
 
-        return json.loads(output)
+def _count_repair(mode, how):
+    if how != "clean":
+        MODEL_RESPONSE_REPAIRS.inc(mode=mode, how=how)
+
+def build_analysis_prompt(text, current_info=None):
+    """Per-request part of a single-claim prompt (the instructions are the model's system instruction)"""
+    return build_claim_prompt(text, build_context_info(), current_info)
+
+def misinformation_detector_and_explainer(text, current_info=None, deadline=None):
+    """
+    One model analysis of the claim, called in the caller's thread. With a
+    deadline (time.monotonic() value), every attempt is cut short so the
+    whole analysis answers by then.
+    """
+    if not text or text.strip() == "":
+        return {"classification": "NoText", "explanation": "No explanation (empty input).", "score": 0, "tips": []}
+
+    model = get_analysis_model()
+    prompt = build_analysis_prompt(text, current_info)
+    error = None
+    # A response without a usable analysis is asked for again (MODEL_PARSE_RETRIES times)
+    for attempt in range(1 + MODEL_PARSE_RETRIES):
+        response = None
+        timeout = _call_timeout(deadline)
+        if timeout is not None and timeout <= 0:
+            print(f"Model call timed out after {MODEL_TIMEOUT:.0f}s")
+            FALLBACKS.inc(kind="model_timeout")
+            return MODEL_TIMEOUT_ANALYSIS
+        try:
+            with span("model_call"):
+                response = resilience.MODEL.call(model.generate_content, prompt, timeout=timeout,
+                                                 **_generation_kwargs())
+            analysis, how = parse_analysis(_response_text(response))
+            _count_repair("single", how)
+            return analysis
+        except Exception as e:
+            error = e
+            if response is None and isinstance(e, resilience.CallTimeoutError) and deadline is not None:
+                print(f"Model call timed out after {MODEL_TIMEOUT:.0f}s")
+                FALLBACKS.inc(kind="model_timeout")
+                return MODEL_TIMEOUT_ANALYSIS
+            if response is None:
+                # Deadline, retries spent or circuit open: let the evidence answer instead
+                print(f"Model call failed: {type(e).__name__}: {e}")
+                return MODEL_UNAVAILABLE_ANALYSIS
+            print(f"Error parsing model response JSON: {e}\nRaw response: {_response_text(response)}")
+            MODEL_PARSE_FAILURES.inc(mode="single")
+            if attempt < MODEL_PARSE_RETRIES:
+                FALLBACKS.inc(kind="parse_retry")
+    return {"classification": "Error", "explanation": f"Failed to parse model response: {error}", "score": 0, "tips": []}
+
+def stream_misinformation_detector(text, on_text, cancel_event=None, current_info=None, deadline=None):
+    """
+    misinformation_detector_and_explainer using the streaming generate API.
+    on_text receives each chunk of raw model output as it arrives; the parsed
+    analysis is returned once the JSON object is complete (anything the model
+    adds after it is not waited for).
+    """
+    if not text or text.strip() == "":
+        return {"classification": "NoText", "explanation": "No explanation (empty input).", "score": 0, "tips": []}
+
+    model = get_analysis_model()
+    output = []
+    scanner = JsonValueScanner("{", accept=is_analysis)
+    generated = False
+    # The stream gets the same deadline as a single call, enforced even before its first chunk
+    timeout = _call_timeout(deadline)
+    if timeout is None:
+        timeout = resilience.MODEL.timeout
+    if timeout <= 0:
+        return MODEL_TIMEOUT_ANALYSIS
+    try:
+        with span("model_stream"), resilience.MODEL.guard():
+            for chunk in resilience.stream_with_deadline(
+                    model.generate_content, build_analysis_prompt(text, current_info), stream=True,
+                    deadline=time.monotonic() + timeout, name="model", **_generation_kwargs()):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise GenerationCancelled("generation cancelled")
+                piece = _response_text(chunk)
+                if piece:
+                    output.append(piece)
+                    on_text(piece)
+                    if scanner.feed(piece):
+                        break
+        generated = True
+        analysis, how = parse_analysis("".join(output))
+        _count_repair("stream", how)
+        return analysis
     except Exception as e:
-        raw_response_text = response.text if response and hasattr(response, 'text') else "No response from model."
-        print(f"Error parsing model response JSON: {e}\nRaw response: {raw_response_text}")
+        if not generated:
+            print(f"Streamed model call failed: {type(e).__name__}: {e}")
+            if isinstance(e, resilience.CallTimeoutError):
+                return MODEL_TIMEOUT_ANALYSIS
+            return MODEL_UNAVAILABLE_ANALYSIS
+        print(f"Error parsing streamed model response JSON: {e}\nRaw response: {''.join(output)}")
+        MODEL_PARSE_FAILURES.inc(mode="stream")
+        if MODEL_PARSE_RETRIES and not (cancel_event is not None and cancel_event.is_set()):
+            # The streamed explanation is superseded by the retried analysis in the final result
+            FALLBACKS.inc(kind="parse_retry")
+            return misinformation_detector_and_explainer(text, current_info, deadline)
         return {"classification": "Error", "explanation": f"Failed to parse model response: {e}", "score": 0, "tips": []}
 
-bq_client = bigquery.Client(project=PROJECT_ID)
+def batch_misinformation_detector(texts, current_infos=None, deadline=None):
+    """
+    Analyses several claims with a single model call.
+    Returns one analysis per input text, in order; None where the model's
+    answer for a claim is missing or unusable, MODEL_UNAVAILABLE_ANALYSIS
+    for every claim if the call itself failed.
+    """
+    if not texts:
+        return []
 
-DATASET_ID = "factchecks"
-TABLE_ID = "fact_checks"
+    model = get_analysis_model()
+    prompt = build_batch_prompt(texts, build_context_info(), current_infos)
+    response = None
+    timeout = _call_timeout(deadline)
+    if timeout is not None and timeout <= 0:
+        return [MODEL_TIMEOUT_ANALYSIS] * len(texts)
+    try:
+        with span("model_batch"):
+            response = resilience.MODEL.call(model.generate_content, prompt, timeout=timeout,
+                                             **_generation_kwargs(batch=True))
+        analyses, how = parse_batch(_response_text(response), len(texts))
+        _count_repair("batch", how)
+        missing = analyses.count(None)
+        if missing:
+            MODEL_PARSE_FAILURES.inc(missing, mode="batch_item")
+        return analyses
+    except Exception as e:
+        if response is None:
+            # Single calls would fail the same way; answer every claim from the evidence
+            print(f"Batch model call failed: {type(e).__name__}: {e}")
+            return [MODEL_UNAVAILABLE_ANALYSIS] * len(texts)
+        MODEL_PARSE_FAILURES.inc(mode="batch")
+        print(f"Error parsing batch model response JSON: {e}\nRaw response: {_response_text(response)}")
+        return [None] * len(texts)
+
+def analyze_claim_group(texts, current_infos=None, deadline=None):
+    """Model analyses for a group of claims: one batch call, single calls for any it missed"""
+    current_infos = current_infos or [None] * len(texts)
+    analyses = batch_misinformation_detector(texts, current_infos, deadline) if len(texts) > 1 else [None]
+    return [
+        analysis or misinformation_detector_and_explainer(text, current_info, deadline)
+        for text, analysis, current_info in zip(texts, analyses, current_infos)
+    ]
 
 def extract_key_terms(text):
     """Extract key terms from text for better evidence matching"""
@@ -360,12 +444,19 @@ def extract_key_terms(text):
     priority_terms = []
     regular_terms = []
     
+    # High priority terms: one automaton pass over the joined terms, mapped back by offset
+    joined = ' '.join(key_terms)
+    priority_starts = {
+        start for label, _, start, _ in get_keyword_matcher().finditer(joined)
+        if label == keyword_matcher.PRIORITY
+    }
+    offset = 0
     for term in key_terms:
-        # High priority terms
-        if any(keyword in term for keyword in ['covid', 'vaccine', 'virus', 'disease', 'cancer', 'treatment', 'cure', 'medicine', 'doctor', 'health', 'climate', 'global', 'warming', 'election', 'government', 'president', 'minister', 'policy', 'economy', 'market', 'stock', 'crypto', 'bitcoin']):
+        if any(offset <= start < offset + len(term) for start in priority_starts):
             priority_terms.append(term)
         else:
             regular_terms.append(term)
+        offset += len(term) + 1
     
     # Return priority terms first, then regular terms
     return priority_terms + regular_terms
@@ -393,70 +484,183 @@ def filter_relevant_evidence(query_text, evidence_results):
     
     return relevant_results
 
+# Evidence gathering runs alongside the model call (override with environment variables).
+# Pools are sized for resilience.MAX_CONCURRENCY requests in flight: two lookups
+# (BigQuery and SQLite) and one streamed generation or batch claim group per request.
+EVIDENCE_WORKERS = int(os.environ.get('ECHO_MIND_EVIDENCE_WORKERS', 2 * resilience.MAX_CONCURRENCY))
+MODEL_WORKERS = int(os.environ.get('ECHO_MIND_MODEL_WORKERS', resilience.MAX_CONCURRENCY))
+BATCH_WORKERS = int(os.environ.get('ECHO_MIND_BATCH_WORKERS', resilience.MAX_CONCURRENCY))
+MODEL_TIMEOUT = float(os.environ.get('ECHO_MIND_MODEL_TIMEOUT', 60))
+BIGQUERY_TIMEOUT = float(os.environ.get('ECHO_MIND_BIGQUERY_TIMEOUT', 10))
+SQLITE_TIMEOUT = float(os.environ.get('ECHO_MIND_SQLITE_TIMEOUT', 2))
+# Once the model has answered, how much longer BigQuery evidence is waited for before using SQLite's
+EVIDENCE_GRACE = float(os.environ.get('ECHO_MIND_EVIDENCE_GRACE', 1.0))
+
+# One pool per kind of work, so no pool ever waits on its own tasks:
+#   evidence - BigQuery and SQLite lookups
+#   model    - streamed generations (single calls run in the request's own thread)
+#   batch    - claim groups of /analyze/batch, each making its model calls in turn
+# Calls to Vertex AI and BigQuery themselves run on resilience.py's pool.
+_evidence_executor = ThreadPoolExecutor(max_workers=EVIDENCE_WORKERS, thread_name_prefix="echo-mind-evidence")
+_model_executor = ThreadPoolExecutor(max_workers=MODEL_WORKERS, thread_name_prefix="echo-mind-model")
+_batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="echo-mind-batch")
+
+def bigquery_evidence_batch(texts, top_k=3, timeout=BIGQUERY_TIMEOUT, cancel_event=None):
+    """Searches the BigQuery fact-check table for many texts in one (cached) job; raises on failure"""
+    # Use top 3 key terms of each text
+    term_sets = [extract_key_terms(text or "")[:3] for text in texts]
+    with span("bigquery"):
+        results = get_evidence_store().search(term_sets, top_k, timeout, cancel_event)
+    
+    found = sum(len(r) for r in results)
+    if found:
+        print(f"✅ Found {found} relevant results from BigQuery")
+    return results
+
+def sqlite_evidence_batch(texts, top_k=3):
+    """Searches the local SQLite fact-check database for many texts with relevance filtering"""
+    from database_helper import search_fact_checks_batch
+    with span("sqlite_evidence"):
+        results = [
+            filter_relevant_evidence(text, matches) if matches else []
+            for text, matches in zip(texts, search_fact_checks_batch(texts, top_k))
+        ]
+    
+    found = sum(len(r) for r in results)
+    if found:
+        print(f"✅ Found {found} relevant results from local database")
+    else:
+        print("ℹ️ No relevant fact-checks found in local database")
+    return results
+
+def bigquery_evidence(text, top_k=3, timeout=BIGQUERY_TIMEOUT, cancel_event=None):
+    """Searches the BigQuery fact-check table; raises on failure"""
+    return bigquery_evidence_batch([text], top_k, timeout, cancel_event)[0]
+
+def sqlite_evidence(text, top_k=3):
+    """Searches the local SQLite fact-check database with relevance filtering"""
+    return sqlite_evidence_batch([text], top_k)[0]
+
 def credibility_checker(text, top_k=3):
     """Check credibility using improved search with relevance filtering"""
     if not text or not text.strip():
         return []
     
-    # Extract key terms for better matching
-    key_terms = extract_key_terms(text)
-    
     # First try BigQuery (cloud database) with smarter search
-    try:
-        # Use multiple key terms instead of just first word
-        search_conditions = []
-        params = []
-        
-        for i, term in enumerate(key_terms[:3]):  # Use top 3 key terms
-            search_conditions.append(f"LOWER(claim) LIKE @term{i}")
-            params.append(bigquery.ScalarQueryParameter(f"term{i}", "STRING", f"%{term.lower()}%"))
-        
-        if search_conditions:
-            query = f"""
-            SELECT claim, verdict, source, url, 
-                   CASE 
-                       WHEN {' AND '.join(search_conditions)} THEN 100
-                       WHEN {' OR '.join(search_conditions)} THEN 50
-                       ELSE 10
-                   END as relevance_score
-            FROM `{PROJECT_ID}.{DATASET_ID}.{TABLE_ID}`
-            WHERE {' OR '.join(search_conditions)}
-            ORDER BY relevance_score DESC
-            LIMIT @limit
-            """
-            params.append(bigquery.ScalarQueryParameter("limit", "INT64", top_k))
-            
-            job_config = bigquery.QueryJobConfig(query_parameters=params)
-            rows = bq_client.query(query, job_config=job_config).result()
-            results = [f"{r.claim} — {r.verdict} ({r.source}) {r.url}" for r in rows if r.relevance_score >= 50]
-            
+    if get_evidence_store().uses_bigquery:
+        try:
+            results = bigquery_evidence(text, top_k)
             if results:
-                print(f"✅ Found {len(results)} relevant results from BigQuery")
                 return results
-    except Exception as e:
-        print(f"BigQuery error: {e}. Falling back to local SQLite database.")
+        except Exception as e:
+            print(f"BigQuery error: {e}. Falling back to local SQLite database.")
     
     # Fallback to local SQLite database with improved search
     try:
-        from database_helper import search_fact_checks
-        results = search_fact_checks(text, top_k)
-        
-        # Filter results for relevance
-        if results:
-            relevant_results = filter_relevant_evidence(text, results)
-            if relevant_results:
-                print(f"✅ Found {len(relevant_results)} relevant results from local database")
-                return relevant_results
-            else:
-                print("ℹ️ No relevant matches found - showing generic guidance instead")
-                return []
-        else:
-            print("ℹ️ No matching fact-checks found in local database")
-            return []
+        return sqlite_evidence(text, top_k)
     except Exception as e:
         print(f"SQLite error: {e}")
         return []
 
+class EvidenceLookup:
+    """
+    BigQuery and SQLite evidence lookups for one or more texts, started
+    concurrently in the background as one set-based query per store.
+    Each lookup has its own deadline; a slow BigQuery job is cancelled rather
+    than holding up the response once the model has returned (see `grace`).
+    """
+
+    def __init__(self, texts, top_k=3, bigquery_timeout=BIGQUERY_TIMEOUT, sqlite_timeout=SQLITE_TIMEOUT):
+        self.texts = list(texts)
+        self.started = time.monotonic()
+        self.bigquery_deadline = self.started + bigquery_timeout
+        self.sqlite_deadline = self.started + max(sqlite_timeout, bigquery_timeout)
+        self.cancel_event = threading.Event()
+        self.bigquery = None
+        self.sqlite = None
+        self._results = None
+        self._lock = threading.Lock()
+        if any(text and text.strip() for text in self.texts):
+            # In snapshot mode BigQuery rows are already synced into SQLite
+            if get_evidence_store().uses_bigquery:
+                self.bigquery = _evidence_executor.submit(
+                    bigquery_evidence_batch, self.texts, top_k, bigquery_timeout, self.cancel_event)
+            self.sqlite = _evidence_executor.submit(sqlite_evidence_batch, self.texts, top_k)
+
+    @staticmethod
+    def _wait(future, deadline, label):
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FuturesTimeoutError:
+            print(f"{label} lookup timed out")
+        except Exception as e:
+            print(f"{label} error: {e}")
+        return None
+
+    def add_done_callback(self, fn):
+        """Call fn() whenever one of the lookups finishes (check ready() to see if results are in)"""
+        for future in (self.bigquery, self.sqlite):
+            if future is not None:
+                future.add_done_callback(lambda _: fn())
+
+    def ready(self):
+        """Whether results() would answer without waiting"""
+        if self._results is not None or self.sqlite is None:
+            return True
+        if self.bigquery is not None:
+            if self.bigquery.done():
+                if not self.bigquery.cancelled() and self.bigquery.exception() is None and all(self.bigquery.result()):
+                    return True
+            elif time.monotonic() < self.bigquery_deadline:
+                return False
+        return self.sqlite.done()
+
+    def results(self, grace=None):
+        """
+        Per text: BigQuery results when available in time, otherwise the
+        SQLite fallback. `grace` is for callers that have everything else:
+        BigQuery is then waited for at most that many more seconds.
+        """
+        with self._lock:
+            if self._results is None:
+                self._results = self._collect(grace)
+            return self._results
+
+    def _collect(self, grace):
+        if self.sqlite is None:
+            return [[] for _ in self.texts]
+        if self.bigquery is None:
+            return self._wait(self.sqlite, self.sqlite_deadline, "SQLite") or [[] for _ in self.texts]
+        bigquery_deadline = self.bigquery_deadline
+        if grace is not None:
+            bigquery_deadline = min(bigquery_deadline, time.monotonic() + grace)
+        bigquery_results = self._wait(self.bigquery, bigquery_deadline, "BigQuery")
+        if bigquery_results and all(bigquery_results):
+            self.sqlite.cancel()
+            return bigquery_results
+        self.cancel_event.set()
+        FALLBACKS.inc(kind="sqlite_evidence")
+        print("Falling back to local SQLite database.")
+        sqlite_results = self._wait(self.sqlite, self.sqlite_deadline, "SQLite") or [[] for _ in self.texts]
+        if not bigquery_results:
+            return sqlite_results
+        return [bq or local for bq, local in zip(bigquery_results, sqlite_results)]
+
+    def result(self, grace=None):
+        """Evidence for the first (or only) text"""
+        return self.results(grace)[0]
+
+def evidence_grace(model_analysis):
+    """How long evidence is still worth waiting for once the model has answered (None: full deadline)"""
+    # Without a model verdict the evidence is the answer (see evidence_only_analysis)
+    return None if model_analysis.get("model_unavailable") else EVIDENCE_GRACE
+
+def shutdown(wait=True):
+    """Stops the worker pools, dropping work that hasn't started yet, then drains queued writes"""
+    for executor in (_batch_executor, _model_executor, _evidence_executor):
+        executor.shutdown(wait=wait, cancel_futures=True)
+    shutdown_write_behind()
+
 def educational_insights():
     return [
         "Always verify extraordinary scientific claims with reputable health organizations like the World Health Organization (WHO), CDC, FDA, or national health agencies before accepting them as fact.",
@@ -469,25 +673,11 @@ def educational_insights():
         "Remember that correlation does not imply causation - just because two events happen together doesn't mean one caused the other."
     ]
 
-CATEGORIES = {
-    "health": ["covid", "vaccine", "cure", "disease", "doctor", "medical", "hospital", "medicine", "healthcare", "treatment"],
-    "politics": ["election", "government", "minister", "policy", "parliament", "assembly", "president", "chief minister"],
-    "science": ["research", "study", "scientist", "discovery", "experiment", "climate change", "global warming", "space", "technology"],
-    "technology": ["tech", "software", "app", "internet", "cyber", "ai", "artificial intelligence", "smartphone", "computer", "data"],
-    "business": ["stock", "market", "crypto", "investment", "economy", "finance", "banking", "company", "startup", "industry"],
-    "sports": ["cricket", "football", "hockey", "tennis", "olympics", "ipl", "fifa", "world cup", "player", "match", "tournament"],
-    "entertainment": ["movie", "film", "bollywood", "actor", "actress", "music", "netflix", "celebrity", "award", "cinema"],
-    "education": ["school", "college", "university", "student", "exam", "jee", "neet", "upsc", "degree", "admission"],
-    "social": ["social media", "viral", "trending", "community", "society", "culture", "religion", "festival"]
-}
 
 def categorize_text(text):
     """Categorizes text based on keywords."""
-    text_lower = text.lower()
-    for category, keywords in CATEGORIES.items():
-        if any(k in text_lower for k in keywords):
-            return category
-    return "general"
+    hits = get_keyword_matcher().scan(text, namespace=keyword_matcher.CATEGORY)
+    return first_match(hits, CATEGORIES)
 
 def personalized_tip(category):
     """Returns a personalized tip based on the category."""
@@ -511,28 +701,91 @@ def personalized_tip(category):
         return "Social and cultural claims should be verified through multiple sources, official cultural institutions, and expert anthropologists or sociologists. Be aware of cultural bias, oversimplification of complex social issues, and claims that promote discrimination or stereotypes."
     return "For any claim, examine the original source, look for expert consensus, check publication dates for relevance, and be skeptical of emotionally charged language designed to provoke rather than inform. Always cross-reference with multiple credible sources."
 
-def analyze_claim(text, current_points=0, current_badges=None, save_to_database=True):
+def get_context_version():
+    """Version stamp of the model, prompt and context data, used to invalidate cached results"""
+    return f"{GEMINI_MODEL}:{PROMPT_VERSION}:{get_context_store().snapshot().version}"
+
+def near_duplicate_analysis(match):
+    """Builds a model-style analysis from a stored near-duplicate fact-check"""
+    FALLBACKS.inc(kind="near_duplicate")
+    explanation = match.get("explanation") or "No explanation available."
+    analysis = {
+        "classification": match["verdict"],
+        "explanation": f"This claim closely matches a previously fact-checked claim: \"{match['claim']}\" ({match['source']}). {explanation}",
+        "tips": []
+    }
+    # The stored analysis' own confidence; the similarity is reported in "matched_claim"
+    if match.get("score") is not None:
+        analysis["score"] = match["score"]
+    return analysis
+
+# Points awarded per analysed claim
+POINTS_PER_ANALYSIS = 10
+
+def apply_gamification(current_points=0, current_badges=None):
+    """Returns the user's new points and badges after analysing one more claim"""
+    new_points = current_points + POINTS_PER_ANALYSIS
+    new_badges = list(current_badges or []) # Create a copy to avoid modifying the original list
+    badge_earned = None
+    if new_points >= 50 and "Truth Beginner" not in new_badges:
+        new_badges.append("Truth Beginner")
+        badge_earned = "Truth Beginner"
+    return {
+        "points": new_points,
+        "badges": new_badges,
+        "badge_earned": badge_earned
+    }
+
+# Model outcomes marked model_unavailable are replaced by evidence_only_analysis when there is evidence
+MODEL_TIMEOUT_ANALYSIS = {"classification": "Error", "explanation": "The AI model did not respond in time. Please try again.", "score": 0, "tips": [], "model_unavailable": True}
+MODEL_UNAVAILABLE_ANALYSIS = {"classification": "Error", "explanation": "The AI model is temporarily unavailable. Please try again shortly.", "score": 0, "tips": [], "model_unavailable": True}
+
+# Stored verdict labels (ours and fact-checkers') grouped into our classifications
+_EVIDENCE_VERDICTS = (
+    ("False", re.compile(r"false|fake|hoax|incorrect|misleading|pants on fire|debunked|wrong", re.I)),
+    ("Trustworthy", re.compile(r"true|trustworthy|correct|accurate|verified|real", re.I)),
+)
+_EVIDENCE_LINE = re.compile(r" — (?P<verdict>[^()]+?) \((?P<source>[^()]*)\)(?: \S+)?$")
+
+def evidence_only_analysis(text, evidence=None):
     """
-    Analyzes a claim by checking it with the Gemini model, searching a BigQuery
-    database, and providing educational and personalized feedback. It is a
-    stateless function that takes the current user state and returns the
-    analysis along with the new state.
+    Degraded verdict from database evidence alone, for when the model is
+    unavailable: the majority classification of the matching fact-checks.
+    Looks the evidence up with credibility_checker if none is given; None
+    when nothing matches.
     """
-    if current_badges is None:
-        current_badges = []
+    if evidence is None:
+        evidence = credibility_checker(text)
+    votes = []
+    for line in evidence or []:
+        match = _EVIDENCE_LINE.search(line)
+        if not match:
+            continue
+        label = match.group("verdict")
+        votes.append(next((c for c, pattern in _EVIDENCE_VERDICTS if pattern.search(label)), "Suspicious"))
+    if not votes:
+        return None
+    classification = max(("False", "Suspicious", "Trustworthy"), key=votes.count)
+    agreement = votes.count(classification) / len(votes)
+    FALLBACKS.inc(kind="evidence_only")
+    return {
+        "classification": classification,
+        "explanation": (
+            f"Our AI analysis is temporarily unavailable, so this verdict is based only on "
+            f"{len(votes)} matching fact-check{'s' if len(votes) != 1 else ''} in our database, "
+            f"{votes.count(classification)} of which rate similar claims as {classification}. "
+            "Review the evidence below and check again later for a full analysis."
+        ),
+        "score": round(min(len(votes), 3) / 3 * 60 * agreement),
+        "tips": ["This is a preliminary verdict based on existing fact-checks only"],
+        "degraded": True
+    }
 
-    # Get current information for time-sensitive claims
-    current_info = search_current_info(text)
-    
-    # Enhance the text with current context for better AI analysis
-    enhanced_text = text
-    if current_info and any('Current Info:' in info for info in current_info):
-        context = " | ".join(current_info)
-        enhanced_text = f"{text} | CONTEXT: {context}"
-    
-    model_analysis = misinformation_detector_and_explainer(enhanced_text)
-    evidence = credibility_checker(text)
+def build_analysis_result(text, model_analysis, evidence, gamification, near_duplicate=None):
+    """Combines model output, evidence and personalization into the API result"""
     tips = educational_insights()
+    if model_analysis.get("model_unavailable"):
+        model_analysis = evidence_only_analysis(text, evidence or []) or model_analysis
 
     verdict = model_analysis.get("classification", "N/A")
     explanation = model_analysis.get("explanation", "No explanation provided.")
@@ -541,32 +794,14 @@ def analyze_claim(text, current_points=0, current_badges=None, save_to_database=
 
     all_tips = sorted(list(set(tips + model_tips)))
 
-    # Gamify
-    new_points = current_points + 10
-    new_badges = list(current_badges) # Create a copy to avoid modifying the original list
-    badge_earned = None
-    if new_points >= 50 and "Truth Beginner" not in new_badges:
-        new_badges.append("Truth Beginner")
-        badge_earned = "Truth Beginner"
-
     # Personalization
     category = categorize_text(text)
     tip = personalized_tip(category)
 
-    # Prepare evidence display with current information and database evidence
-    evidence_parts = []
-    
-    # Add current information if available
-    if current_info and any('Current Info:' in info for info in current_info):
-        evidence_parts.extend(current_info)
-    
-    # Add database evidence
+    # Prepare evidence display from database evidence
+    # (current context lines reach the model through the prompt, not here)
     if evidence:
-        evidence_parts.extend(evidence)
-    
-    # Create final evidence text
-    if evidence_parts:
-        evidence_text = '; '.join(evidence_parts)
+        evidence_text = '; '.join(evidence)
     else:
         # Provide category-specific guidance when no evidence found
         if category == "health":
@@ -585,28 +820,267 @@ def analyze_claim(text, current_points=0, current_badges=None, save_to_database=
         "explanation": explanation,
         "evidence": evidence_text,
         "tips": all_tips,
-        "gamification": {
-            "points": new_points,
-            "badges": new_badges if new_badges else [],
-            "badge_earned": badge_earned
-        },
+        "gamification": gamification,
         "personalization": {
             "category": category.capitalize(),
             "tip": tip
         }
     }
-    
+    if model_analysis.get("degraded"):
+        result["degraded"] = True
+    if model_analysis.get("repaired"):
+        result["repaired"] = True
+    if near_duplicate:
+        result["matched_claim"] = {
+            "claim": near_duplicate["claim"],
+            "source": near_duplicate["source"],
+            "similarity": near_duplicate["similarity"]
+        }
+    return result
+
+def store_analysis(text, result, near_duplicate=None, cache=None, cache_key=None, save_to_database=True):
+    """Queues a fresh analysis for the database and stores it in the claim cache"""
     # Save analysis to database for future reference (learning system)
-    if save_to_database and text and text.strip():
+    # (near-duplicates are skipped - their verdict is already stored, and
+    # evidence-only verdicts would just echo it back).
+    # The write-behind queue commits it in a batch after the response is sent.
+    # Failed analyses (Error/NoText) and repaired, possibly truncated ones are neither stored nor cached.
+    if result.get("degraded") or result.get("repaired") or result["classification"] in UNSTORED_VERDICTS:
+        return
+    if save_to_database and not near_duplicate and text and text.strip():
         try:
-            from database_helper import save_analysis_to_database
-            save_analysis_to_database(text, result)
+            get_write_behind().submit('analysis', (text, result))
         except Exception as e:
             print(f"Warning: Could not save to database: {e}")
             # Continue without failing - this is optional functionality
     
+    # Cache everything except the per-user state
+    if cache:
+        cache.set(cache_key, {k: v for k, v in result.items() if k != "gamification"})
+
+def analyze_claim(text, current_points=0, current_badges=None, save_to_database=True, use_cache=True):
+    """
+    Analyzes a claim by checking it with the Gemini model, searching a BigQuery
+    database, and providing educational and personalized feedback. It is a
+    stateless function that takes the current user state and returns the
+    analysis along with the new state.
+    Repeat claims are answered from the claim cache; only the gamification
+    fields are recomputed for the caller.
+    """
+    if current_badges is None:
+        current_badges = []
+
+    cache = get_claim_cache() if use_cache else None
+    cache_key = make_cache_key(text, get_context_version()) if cache else None
+    if cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            result = dict(cached)
+            result["gamification"] = apply_gamification(current_points, current_badges)
+            return result
+
+    # Get current information for time-sensitive claims
+    current_info = search_current_info(text)
+    
+    # Evidence lookups don't depend on the model output, so start them first
+    evidence_lookup = EvidenceLookup([text])
+    
+    # Reworded copies of an already-analysed claim reuse the stored verdict
+    near_duplicate = find_similar_claim(text)
+    if near_duplicate:
+        print(f"♻️ Reusing verdict of similar claim ({near_duplicate['similarity']:.0%}): '{near_duplicate['claim']}'")
+        model_analysis = near_duplicate_analysis(near_duplicate)
+    else:
+        model_analysis = misinformation_detector_and_explainer(
+            text, current_info, deadline=time.monotonic() + MODEL_TIMEOUT)
+    evidence = evidence_lookup.result(evidence_grace(model_analysis))
+
+    result = build_analysis_result(
+        text, model_analysis, evidence,
+        apply_gamification(current_points, current_badges), near_duplicate
+    )
+    store_analysis(text, result, near_duplicate, cache, cache_key, save_to_database)
     return result
 
+def iter_analyze_claim_events(text, current_points=0, current_badges=None, save_to_database=True, use_cache=True):
+    """
+    Streaming variant of analyze_claim. Yields (event, data) pairs:
+      "meta"        - category and personalized tip, straight away
+      "evidence"    - database evidence, as soon as the lookups finish
+      "explanation" - pieces of the explanation as the model generates it
+      "result"      - the complete analysis, as analyze_claim returns it
+    """
+    if current_badges is None:
+        current_badges = []
+
+    category = categorize_text(text)
+    yield "meta", {"category": category.capitalize(), "tip": personalized_tip(category)}
+
+    cache = get_claim_cache() if use_cache else None
+    cache_key = make_cache_key(text, get_context_version()) if cache else None
+    if cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            result = dict(cached)
+            result["gamification"] = apply_gamification(current_points, current_badges)
+            yield "result", result
+            return
+
+    current_info = search_current_info(text)
+
+    # Evidence lookups and the model stream report through one queue, without
+    # tying up a worker to wait for either of them
+    events = queue.Queue()
+    evidence_lookup = EvidenceLookup([text])
+    evidence_lookup.add_done_callback(lambda: events.put(("evidence", None)))
+    deadline = time.monotonic() + MODEL_TIMEOUT
+
+    cancel_event = threading.Event()
+    model_future = None
+    near_duplicate = find_similar_claim(text)
+    if near_duplicate:
+        print(f"♻️ Reusing verdict of similar claim ({near_duplicate['similarity']:.0%}): '{near_duplicate['claim']}'")
+        model_analysis = near_duplicate_analysis(near_duplicate)
+    else:
+        model_future = _model_executor.submit(
+            stream_misinformation_detector, text,
+            lambda piece: events.put(("chunk", piece)), cancel_event, current_info, deadline
+        )
+        model_future.add_done_callback(lambda _: events.put(("model", None)))
+
+    try:
+        explanation = JsonFieldStream("explanation")
+        evidence = None
+        while model_future is not None and not model_future.done():
+            # Wake up at BigQuery's deadline too, when SQLite's evidence may be all there is
+            wake_at = deadline
+            if evidence is None and time.monotonic() < evidence_lookup.bigquery_deadline:
+                wake_at = min(wake_at, evidence_lookup.bigquery_deadline)
+            try:
+                kind, piece = events.get(timeout=max(0.0, wake_at - time.monotonic()))
+            except queue.Empty:
+                if time.monotonic() >= deadline:
+                    break
+                kind, piece = "evidence", None
+            if kind == "chunk":
+                delta = explanation.feed(piece)
+                if delta:
+                    yield "explanation", {"text": delta}
+            elif kind == "evidence" and evidence is None and evidence_lookup.ready():
+                evidence = evidence_lookup.result()
+                yield "evidence", {"evidence": evidence}
+
+        if model_future is not None:
+            if model_future.done():
+                model_analysis = model_future.result()
+                # Explanation pieces that arrived with the last chunk
+                while True:
+                    try:
+                        kind, piece = events.get_nowait()
+                    except queue.Empty:
+                        break
+                    if kind == "chunk":
+                        delta = explanation.feed(piece)
+                        if delta:
+                            yield "explanation", {"text": delta}
+            else:
+                print(f"Model call timed out after {MODEL_TIMEOUT:.0f}s")
+                FALLBACKS.inc(kind="model_timeout")
+                model_analysis = MODEL_TIMEOUT_ANALYSIS
+        if evidence is None:
+            # Bounded by the lookups' own deadlines, or the grace period once the model has answered
+            evidence = evidence_lookup.result(evidence_grace(model_analysis))
+            yield "evidence", {"evidence": evidence}
+
+        result = build_analysis_result(
+            text, model_analysis, evidence,
+            apply_gamification(current_points, current_badges), near_duplicate
+        )
+        store_analysis(text, result, near_duplicate, cache, cache_key, save_to_database)
+        yield "result", result
+    finally:
+        # Client gone or timed out: stop consuming the model stream
+        cancel_event.set()
+
+def iter_analyze_claims(texts, current_points=0, current_badges=None, save_to_database=True, use_cache=True):
+    """
+    Analyzes many claims, yielding (index, result) in input order as soon as
+    each result is ready. Duplicate claims (after normalization) are analysed
+    once, claims not in the cache are sent to the model in groups of
+    BATCH_PROMPT_SIZE, and evidence for all of them comes from one set-based
+    query per store. Gamification accumulates across the batch.
+    """
+    texts = list(texts)
+    points = current_points
+    badges = list(current_badges or [])
+
+    # Deduplicate by normalized claim text
+    keys = [claim_hash(text) for text in texts]
+    unique = {}
+    for key, text in zip(keys, texts):
+        unique.setdefault(key, text)
+
+    cache = get_claim_cache() if use_cache else None
+    context_version = get_context_version() if cache else None
+    cache_keys = {key: make_cache_key(text, context_version) for key, text in unique.items()} if cache else {}
+    ready = {}
+    for key in unique:
+        cached = cache.get(cache_keys[key]) if cache else None
+        if cached is not None:
+            ready[key] = cached
+
+    pending = [key for key in unique if key not in ready]
+    evidence_lookup = EvidenceLookup([unique[key] for key in pending])
+    evidence_position = {key: i for i, key in enumerate(pending)}
+
+    current_infos = {key: search_current_info(unique[key]) for key in pending}
+    near_duplicates = {}
+    to_model = []
+    for key in pending:
+        match = find_similar_claim(unique[key])
+        if match:
+            near_duplicates[key] = match
+        else:
+            to_model.append(key)
+
+    # One model call per group of claims, all groups in flight at once
+    batch_deadline = time.monotonic() + MODEL_TIMEOUT
+    model_futures = {}
+    for start in range(0, len(to_model), BATCH_PROMPT_SIZE):
+        group = to_model[start:start + BATCH_PROMPT_SIZE]
+        future = _batch_executor.submit(
+            analyze_claim_group, [unique[key] for key in group], [current_infos[key] for key in group],
+            batch_deadline)
+        for position, key in enumerate(group):
+            model_futures[key] = (future, position)
+
+    for index, (key, text) in enumerate(zip(keys, texts)):
+        if key not in ready:
+            near_duplicate = near_duplicates.get(key)
+            if near_duplicate:
+                model_analysis = near_duplicate_analysis(near_duplicate)
+            else:
+                future, position = model_futures[key]
+                try:
+                    model_analysis = future.result(timeout=max(0.0, batch_deadline - time.monotonic()))[position]
+                except FuturesTimeoutError:
+                    FALLBACKS.inc(kind="model_timeout")
+                    model_analysis = MODEL_TIMEOUT_ANALYSIS
+            evidence = evidence_lookup.results(evidence_grace(model_analysis))[evidence_position[key]]
+            result = build_analysis_result(text, model_analysis, evidence, None, near_duplicate)
+            store_analysis(text, result, near_duplicate, cache, cache_keys.get(key), save_to_database)
+            ready[key] = {k: v for k, v in result.items() if k != "gamification"}
+
+        result = dict(ready[key])
+        result["gamification"] = apply_gamification(points, badges)
+        points = result["gamification"]["points"]
+        badges = result["gamification"]["badges"]
+        yield index, result
+
+def analyze_claims(texts, current_points=0, current_badges=None, save_to_database=True, use_cache=True):
+    """Analyzes a list of claims; returns results in input order (see iter_analyze_claims)"""
+    return [result for _, result in iter_analyze_claims(texts, current_points, current_badges, save_to_database, use_cache)]
+
 if __name__ == '__main__':
     # This block allows you to test the script directly.
     # This file should be renamed to 'analysis_engine.py' and used as a module.
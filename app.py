@@ -5,7 +5,7 @@ from urllib.parse import urlparse
 import secrets
 from functools import wraps
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
 
 # --- Configuration ---
@@ -19,31 +19,63 @@ PROJECT_ID = "echo-mind-472808"
 # API Key for authentication (you can change this to any secure key)
 API_KEY = os.environ.get('ECHO_MIND_API_KEY', 'gdo4N6BnLrvu9MOaH25Ml5M8msPjVf9tsez24Dq8eRI')
 
-# Rate limiting (simple in-memory counter)
-request_counts = {}
-MAX_REQUESTS_PER_HOUR = 100
+# Rate limiting: requests per client IP per hour, shared across workers (see rate_limiter.py)
+from rate_limiter import RATE_LIMIT as MAX_REQUESTS_PER_HOUR, get_rate_limiter
+
+# Largest number of claims accepted by /analyze/batch
+MAX_BATCH_CLAIMS = int(os.environ.get('ECHO_MIND_MAX_BATCH_CLAIMS', 500))
 
 LOCATION = "us-central1"
+
+# Import the analysis engine during start-up warm-up instead of on the first request
+PRELOAD_ENGINE = os.environ.get('ECHO_MIND_PRELOAD', '1').lower() in ('1', 'true', 'yes')
 # --- Centralized Analysis Logic ---
 # The core logic is now imported from analysis_engine.py to avoid code duplication.
 # Make sure you have renamed 'google_hackathonipynb (1).py' to 'analysis_engine.py'.
-try:
-    from analysis_engine import analyze_claim
-except ImportError:
-    raise RuntimeError("Could not import 'analyze_claim'. Please rename 'google_hackathonipynb (1).py' to 'analysis_engine.py'.")
+# It is imported on first use (or preloaded by the start-up warm-up), so the
+# server binds its port and answers /health without waiting for it.
+from startup import report as startup_report, timed, timed_import
+
+def get_analysis_engine():
+    try:
+        return timed_import('analysis_engine')
+    except ImportError:
+        raise RuntimeError("Could not import 'analyze_claim'. Please rename 'google_hackathonipynb (1).py' to 'analysis_engine.py'.")
 
 # --- Server State Management ---
-# For this demo, we store user progress in memory.
-# In a real application, this should be in a database (e.g., Firestore, SQL)
-# and tied to a user session or account.
-user_points = 0
-user_badges = []
+# Each caller's points and badges are stored in SQLite (see user_state.py),
+# keyed by the X-Session-Id header or, failing that, their API key.
+from user_state import get_user_state_store, make_user_key
+
+def current_user_key():
+    api_key = request.headers.get('X-API-Key') or request.args.get('api_key')
+    return make_user_key(api_key, request.headers.get('X-Session-Id'))
+
+def start_analyses(engine, user_key, count=1):
+    """Add the points for `count` analyses up front; returns the state they start from"""
+    return get_user_state_store().record_analyses(user_key, count, count * engine.POINTS_PER_ANALYSIS)
 
 # --- Flask Web Server ---
 
 app = Flask(__name__)
 CORS(app) # Allows your website to talk to this server
 
+# Request latency per endpoint (for streamed responses this is the time until the stream starts)
+import metrics
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    if metrics.METRICS_ENABLED and 'request_started' in g:
+        metrics.REQUEST_SECONDS.observe(
+            time.perf_counter() - g.request_started,
+            endpoint=request.endpoint or 'unmatched', status=response.status_code
+        )
+    return response
+
 def require_api_key(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -56,21 +88,17 @@ def require_api_key(f):
                 'message': 'Please provide a valid API key in X-API-Key header or api_key parameter'
             }), 401
         
-        # Simple rate limiting
-        client_ip = request.remote_addr
-        current_hour = int(time.time() // 3600)
-        key = f"{client_ip}_{current_hour}"
-        
-        if key in request_counts:
-            request_counts[key] += 1
-        else:
-            request_counts[key] = 1
-            
-        if request_counts[key] > MAX_REQUESTS_PER_HOUR:
-            return jsonify({
+        # Rate limiting per client IP
+        decision = get_rate_limiter().hit(request.remote_addr or 'unknown')
+        if not decision.allowed:
+            response = jsonify({
                 'error': 'Rate limit exceeded',
                 'message': f'Maximum {MAX_REQUESTS_PER_HOUR} requests per hour allowed'
-            }), 429
+            })
+            response.headers['Retry-After'] = str(decision.retry_after)
+            response.headers['X-RateLimit-Limit'] = str(decision.limit)
+            response.headers['X-RateLimit-Remaining'] = '0'
+            return response, 429
             
         return f(*args, **kwargs)
     return decorated_function
@@ -78,32 +106,91 @@ def require_api_key(f):
 @app.route('/analyze', methods=['POST'])
 @require_api_key
 def analyze():
-    # These globals are used to persist state across requests for this simple demo.
-    global user_points, user_badges
-
     data = request.get_json()
     if not data or 'claim' not in data:
         return jsonify({"error": "Invalid request. 'claim' key is missing."}), 400
 
     claim_text = data['claim']
+    engine = get_analysis_engine()
+    user_key = current_user_key()
+    state = start_analyses(engine, user_key)
 
-    # Call the stateless analysis function, passing in the current server state.
+    # Call the stateless analysis function, passing in the user's current state.
     # The function will automatically save new analysis to database
-    result = analyze_claim(claim_text, user_points, user_badges)
-
-    # Update the server's state with the new values returned by the analysis function.
-    user_points = result.get("gamification", {}).get("points", user_points)
-    user_badges = result.get("gamification", {}).get("badges", user_badges)
+    result = engine.analyze_claim(claim_text, state.points, state.badges)
+    get_user_state_store().add_badges(user_key, result.get("gamification", {}).get("badges", []), state.badges)
 
     return jsonify(result)
 
+def sse_event(event, data):
+    """Formats one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/analyze/stream', methods=['POST'])
+@require_api_key
+def analyze_stream():
+    """
+    Streaming variant of /analyze as Server-Sent Events: "meta" (category and
+    tip) first, then "evidence" and "explanation" chunks as they are ready,
+    and finally "result" with the same payload /analyze returns.
+    """
+    data = request.get_json(silent=True)
+    if not data or 'claim' not in data:
+        return jsonify({"error": "Invalid request. 'claim' key is missing."}), 400
+
+    claim_text = data['claim']
+    engine = get_analysis_engine()
+    user_key = current_user_key()
+    state = start_analyses(engine, user_key)
+
+    def generate():
+        for event, payload in engine.iter_analyze_claim_events(claim_text, state.points, state.badges):
+            if event == "result":
+                get_user_state_store().add_badges(user_key, payload.get("gamification", {}).get("badges", []), state.badges)
+            yield sse_event(event, payload)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/analyze/batch', methods=['POST'])
+@require_api_key
+def analyze_batch():
+    """
+    Analyze many claims in one request. Results are streamed back as
+    newline-delimited JSON, one line per input claim, in input order.
+    """
+    data = request.get_json(silent=True)
+    claims = data.get('claims') if isinstance(data, dict) else None
+    if not isinstance(claims, list) or not claims or not all(isinstance(c, str) for c in claims):
+        return jsonify({"error": "Invalid request. 'claims' must be a non-empty list of strings."}), 400
+    if len(claims) > MAX_BATCH_CLAIMS:
+        return jsonify({"error": f"Too many claims. Maximum {MAX_BATCH_CLAIMS} per batch."}), 413
+
+    engine = get_analysis_engine()
+    user_key = current_user_key()
+    state = start_analyses(engine, user_key, len(claims))
+
+    def generate():
+        badges = state.badges
+        for index, result in engine.iter_analyze_claims(claims, state.points, state.badges):
+            get_user_state_store().add_badges(user_key, result["gamification"]["badges"], badges)
+            badges = result["gamification"]["badges"]
+            yield json.dumps({"index": index, "claim": claims[index], **result}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/stats', methods=['GET'])
 @require_api_key
 def get_database_stats():
     """Get statistics about the learning database"""
     try:
         from database_helper import get_database_stats
+        from write_behind import get_write_behind
         stats = get_database_stats()
+        stats['write_behind'] = get_write_behind().stats()
         return jsonify({
             "status": "success",
             "data": stats
@@ -117,21 +204,56 @@ def get_database_stats():
 @app.route('/health', methods=['GET'])
 def health_check():
     """Public health check endpoint - no authentication required"""
+    from resilience import status as dependency_status
     return jsonify({
         "status": "healthy",
         "service": "Echo Mind AI Fact Checker",
         "message": "Service is running. Authentication required for analysis endpoints.",
+        "dependencies": dependency_status(),
         "endpoints": {
             "/analyze": "POST - AI fact checking (requires API key)",
+            "/analyze/stream": "POST - AI fact checking streamed as Server-Sent Events (requires API key)",
+            "/analyze/batch": "POST - Batch fact checking, streamed as NDJSON (requires API key)",
             "/stats": "GET - Database statistics (requires API key)",
-            "/health": "GET - Health check (public)"
+            "/health": "GET - Health check (public)",
+            "/ready": "GET - Readiness probe, 503 until clients are warmed up (public)",
+            "/startup": "GET - Import and start-up timings (requires API key)",
+            "/metrics": "GET - Stage latencies and counters in Prometheus format; ?format=json for percentiles (public)"
         }
     })
 
-if __name__ == '__main__':
-    # Initialize database with sample data if empty
+@app.route('/startup', methods=['GET'])
+@require_api_key
+def startup_timings():
+    """Import and start-up step timings for this worker"""
+    from clients import get_client_manager
+    return jsonify({**startup_report(), "clients": get_client_manager().status()})
+
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Public readiness probe: 200 once the model/BigQuery clients are warmed up, 503 before"""
+    from clients import get_client_manager
+    status = get_client_manager().status()
+    return jsonify(status), (200 if status['ready'] else 503)
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Public Prometheus scrape endpoint (metrics are per worker process)"""
+    if request.args.get('format') == 'json':
+        return jsonify(metrics.snapshot())
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+def initialize_app():
+    """Startup work shared by the dev server and production workers"""
+    # The shared rate limit store is required: fail start-up rather than limit per process
+    with timed("initialize rate limiter"):
+        get_rate_limiter()
+    
+    # Open the connection pool (schema setup runs once here) and seed sample data if empty
     try:
-        from database_helper import get_database_stats, initialize_sample_data
+        from database_helper import get_database_stats, initialize_database, initialize_sample_data
+        with timed("initialize database"):
+            initialize_database()
         stats = get_database_stats()
         if stats.get('total_claims', 0) == 0:
             print("🔄 Initializing database with sample data...")
@@ -139,5 +261,60 @@ if __name__ == '__main__':
     except Exception as e:
         print(f"⚠️ Database initialization warning: {e}")
     
+    # Load the near-duplicate index now rather than inside the first /analyze
+    try:
+        from claim_similarity import NEAR_DUPLICATE_ENABLED, get_claim_index
+        if NEAR_DUPLICATE_ENABLED:
+            with timed("load claim index"):
+                get_claim_index()
+    except Exception as e:
+        print(f"⚠️ Claim index warning: {e}")
+    
+    # Import the analysis engine, create the model / BigQuery clients and open their
+    # channels in the background; /ready reports when this has finished
+    try:
+        from clients import get_client_manager
+        from evidence_store import get_evidence_store
+        from prompt_builder import ANALYSIS_MODEL_KWARGS
+        get_client_manager().start_warmup(
+            bigquery=get_evidence_store().uses_bigquery,
+            preload=('analysis_engine',) if PRELOAD_ENGINE else (),
+            model_kwargs=ANALYSIS_MODEL_KWARGS
+        )
+    except Exception as e:
+        print(f"⚠️ Client warm-up warning: {e}")
+    
+    # In snapshot mode, keep a local copy of the BigQuery evidence table in SQLite
+    try:
+        from evidence_store import get_evidence_store
+        store = get_evidence_store()
+        if not store.uses_bigquery:
+            store.start_snapshot_sync()
+    except Exception as e:
+        print(f"⚠️ Evidence snapshot sync warning: {e}")
+
+def shutdown_app():
+    """Graceful shutdown: stop background work and close pooled connections"""
+    try:
+        from evidence_store import get_evidence_store
+        get_evidence_store().stop_snapshot_sync()
+    except Exception as e:
+        print(f"⚠️ Evidence snapshot sync shutdown warning: {e}")
+    try:
+        from analysis_engine import shutdown
+        shutdown()
+    except Exception as e:
+        print(f"⚠️ Analysis engine shutdown warning: {e}")
+    try:
+        from database_helper import close_database_connections
+        close_database_connections()
+    except Exception as e:
+        print(f"⚠️ Database shutdown warning: {e}")
+
+if __name__ == '__main__':
+    # Development server only - production uses `gunicorn -c gunicorn.conf.py app:app`
+    initialize_app()
+    
     # Use port 8080 for compatibility with cloud environments
-    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 8080)), debug=True)
+    debug = os.environ.get('FLASK_DEBUG', '0').lower() in ('1', 'true', 'yes')
+    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 8080)), debug=debug)
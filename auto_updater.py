@@ -16,6 +16,11 @@ import feedparser
 import sqlite3
 from dataclasses import dataclass
 
+import keyword_matcher
+from feed_fetcher import FeedFetcher, FeedStateStore, conditional_headers
+from keyword_matcher import get_keyword_matcher
+from topic_keywords import NEWS_TOPIC_KEYWORDS, POLITICAL_KEYWORDS
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -36,6 +41,15 @@ class NewsItem:
     published_date: datetime
     category: str
 
+    def to_dict(self) -> Dict:
+        data = dict(self.__dict__)
+        data['published_date'] = self.published_date.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'NewsItem':
+        return cls(**{**data, 'published_date': datetime.fromisoformat(data['published_date'])})
+
 class AutoUpdater:
     def __init__(self):
         # API Configuration
@@ -59,66 +73,22 @@ class AutoUpdater:
         }
         
         # Political keywords to track (India-focused)
-        self.political_keywords = [
-            'chief minister', 'cm', 'prime minister', 'pm', 'president',
-            'election', 'government', 'minister', 'parliament', 'assembly', 'lok sabha', 'rajya sabha',
-            'bjp', 'congress', 'aap', 'trs', 'brs', 'tdp', 'ysrcp', 'dmk', 'aiadmk', 'jdu', 'rjd',
-            # Major Indian States
-            'andhra pradesh', 'telangana', 'karnataka', 'tamil nadu', 'kerala', 'maharashtra',
-            'uttar pradesh', 'bihar', 'west bengal', 'gujarat', 'rajasthan', 'madhya pradesh',
-            'odisha', 'punjab', 'haryana', 'jharkhand', 'assam', 'himachal pradesh', 'uttarakhand',
-            'goa', 'manipur', 'meghalaya', 'nagaland', 'sikkim', 'tripura', 'arunachal pradesh', 'mizoram',
-            # Political Terms
-            'governor', 'cabinet', 'coalition', 'alliance', 'bjp', 'inc', 'modi', 'gandhi',
-            'delhi', 'mumbai', 'kolkata', 'chennai', 'hyderabad', 'bangalore', 'pune', 'ahmedabad'
-        ]
+        self.political_keywords = POLITICAL_KEYWORDS
         
         # Comprehensive topic keywords for broad coverage
-        self.topic_keywords = {
-            'health': [
-                'covid', 'vaccine', 'health', 'medical', 'disease', 'treatment', 'hospital', 'doctor',
-                'who', 'fda', 'clinical trial', 'research study', 'medicine', 'therapy', 'diagnosis',
-                'pandemic', 'epidemic', 'mental health', 'ayurveda', 'healthcare', 'pharmacy'
-            ],
-            'science': [
-                'research', 'study', 'scientist', 'discovery', 'experiment', 'technology', 'innovation',
-                'artificial intelligence', 'ai', 'machine learning', 'space', 'nasa', 'isro', 'satellite',
-                'climate change', 'global warming', 'environment', 'renewable energy', 'solar', 'electric'
-            ],
-            'technology': [
-                'tech', 'software', 'app', 'internet', 'cyber', 'data', 'privacy', 'security',
-                'smartphone', 'computer', 'laptop', 'gadget', 'startup', 'google', 'microsoft', 'apple',
-                'facebook', 'meta', 'twitter', 'social media', 'blockchain', 'cryptocurrency', 'bitcoin'
-            ],
-            'business': [
-                'stock', 'market', 'economy', 'finance', 'investment', 'banking', 'inflation', 'gdp',
-                'company', 'corporate', 'industry', 'manufacturing', 'trade', 'export', 'import',
-                'startup', 'funding', 'ipo', 'merger', 'acquisition', 'revenue', 'profit', 'loss'
-            ],
-            'sports': [
-                'cricket', 'football', 'hockey', 'tennis', 'badminton', 'kabaddi', 'olympics', 'asian games',
-                'ipl', 'fifa', 'world cup', 'player', 'team', 'match', 'tournament', 'championship',
-                'coach', 'athlete', 'medal', 'record', 'performance', 'injury', 'retirement'
-            ],
-            'entertainment': [
-                'movie', 'film', 'cinema', 'bollywood', 'hollywood', 'tollywood', 'actor', 'actress',
-                'director', 'music', 'song', 'album', 'concert', 'show', 'tv', 'series', 'web series',
-                'netflix', 'amazon prime', 'celebrity', 'award', 'oscar', 'filmfare', 'box office'
-            ],
-            'education': [
-                'school', 'college', 'university', 'student', 'teacher', 'professor', 'exam', 'result',
-                'admission', 'entrance', 'jee', 'neet', 'upsc', 'degree', 'course', 'syllabus',
-                'education policy', 'scholarship', 'research', 'phd', 'iit', 'iim', 'cbse', 'icse'
-            ],
-            'social': [
-                'social media', 'viral', 'trending', 'influencer', 'youtube', 'instagram', 'tiktok',
-                'community', 'society', 'culture', 'religion', 'festival', 'tradition', 'custom',
-                'discrimination', 'equality', 'justice', 'human rights', 'women empowerment'
-            ]
-        }
+        self.topic_keywords = NEWS_TOPIC_KEYWORDS
         
         self.db_path = 'factchecks.db'
         self.current_context_file = 'current_context.json'
+        self.feed_state = FeedStateStore()
+        self._fetcher = None
+
+    @property
+    def fetcher(self) -> FeedFetcher:
+        """Bounded pool used for feed downloads (created on first use)"""
+        if self._fetcher is None:
+            self._fetcher = FeedFetcher()
+        return self._fetcher
 
     def get_last_update_time(self) -> datetime:
         """Get the last update timestamp"""
@@ -147,7 +117,27 @@ class AutoUpdater:
         """Fetch news from RSS feed"""
         try:
             logger.info(f"Fetching news from {source_name}")
-            feed = feedparser.parse(rss_url)
+            state = self.feed_state.get(source_name, rss_url)
+            headers = conditional_headers(state) if 'items' in state else {}
+            result = self.fetcher.fetch(source_name, rss_url, headers=headers)
+            if not result.ok:
+                logger.error(f"Error fetching news from {source_name} after {result.attempts} attempts: {result.error}")
+                return []
+            
+            validators = {
+                'etag': result.headers.get('ETag') or state.get('etag'),
+                'last_modified': result.headers.get('Last-Modified') or state.get('last_modified'),
+                'checked_at': datetime.now().isoformat()
+            }
+            
+            # Unchanged feed: reuse the items parsed last time
+            content_hash = None if result.not_modified else result.content_hash
+            if 'items' in state and (result.not_modified or content_hash == state.get('content_hash')):
+                self.feed_state.update(source_name, rss_url, **validators)
+                logger.info(f"{source_name} unchanged ({'304' if result.not_modified else 'same content'}), reusing {len(state['items'])} items")
+                return [NewsItem.from_dict(item) for item in state['items']]
+            
+            feed = feedparser.parse(result.content)
             news_items = []
             
             for entry in feed.entries[:10]:  # Get latest 10 articles
@@ -169,6 +159,10 @@ class AutoUpdater:
                     logger.warning(f"Error parsing news item from {source_name}: {e}")
                     continue
             
+            self.feed_state.update(
+                source_name, rss_url, content_hash=content_hash,
+                items=[item.to_dict() for item in news_items], **validators
+            )
             logger.info(f"Successfully fetched {len(news_items)} items from {source_name}")
             return news_items
             
@@ -222,20 +216,42 @@ class AutoUpdater:
             logger.error(f"Error fetching from NewsAPI: {e}")
             return []
 
+    def fetch_all_news(self) -> List[NewsItem]:
+        """Fetch every RSS feed plus NewsAPI on the fetcher pool, keeping source order"""
+        started = time.monotonic()
+        rss_futures = [
+            self.fetcher.submit(self.fetch_news_from_rss, source_name, rss_url)
+            for source_name, rss_url in self.news_sources.items()
+        ]
+        newsapi_future = self.fetcher.submit(self.fetch_news_from_newsapi)
+        
+        all_news_items = []
+        for future in rss_futures + [newsapi_future]:
+            all_news_items.extend(future.result())
+        
+        try:
+            self.feed_state.save()
+        except Exception as e:
+            logger.error(f"Error saving feed state: {e}")
+        
+        logger.info(f"Fetched {len(all_news_items)} items from {len(rss_futures)} feeds in {time.monotonic() - started:.1f}s")
+        return all_news_items
+
     def categorize_news(self, text: str) -> str:
         """Categorize news based on comprehensive content analysis"""
-        text_lower = text.lower()
+        # One pass over the shared keyword automaton for every category
+        hits = get_keyword_matcher().scan(text)
         
         # Check politics first (highest priority for Indian context)
-        if any(keyword in text_lower for keyword in self.political_keywords):
+        if hits.get(keyword_matcher.POLITICS):
             return 'politics'
         
         # Check all other topic categories
-        category_scores = {}
-        for category, keywords in self.topic_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            if score > 0:
-                category_scores[category] = score
+        prefix = f"{keyword_matcher.NEWS_TOPIC}:"
+        category_scores = {
+            category: hits[prefix + category]
+            for category in self.topic_keywords if hits.get(prefix + category)
+        }
         
         # Return category with highest score, or 'general' if no match
         if category_scores:
@@ -264,7 +280,7 @@ class AutoUpdater:
                     ]
                     for state in indian_states:
                         if state in text:
-                            political_updates[f"{state.replace(' ', '_')}_cm"] = {
+                            all_updates[f"{state.replace(' ', '_')}_cm"] = {
                                 'title': item.title,
                                 'description': item.description,
                                 'source': item.source,
@@ -276,7 +292,7 @@ class AutoUpdater:
                 
                 # Check for PM updates
                 if 'prime minister' in text or ' pm ' in text:
-                    political_updates['prime_minister'] = {
+                    all_updates['prime_minister'] = {
                         'title': item.title,
                         'description': item.description,
                         'source': item.source,
@@ -295,7 +311,7 @@ class AutoUpdater:
                     elif 'municipal' in text or 'civic' in text:
                         election_key = 'municipal_election'
                     
-                    political_updates[election_key] = {
+                    all_updates[election_key] = {
                         'title': item.title,
                         'description': item.description,
                         'source': item.source,
@@ -306,7 +322,7 @@ class AutoUpdater:
                 
                 # Check for Governor updates
                 if 'governor' in text:
-                    political_updates['governor_update'] = {
+                    all_updates['governor_update'] = {
                         'title': item.title,
                         'description': item.description,
                         'source': item.source,
@@ -319,7 +335,7 @@ class AutoUpdater:
                 major_parties = ['bjp', 'congress', 'aap', 'brs', 'tdp', 'ysrcp', 'dmk', 'aiadmk']
                 for party in major_parties:
                     if party in text:
-                        political_updates[f'{party}_update'] = {
+                        all_updates[f'{party}_update'] = {
                             'title': item.title,
                             'description': item.description,
                             'source': item.source,
@@ -437,8 +453,11 @@ class AutoUpdater:
             for item in news_items:
                 current_context['categories'][item.category] = current_context['categories'].get(item.category, 0) + 1
             
-            with open(self.current_context_file, 'w') as f:
+            # Write atomically so readers never see a half-written file
+            tmp_file = self.current_context_file + '.tmp'
+            with open(tmp_file, 'w') as f:
                 json.dump(current_context, f, indent=2)
+            os.replace(tmp_file, self.current_context_file)
             
             total_updates = len(comprehensive_updates)
             topics_covered = len(categorized_updates)
@@ -451,30 +470,31 @@ class AutoUpdater:
         """Add relevant news items to the fact-check database"""
         try:
             # Import database helper
-            from database_helper import add_fact_check_to_database
+            from database_helper import bulk_add_fact_checks
             
-            for item in news_items:
-                # Only add items that could serve as fact-checks
-                if item.category in ['politics', 'health', 'environment'] and len(item.description) > 50:
-                    try:
-                        # Create a fact-check entry from news
-                        fact_check_data = {
-                            'claim': item.title,
-                            'verdict': 'Trustworthy',  # News from trusted sources
-                            'source': item.source,
-                            'url': item.url,
-                            'explanation': item.description,
-                            'category': item.category,
-                            'date_added': datetime.now().isoformat()
-                        }
-                        
-                        add_fact_check_to_database(fact_check_data)
-                        
-                    except Exception as e:
-                        logger.warning(f"Error adding news item to database: {e}")
-                        continue
+            # Only add items that could serve as fact-checks
+            fact_checks = [
+                {
+                    'claim': item.title,
+                    'verdict': 'Trustworthy',  # News from trusted sources
+                    'source': item.source,
+                    'url': item.url,
+                    'explanation': item.description,
+                    'category': item.category,
+                    'date_added': datetime.now().isoformat()
+                }
+                for item in news_items
+                if item.category in ['politics', 'health', 'environment'] and len(item.description) > 50
+            ]
             
-            logger.info(f"Added relevant news items to database")
+            # One transaction for the whole run; stories already stored only get their hit count bumped
+            stats = bulk_add_fact_checks(fact_checks)
+            if 'error' in stats:
+                logger.error(f"Error updating database with news: {stats['error']}")
+            else:
+                logger.info(f"Added {stats['inserted']} news items to database "
+                            f"({stats['updated']} already stored, {stats['skipped']} skipped)")
+            return stats
             
         except Exception as e:
             logger.error(f"Error updating database with news: {e}")
@@ -485,17 +505,8 @@ class AutoUpdater:
         start_time = datetime.now()
         
         try:
-            all_news_items = []
-            
-            # Fetch from RSS feeds
-            for source_name, rss_url in self.news_sources.items():
-                news_items = self.fetch_news_from_rss(source_name, rss_url)
-                all_news_items.extend(news_items)
-                time.sleep(1)  # Be respectful to news sources
-            
-            # Fetch from NewsAPI if available
-            newsapi_items = self.fetch_news_from_newsapi()
-            all_news_items.extend(newsapi_items)
+            # Fetch RSS feeds and NewsAPI concurrently
+            all_news_items = self.fetch_all_news()
             
             # Filter for recent items (last 24 hours)
             recent_items = [
@@ -547,16 +558,24 @@ class AutoUpdater:
         """Start the daily scheduler"""
         logger.info("Starting auto-update scheduler...")
         
-        # Schedule daily update at 6 AM
-        schedule.every().day.at("06:00").do(self.daily_update)
+        # Schedule daily update at 6 AM, or poll every few minutes when configured
+        # (unchanged feeds cost a 304 or a hash check, not a full re-parse)
+        poll_minutes = int(os.environ.get('ECHO_MIND_FEED_POLL_MINUTES', 0))
+        if poll_minutes > 0:
+            schedule.every(poll_minutes).minutes.do(self.daily_update)
+        else:
+            schedule.every().day.at("06:00").do(self.daily_update)
         
         # Also run immediately if last update was more than 24 hours ago
         last_update = self.get_last_update_time()
-        if (datetime.now() - last_update).hours >= 24:
+        if datetime.now() - last_update >= timedelta(hours=24):
             logger.info("Last update was more than 24 hours ago, running immediate update...")
             self.daily_update()
         
-        logger.info("Scheduler started. Daily updates at 6:00 AM")
+        if poll_minutes > 0:
+            logger.info(f"Scheduler started. Polling feeds every {poll_minutes} minutes")
+        else:
+            logger.info("Scheduler started. Daily updates at 6:00 AM")
         
         while True:
             schedule.run_pending()
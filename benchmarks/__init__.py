@@ -0,0 +1,7 @@
+"""
+Benchmark harness for Echo Mind
+Runs the search, ingest, full-request and batch paths against a synthetic
+fact_checks corpus, with local stand-ins for Vertex AI and BigQuery whose
+latencies are configurable, and reports throughput, latency percentiles and
+memory per scenario. See benchmarks/README.md.
+"""
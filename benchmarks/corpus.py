@@ -0,0 +1,191 @@
+"""
+Synthetic fact_checks corpus for the benchmarks
+Claims are built from fixed vocabularies by a mixed-radix decomposition of a
+permuted row number, so every row is distinct, the same seed always yields
+the same corpus, and claims beyond the corpus size (used as request traffic)
+are new but share vocabulary with stored rows.
+
+Usage:
+  python -m benchmarks.corpus 100k            - Build (or reuse) the 100k-row corpus
+  python -m benchmarks.corpus 1m --force      - Rebuild the 1M-row corpus
+"""
+
+import argparse
+import random
+import shutil
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+DATA_DIR = Path(__file__).parent / ".data"
+CORPUS_SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+INSERT_CHUNK = 5_000
+
+SUBJECTS = [
+    "COVID-19 vaccines", "5G towers", "The chief minister", "The prime minister", "A new study",
+    "Drinking hot water", "The election commission", "Cricket officials", "Bollywood actors",
+    "The state government", "Scientists at ISRO", "The Reserve Bank", "Social media posts",
+    "A viral video", "University students", "The health ministry", "Farmers in Punjab",
+    "Mobile phones", "Climate change", "The stock market", "A Netflix documentary",
+    "Ayurvedic medicine", "The Supreme Court", "Electric vehicles", "Crypto investors",
+    "The IPL final", "Hospital doctors", "The NEET exam", "Tech companies", "The monsoon",
+    "Railway officials", "The opposition party", "Garlic and ginger", "Artificial intelligence",
+    "The census report", "Local schools", "Smartphone apps", "The Olympic team",
+    "Government hospitals", "Polling booths",
+]
+VERBS = [
+    "cause", "cure", "prevent", "ban", "announced", "secretly control", "doubled", "cancelled",
+    "will replace", "spread", "leaked", "approved", "predict", "track", "fund", "reduce",
+    "increase", "hide", "rigged", "confirmed",
+]
+OBJECTS = [
+    "cancer", "the virus", "free electricity", "all exams", "voter lists", "fuel prices",
+    "the monsoon season", "rice exports", "bank accounts", "mobile data", "the vaccine supply",
+    "farm loans", "school fees", "the world cup", "hospital beds", "new currency notes",
+    "heart disease", "internet shutdowns", "petrol subsidies", "the budget deficit",
+    "student visas", "election results", "water supply", "tax refunds", "the metro project",
+    "crop insurance", "ration cards", "covid deaths", "diabetes", "gold prices",
+    "the stock index", "satellite launches", "coal imports", "tiger numbers", "air pollution",
+    "job vacancies", "pension payments", "movie releases", "train tickets", "power cuts",
+]
+PLACES = [
+    "in Andhra Pradesh", "in Telangana", "in Karnataka", "in Tamil Nadu", "in Kerala",
+    "in Maharashtra", "in Uttar Pradesh", "in Bihar", "in West Bengal", "in Gujarat",
+    "in Rajasthan", "in Delhi", "in Mumbai", "in Chennai", "in Hyderabad", "across India",
+    "in rural villages", "in major cities", "worldwide", "in Punjab", "in Assam", "in Odisha",
+    "in Goa", "in Kolkata", "in Bangalore",
+]
+WHEN = ["this week", "since 2020", "last year", "by 2030", "overnight", "in 2024", "this month", "from next year"]
+VERDICTS = ["False", "False", "False", "Mixed", "Suspicious", "Trustworthy", "Misleading", "True"]
+SOURCES = ["PIB Fact Check", "Alt News", "BOOM", "Factly", "WHO", "Reuters Fact Check",
+           "India Today Fact Check", "The Hindu", "Election Commission of India", "Mayo Clinic"]
+
+RADIXES = (len(SUBJECTS), len(VERBS), len(OBJECTS), len(PLACES), len(WHEN))
+COMBINATIONS = 1
+for _radix in RADIXES:
+    COMBINATIONS *= _radix
+
+
+def _coprime_step(seed: int) -> int:
+    """A multiplier coprime with COMBINATIONS, so row -> combination is a permutation"""
+    rng = random.Random(seed)
+    while True:
+        step = rng.randrange(COMBINATIONS // 3, COMBINATIONS)
+        a, b = step, COMBINATIONS
+        while b:
+            a, b = b, a % b
+        if a == 1:
+            return step
+
+
+def _claim(row: int, step: int, seed: int) -> str:
+    value = (row * step + seed) % COMBINATIONS
+    digits = []
+    for radix in RADIXES:
+        value, digit = divmod(value, radix)
+        digits.append(digit)
+    s, v, o, p, w = digits
+    return f"{SUBJECTS[s]} {VERBS[v]} {OBJECTS[o]} {PLACES[p]} {WHEN[w]}"
+
+
+def claim_text(row: int, seed: int = 42) -> str:
+    """The row-th synthetic claim (distinct for every row < COMBINATIONS)"""
+    return _claim(row, _coprime_step(seed), seed)
+
+
+def generate_fact_checks(count: int, start: int = 0, seed: int = 42) -> Iterator[Dict]:
+    """Deterministic fact_checks rows (the dict shape bulk_add_fact_checks takes)"""
+    step = _coprime_step(seed)
+    for row in range(start, start + count):
+        claim = _claim(row, step, seed)
+        verdict = VERDICTS[row % len(VERDICTS)]
+        source = SOURCES[(row // len(VERDICTS)) % len(SOURCES)]
+        yield {
+            'claim': claim,
+            'verdict': verdict,
+            'source': source,
+            'url': f"https://factcheck.example/{row}",
+            'explanation': f"Synthetic fact-check #{row}: the claim that {claim.lower()} is rated {verdict}."
+        }
+
+
+def search_queries(count: int, seed: int = 7) -> List[str]:
+    """Search texts drawn from the corpus vocabulary (subject, verb, object)"""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        queries.append(" ".join((rng.choice(SUBJECTS), rng.choice(VERBS), rng.choice(OBJECTS))))
+    return queries
+
+
+def corpus_path(rows: int, seed: int = 42) -> Path:
+    return DATA_DIR / f"factchecks-{rows}-{seed}.db"
+
+
+def _stored_rows(path: Path) -> int:
+    try:
+        with sqlite3.connect(path) as conn:
+            return conn.execute("SELECT COUNT(*) FROM fact_checks").fetchone()[0]
+    except sqlite3.Error:
+        return -1
+
+
+def build_corpus(rows: int, seed: int = 42, force: bool = False) -> Path:
+    """Create the template database for `rows` rows, reusing it when already built"""
+    path = corpus_path(rows, seed)
+    if not force and path.exists() and _stored_rows(path) == rows:
+        return path
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    for suffix in ('', '-wal', '-shm'):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+    import database_helper
+    database_helper.configure_database(path)
+    started = time.perf_counter()
+    batch = []
+    for item in generate_fact_checks(rows, seed=seed):
+        batch.append(item)
+        if len(batch) == INSERT_CHUNK:
+            database_helper.bulk_add_fact_checks(batch)
+            batch = []
+    if batch:
+        database_helper.bulk_add_fact_checks(batch)
+    with database_helper.database_connection() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("ANALYZE")
+        conn.commit()
+    database_helper.close_database_connections()
+    print(f"✅ Built {rows:,}-row corpus in {time.perf_counter() - started:.1f}s -> {path}")
+    return path
+
+
+def working_copy(rows: int, seed: int = 42, name: str = "work") -> Path:
+    """A fresh copy of the template, so scenarios that write never change it"""
+    template = build_corpus(rows, seed)
+    target = DATA_DIR / f"{name}-{rows}-{seed}.db"
+    for suffix in ('', '-wal', '-shm'):
+        Path(f"{target}{suffix}").unlink(missing_ok=True)
+    shutil.copyfile(template, target)
+    return target
+
+
+def parse_size(size: str) -> int:
+    size = size.lower()
+    if size in CORPUS_SIZES:
+        return CORPUS_SIZES[size]
+    return int(size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build synthetic fact_checks corpora")
+    parser.add_argument('sizes', nargs='+', help="1k, 100k, 1m or a row count")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--force', action='store_true', help="Rebuild even if the corpus exists")
+    args = parser.parse_args()
+    for size in args.sizes:
+        build_corpus(parse_size(size), args.seed, args.force)
+
+
+if __name__ == '__main__':
+    main()
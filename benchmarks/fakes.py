@@ -0,0 +1,330 @@
+"""
+Local stand-ins for Vertex AI's GenerativeModel and bigquery.Client (plus
+an in-memory Redis client for the rate limiter's tests)
+The first two answer deterministically after a configurable latency (a fixed base
+plus seeded jitter), so benchmark runs measure Echo Mind's own overhead and
+concurrency rather than the network. A FaultInjector makes a seeded share
+of calls fail with the errors Google's clients raise, or stall, to exercise
+resilience.py's retries, deadlines, hedging and circuit breaker.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from functools import partial
+from typing import Dict, List, Optional, Sequence
+
+_CLAIM_ID = re.compile(r'^\[(\d+)\] ', re.M)
+VERDICT_CYCLE = ("False", "Suspicious", "Trustworthy")
+
+
+class Latency:
+    """Seeded latency source: base seconds plus up to `jitter` seconds"""
+
+    def __init__(self, base: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.base = base
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        if not self.jitter:
+            return self.base
+        with self._lock:
+            return self.base + self._rng.random() * self.jitter
+
+    def sleep(self, fraction: float = 1.0):
+        delay = self.sample() * fraction
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ServiceUnavailable(Exception):
+    """Named like google.api_core.exceptions.ServiceUnavailable (HTTP 503)"""
+    code = 503
+
+
+class ResourceExhausted(Exception):
+    """Named like google.api_core.exceptions.ResourceExhausted (HTTP 429, quota)"""
+    code = 429
+
+
+class FaultInjector:
+    """
+    Seeded faults for the fakes: `error_rate` of calls raise one of `errors`,
+    `stall_rate` of calls take an extra `stall` seconds. set(...) changes the
+    rates mid-run, e.g. to simulate an outage and recovery.
+    """
+
+    def __init__(self, error_rate: float = 0.0, stall_rate: float = 0.0, stall: float = 5.0,
+                 errors: Sequence[type] = (ServiceUnavailable, ResourceExhausted), seed: int = 0):
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.stall = stall
+        self.errors = tuple(errors)
+        self.injected = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def set(self, error_rate: Optional[float] = None, stall_rate: Optional[float] = None):
+        if error_rate is not None:
+            self.error_rate = error_rate
+        if stall_rate is not None:
+            self.stall_rate = stall_rate
+
+    def before_call(self):
+        """Raise or stall as drawn for this call"""
+        with self._lock:
+            draw = self._rng.random()
+            error = self.errors[self._rng.randrange(len(self.errors))] if self.errors else None
+        if draw < self.error_rate and error is not None:
+            self.injected += 1
+            raise error(f"injected fault ({error.__name__})")
+        if draw < self.error_rate + self.stall_rate:
+            self.injected += 1
+            time.sleep(self.stall)
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """
+    Answers analysis prompts with a well-formed analysis (a JSON array for
+    batch prompts). With stream=True the answer arrives in chunks spread over
+    the latency, the first one after `first_chunk_fraction` of it.
+    """
+
+    def __init__(self, model_name: str, latency: Optional[Latency] = None, chunk_size: int = 40,
+                 first_chunk_fraction: float = 0.3, faults: Optional[FaultInjector] = None, **kwargs):
+        self.model_name = model_name
+        self.latency = latency or Latency()
+        self.faults = faults or FaultInjector()
+        self.chunk_size = chunk_size
+        self.first_chunk_fraction = first_chunk_fraction
+        self.kwargs = kwargs
+        self.calls = 0
+
+    @staticmethod
+    def _analysis(number: int) -> Dict:
+        verdict = VERDICT_CYCLE[number % len(VERDICT_CYCLE)]
+        return {
+            "classification": verdict,
+            "explanation": (
+                f"Benchmark analysis rated {verdict}. The claim was compared with the supplied context "
+                "and known fact-checks; no live model was called for this response."
+            ),
+            "score": 70 + number % 30,
+            "tips": ["Check the original source", "Look for official confirmation"]
+        }
+
+    def _answer(self, prompt: str) -> str:
+        ids = [int(i) for i in _CLAIM_ID.findall(prompt)]
+        if ids:
+            return json.dumps([{"id": i, **self._analysis(i)} for i in ids])
+        return "```json\n" + json.dumps(self._analysis(len(prompt))) + "\n```"
+
+    def generate_content(self, prompt, stream: bool = False, **kwargs):
+        self.calls += 1
+        self.faults.before_call()
+        text = self._answer(str(prompt))
+        if not stream:
+            self.latency.sleep()
+            return FakeResponse(text)
+        return self._stream(text)
+
+    def _stream(self, text: str):
+        chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+        total = self.latency.sample()
+        time.sleep(total * self.first_chunk_fraction)
+        gap = total * (1 - self.first_chunk_fraction) / max(len(chunks) - 1, 1)
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(gap)
+            yield FakeResponse(chunk)
+
+    def count_tokens(self, contents):
+        return {"total_tokens": len(str(contents)) // 4 + 1}
+
+
+class FakeRow:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class FakeQueryJob:
+    def __init__(self, rows: List[FakeRow], ready_at: float):
+        self._rows = rows
+        self._ready_at = ready_at
+        self.cancelled = False
+
+    def result(self, timeout: Optional[float] = None):
+        wait = self._ready_at - time.monotonic()
+        if wait > 0:
+            if timeout is not None and wait > timeout:
+                time.sleep(timeout)
+                raise FuturesTimeoutError()
+            time.sleep(wait)
+        return iter(self._rows)
+
+    def cancel(self):
+        self.cancelled = True
+        return True
+
+
+def _struct_fields(param) -> Dict:
+    # google-cloud-bigquery keeps struct members in struct_values
+    values = getattr(param, 'struct_values', None)
+    if values is not None:
+        return dict(values)
+    return {'idx': getattr(param, 'idx'), 'term': getattr(param, 'term')}
+
+
+class FakeBigQueryClient:
+    """
+    Runs evidence_store's set-based search over an in-memory table of
+    (claim, verdict, source, url) rows, answering after the configured latency.
+    A query without search terms (the snapshot export) returns every row.
+    """
+
+    def __init__(self, project: str = "benchmark", rows: Sequence[Dict] = (), latency: Optional[Latency] = None,
+                 faults: Optional[FaultInjector] = None):
+        self.project = project
+        self.latency = latency or Latency()
+        self.faults = faults or FaultInjector()
+        self.table = [(row['claim'].lower(), row) for row in rows]
+        self.jobs = 0
+
+    def query(self, sql: str, job_config=None, **kwargs):
+        self.jobs += 1
+        self.faults.before_call()
+        params = {p.name: p for p in getattr(job_config, 'query_parameters', None) or []}
+        limit = params['limit'].value if 'limit' in params else 3
+        terms: Dict[int, List[str]] = {}
+        for param in params['terms'].values if 'terms' in params else []:
+            fields = _struct_fields(param)
+            terms.setdefault(fields['idx'], []).append(fields['term'])
+
+        if 'terms' not in params:
+            rows = [FakeRow(claim=row['claim'], verdict=row['verdict'], source=row['source'], url=row['url'])
+                    for _, row in self.table]
+            return FakeQueryJob(rows, time.monotonic() + self.latency.sample())
+
+        rows = []
+        for idx in sorted(terms):
+            matches = []
+            for lowered, row in self.table:
+                matched = sum(1 for term in terms[idx] if term in lowered)
+                if matched:
+                    matches.append((matched, row))
+            matches.sort(key=lambda m: -m[0])
+            for matched, row in matches[:limit]:
+                rows.append(FakeRow(
+                    idx=idx, claim=row['claim'], verdict=row['verdict'], source=row['source'], url=row['url'],
+                    relevance_score=100 if matched == len(terms[idx]) else 50
+                ))
+        return FakeQueryJob(rows, time.monotonic() + self.latency.sample())
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the redis.Redis commands rate_limiter's RedisBackend
+    uses (INCR, DECR, GET, EXPIRE, TTL and pipelines), with keys expiring on
+    `clock` so tests can move time forward.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._data: Dict[str, list] = {}  # key -> [value, expires_at or None]
+        self._lock = threading.RLock()
+
+    def _entry(self, key: str) -> Optional[list]:
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= self.clock():
+            del self._data[key]
+            return None
+        return entry
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        with self._lock:
+            entry = self._entry(key)
+            if entry is None:
+                entry = self._data[key] = [0, None]
+            entry[0] += amount
+            return entry[0]
+
+    def decr(self, key: str, amount: int = 1) -> int:
+        return self.incr(key, -amount)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entry(key)
+            return None if entry is None else str(entry[0]).encode()
+
+    def expire(self, key: str, seconds: int) -> bool:
+        with self._lock:
+            entry = self._entry(key)
+            if entry is None:
+                return False
+            entry[1] = self.clock() + seconds
+            return True
+
+    def ttl(self, key: str) -> int:
+        """Seconds left, -1 for a key without expiry, -2 for a missing key"""
+        with self._lock:
+            entry = self._entry(key)
+            if entry is None:
+                return -2
+            return -1 if entry[1] is None else int(entry[1] - self.clock())
+
+    def pipeline(self, transaction: bool = True) -> "FakeRedisPipeline":
+        return FakeRedisPipeline(self)
+
+    def ping(self) -> bool:
+        return True
+
+    def close(self):
+        pass
+
+
+class FakeRedisPipeline:
+    """Queues commands and runs them together, like a MULTI/EXEC transaction"""
+
+    def __init__(self, client: FakeRedis):
+        self.client = client
+        self._commands = []
+
+    def __getattr__(self, name):
+        command = getattr(self.client, name)
+        return lambda *args, **kwargs: self._commands.append(partial(command, *args, **kwargs))
+
+    def execute(self) -> list:
+        with self.client._lock:
+            results = [command() for command in self._commands]
+        self._commands = []
+        return results
+
+
+def install_fakes(model_latency: float = 0.5, bigquery_latency: float = 0.2, jitter: float = 0.0,
+                  bigquery_rows: Sequence[Dict] = (), seed: int = 0,
+                  model_faults: Optional[FaultInjector] = None, bigquery_faults: Optional[FaultInjector] = None):
+    """
+    Point clients.py and evidence_store.py at the fakes (call before the first
+    request). Returns the client manager.
+    """
+    from clients import ClientManager, set_client_manager
+    from evidence_store import EvidenceStore, set_evidence_store
+
+    model_factory = partial(FakeGenerativeModel, latency=Latency(model_latency, jitter, seed), faults=model_faults)
+    bigquery_client = FakeBigQueryClient(rows=bigquery_rows, latency=Latency(bigquery_latency, jitter, seed + 1),
+                                         faults=bigquery_faults)
+    manager = ClientManager(project="benchmark", model_factory=model_factory,
+                            bigquery_factory=lambda project: bigquery_client)
+    set_client_manager(manager)
+    set_evidence_store(EvidenceStore(client=bigquery_client))
+    return manager
@@ -0,0 +1,180 @@
+"""
+Closed-loop load generator and measurement for the benchmarks
+`concurrency` workers each run operations back to back until `operations`
+have completed; per-operation latency, throughput and process memory
+(resident set size, sampled while the scenario runs) are reported.
+"""
+
+import math
+import os
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+MEMORY_SAMPLE_INTERVAL = 0.05
+
+
+def rss_mb() -> float:
+    """Current resident set size in MiB (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if peak > 1 << 32 else peak / 1024
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class MemorySampler:
+    """Samples RSS on a background thread for the duration of a with-block"""
+
+    def __init__(self, interval: float = MEMORY_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.start_mb = self.end_mb = self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, rss_mb())
+
+    def __enter__(self):
+        self.start_mb = self.peak_mb = rss_mb()
+        self._thread = threading.Thread(target=self._run, name="benchmark-memory", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.end_mb = rss_mb()
+        self.peak_mb = max(self.peak_mb, self.end_mb)
+        return False
+
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    rows: int
+    operations: int
+    items_per_operation: int
+    concurrency: int
+    seconds: float
+    errors: int
+    latencies_ms: List[float] = field(default_factory=list, repr=False)
+    rss_start_mb: float = 0.0
+    rss_end_mb: float = 0.0
+    rss_peak_mb: float = 0.0
+    stages: Dict = field(default_factory=dict)
+
+    @property
+    def ops_per_second(self) -> float:
+        return self.operations / self.seconds if self.seconds else 0.0
+
+    @property
+    def items_per_second(self) -> float:
+        return self.ops_per_second * self.items_per_operation
+
+    def latency(self, q: float) -> Optional[float]:
+        return percentile(sorted(self.latencies_ms), q)
+
+    def summary(self) -> Dict:
+        data = asdict(self)
+        data.pop('latencies_ms')
+        data.update({
+            'ops_per_second': round(self.ops_per_second, 2),
+            'items_per_second': round(self.items_per_second, 2),
+            'p50_ms': _round(self.latency(0.50)),
+            'p95_ms': _round(self.latency(0.95)),
+            'p99_ms': _round(self.latency(0.99)),
+            'max_ms': _round(max(self.latencies_ms) if self.latencies_ms else None),
+            'rss_start_mb': round(self.rss_start_mb, 1),
+            'rss_end_mb': round(self.rss_end_mb, 1),
+            'rss_peak_mb': round(self.rss_peak_mb, 1),
+        })
+        return data
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+
+def run_load(scenario: str, operation: Callable[[int], None], operations: int, concurrency: int = 1,
+             rows: int = 0, items_per_operation: int = 1, warmup: int = 0) -> ScenarioResult:
+    """
+    Call operation(i) for i in range(operations) on `concurrency` threads.
+    `warmup` extra calls run first and are not measured.
+    """
+    for i in range(warmup):
+        operation(operations + i)
+
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    counter = iter(range(operations))
+
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            started = time.perf_counter()
+            try:
+                operation(i)
+            except Exception as e:
+                with lock:
+                    errors[0] += 1
+                    if errors[0] <= 3:
+                        print(f"⚠️ {scenario} operation {i} failed: {e}", file=sys.stderr)
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed)
+
+    with MemorySampler() as memory:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"bench-{scenario}") as pool:
+            for future in [pool.submit(worker) for _ in range(concurrency)]:
+                future.result()
+        seconds = time.perf_counter() - started
+
+    return ScenarioResult(
+        scenario=scenario, rows=rows, operations=operations, items_per_operation=items_per_operation,
+        concurrency=concurrency, seconds=round(seconds, 3), errors=errors[0], latencies_ms=latencies,
+        rss_start_mb=memory.start_mb, rss_end_mb=memory.end_mb, rss_peak_mb=memory.peak_mb
+    )
+
+
+def format_table(results: Sequence[ScenarioResult]) -> str:
+    header = (f"{'scenario':<10} {'rows':>9} {'ops':>6} {'conc':>4} {'ops/s':>9} {'items/s':>9} "
+              f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'err':>4} {'rss MiB':>9} {'peak':>8}")
+    lines = [header, '-' * len(header)]
+    for result in results:
+        s = result.summary()
+        lines.append(
+            f"{s['scenario']:<10} {s['rows']:>9,} {s['operations']:>6} {s['concurrency']:>4} "
+            f"{s['ops_per_second']:>9.1f} {s['items_per_second']:>9.1f} "
+            f"{_fmt(s['p50_ms'])} {_fmt(s['p95_ms'])} {_fmt(s['p99_ms'])} {s['errors']:>4} "
+            f"{s['rss_end_mb']:>9.1f} {s['rss_peak_mb']:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+def _fmt(value: Optional[float]) -> str:
+    return f"{value:>9.1f}" if value is not None else f"{'-':>9}"
@@ -0,0 +1,232 @@
+"""
+Echo Mind benchmark runner
+
+Scenarios (each run against a fresh copy of a synthetic corpus):
+  search   - database_helper.search_fact_checks_batch for one query
+  ingest   - bulk_add_fact_checks of one chunk of new rows
+  request  - POST /analyze end to end (fake model and BigQuery)
+  batch    - POST /analyze/batch with --batch-size claims
+
+Usage:
+  python -m benchmarks.run                                   - All scenarios on the 1k corpus
+  python -m benchmarks.run --sizes 1k 100k 1m --scenarios search ingest
+  python -m benchmarks.run --scenarios request --model-latency 1.5 --concurrency 32
+  python -m benchmarks.run --scenarios request --fault-rate 0.2 --stall-rate 0.05  - With injected faults
+  python -m benchmarks.run --url http://localhost:8080 --scenarios request batch
+  python -m benchmarks.run --json results.json               - Also write the results as JSON
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from pathlib import Path
+
+from benchmarks import corpus
+from benchmarks.load import format_table, run_load
+
+SCENARIOS = ('search', 'ingest', 'request', 'batch')
+# Claim numbers for request traffic, far from the stored rows so every claim is new
+REQUEST_OFFSET = 5_000_000
+BATCH_OFFSET = 5_600_000
+
+
+def _configure_environment():
+    """Settings that must be in place before the app modules are imported"""
+    corpus.DATA_DIR.mkdir(parents=True, exist_ok=True)
+    # Never read or write the repository's own claim index snapshot
+    os.environ.setdefault('ECHO_MIND_CLAIM_INDEX', str(corpus.DATA_DIR / "claim-index-unused.json"))
+    os.environ.setdefault('ECHO_MIND_RATE_LIMIT_BACKEND', 'memory')
+    os.environ.setdefault('ECHO_MIND_DB_PATH', str(corpus.DATA_DIR / "startup.db"))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Echo Mind with local stand-ins for Vertex AI and BigQuery")
+    parser.add_argument('--sizes', nargs='+', default=['1k'], help="Corpus sizes: 1k, 100k, 1m or a row count")
+    parser.add_argument('--scenarios', nargs='+', default=list(SCENARIOS), choices=SCENARIOS)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--search-queries', type=int, default=1000)
+    parser.add_argument('--ingest-chunks', type=int, default=20)
+    parser.add_argument('--ingest-chunk-size', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--repeat-ratio', type=float, default=0.0,
+                        help="Share of /analyze requests that repeat an earlier claim (cache hits)")
+    parser.add_argument('--batches', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=20)
+    parser.add_argument('--model-latency', type=float, default=0.5, help="Fake model seconds per call")
+    parser.add_argument('--bigquery-latency', type=float, default=0.2, help="Fake BigQuery seconds per job")
+    parser.add_argument('--jitter', type=float, default=0.1, help="Extra seeded random latency, seconds")
+    parser.add_argument('--fault-rate', type=float, default=0.0,
+                        help="Share of fake model and BigQuery calls that fail with a transient error")
+    parser.add_argument('--stall-rate', type=float, default=0.0,
+                        help="Share of fake model and BigQuery calls that stall for --stall seconds")
+    parser.add_argument('--stall', type=float, default=5.0)
+    parser.add_argument('--bigquery-table-rows', type=int, default=2000,
+                        help="Rows of the corpus served by the fake BigQuery table")
+    parser.add_argument('--url', help="Benchmark a running server over HTTP instead of in-process")
+    parser.add_argument('--api-key', default=os.environ.get('ECHO_MIND_API_KEY'))
+    parser.add_argument('--json', dest='json_path', help="Write results to this JSON file")
+    parser.add_argument('--verbose', action='store_true', help="Show the app's own log output")
+    return parser.parse_args(argv)
+
+
+class Target:
+    """Posts to the app in-process (Flask test client) or to a server over HTTP"""
+
+    def __init__(self, url=None, api_key=None):
+        self.url = url.rstrip('/') if url else None
+        self._local = threading.local()
+        if self.url:
+            self.api_key = api_key
+        else:
+            import app
+            self.app = app.app
+            self.api_key = api_key or app.API_KEY
+
+    def post(self, path, payload):
+        headers = {'X-API-Key': self.api_key or '', 'X-Session-Id': 'benchmark-session'}
+        if self.url:
+            session = getattr(self._local, 'session', None)
+            if session is None:
+                import requests
+                session = self._local.session = requests.Session()
+            response = session.post(self.url + path, json=payload, headers=headers, timeout=300)
+            body = response.content
+            status = response.status_code
+        else:
+            client = getattr(self._local, 'client', None)
+            if client is None:
+                client = self._local.client = self.app.test_client()
+            response = client.post(path, json=payload, headers=headers)
+            body = response.get_data()
+            status = response.status_code
+        if status != 200:
+            raise RuntimeError(f"{path} returned HTTP {status}: {body[:200]!r}")
+        return body
+
+
+def prepare_corpus(rows, args):
+    """Point the app at a fresh copy of the corpus and reset per-process state"""
+    import claim_similarity
+    import database_helper
+    from claim_cache import get_claim_cache
+    from benchmarks.fakes import FaultInjector, install_fakes
+    from rate_limiter import MemoryBackend, RateLimiter, set_rate_limiter
+    from write_behind import get_write_behind
+
+    # Writes queued by the previous corpus belong to its database
+    get_write_behind().flush()
+    database_helper.configure_database(corpus.working_copy(rows, args.seed))
+    claim_similarity._claim_index = None
+    get_claim_cache().clear()
+    set_rate_limiter(RateLimiter(MemoryBackend(), limit=10 ** 9))
+    install_fakes(
+        model_latency=args.model_latency, bigquery_latency=args.bigquery_latency, jitter=args.jitter,
+        bigquery_rows=list(corpus.generate_fact_checks(min(rows, args.bigquery_table_rows), seed=args.seed)),
+        seed=args.seed,
+        model_faults=FaultInjector(args.fault_rate, args.stall_rate, args.stall, seed=args.seed + 2),
+        bigquery_faults=FaultInjector(args.fault_rate, args.stall_rate, args.stall, seed=args.seed + 3)
+    )
+
+
+def run_scenario(name, rows, args, target):
+    if name == 'search':
+        from database_helper import search_fact_checks_batch
+        queries = corpus.search_queries(args.search_queries, args.seed)
+        return run_load(name, lambda i: search_fact_checks_batch([queries[i % len(queries)]], 3),
+                        len(queries), args.concurrency, rows, warmup=min(20, len(queries)))
+
+    if name == 'ingest':
+        from database_helper import bulk_add_fact_checks
+        size = args.ingest_chunk_size
+
+        def ingest(i):
+            stats = bulk_add_fact_checks(list(corpus.generate_fact_checks(size, start=rows + i * size, seed=args.seed)))
+            if stats.get('inserted') != size:
+                raise RuntimeError(f"inserted {stats.get('inserted')} of {size} rows")
+
+        # Writers serialize on SQLite's lock; one writer shows the per-chunk cost
+        return run_load(name, ingest, args.ingest_chunks, 1, rows, items_per_operation=size)
+
+    def claim(offset, i):
+        repeat = args.repeat_ratio and (i * 37 % 100) < args.repeat_ratio * 100
+        return corpus.claim_text(offset + (i // 2 if repeat else i), args.seed)
+
+    if name == 'request':
+        return run_load(name, lambda i: target.post('/analyze', {'claim': claim(REQUEST_OFFSET, i)}),
+                        args.requests, args.concurrency, rows)
+
+    if name == 'batch':
+        def batch(i):
+            claims = [claim(BATCH_OFFSET, i * args.batch_size + j) for j in range(args.batch_size)]
+            lines = target.post('/analyze/batch', {'claims': claims}).splitlines()
+            if len(lines) != len(claims):
+                raise RuntimeError(f"got {len(lines)} results for {len(claims)} claims")
+
+        return run_load(name, batch, args.batches, args.concurrency, rows, items_per_operation=args.batch_size)
+
+    raise ValueError(f"Unknown scenario: {name}")
+
+
+def _app_output(verbose):
+    """The app logs with print(); keep it out of the report unless asked for"""
+    return contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    _configure_environment()
+    import metrics
+
+    results = []
+    target = None
+    for size in args.sizes:
+        rows = corpus.parse_size(size)
+        corpus.build_corpus(rows, args.seed)
+        with _app_output(args.verbose):
+            prepare_corpus(rows, args)
+            if target is None:
+                target = Target(args.url, args.api_key)
+        for name in args.scenarios:
+            if args.url and name in ('search', 'ingest'):
+                continue  # in-process only
+            metrics.reset()
+            print(f"▶ {name} on {rows:,} rows...", file=sys.stderr)
+            with _app_output(args.verbose):
+                result = run_scenario(name, rows, args, target)
+            if not args.url:
+                result.stages = metrics.snapshot()['echo_mind_stage_seconds']
+            results.append(result)
+
+    if 'analysis_engine' in sys.modules:
+        # Let evidence lookups and queued writes finish (and log) before the report
+        with _app_output(args.verbose):
+            sys.modules['analysis_engine'].shutdown(wait=True)
+
+    print(format_table(results))
+    for result in results:
+        if result.stages:
+            stages = ", ".join(f"{stage} p50 {s['p50'] * 1000:.1f}ms" for stage, s in result.stages.items() if s['p50'] is not None)
+            print(f"  {result.scenario}/{result.rows:,}: {stages}")
+
+    if args.json_path:
+        report = {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'config': vars(args),
+            'results': [result.summary() for result in results]
+        }
+        Path(args.json_path).write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.json_path}")
+    return results
+
+
+if __name__ == '__main__':
+    main()
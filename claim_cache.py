@@ -0,0 +1,179 @@
+"""
+Claim result cache for analyze_claim
+Keyed on the normalized claim text plus a version of the current context data,
+with an in-memory LRU tier and an optional SQLite tier shared across workers.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from metrics import CACHE_LOOKUPS
+from text_utils import claim_hash
+
+# Cache configuration (override with environment variables)
+CACHE_TTL_SECONDS = int(os.environ.get('ECHO_MIND_CACHE_TTL', 6 * 3600))
+CACHE_MAX_ENTRIES = int(os.environ.get('ECHO_MIND_CACHE_SIZE', 2048))
+CACHE_SQLITE_ENABLED = os.environ.get('ECHO_MIND_CACHE_SQLITE', '0').lower() in ('1', 'true', 'yes')
+
+
+def make_cache_key(claim: str, context_version: str = "") -> str:
+    """Cache key for a claim under a given context version"""
+    return f"{context_version}:{claim_hash(claim)}"
+
+
+class MemoryCache:
+    """Thread-safe LRU cache with a per-entry TTL"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict, ttl: Optional[float] = None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """Persistent cache tier stored in the claim_cache table of factchecks.db"""
+
+    def __init__(self, ttl: float = CACHE_TTL_SECONDS):
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[Dict]:
+        from database_helper import database_connection
+        try:
+            with database_connection() as conn:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM claim_cache WHERE cache_key = ?", (key,)
+                ).fetchone()
+            if row is None or row['expires_at'] < time.time():
+                return None
+            return json.loads(row['value'])
+        except Exception as e:
+            print(f"Claim cache read error: {e}")
+            return None
+
+    def entry(self, key: str, value: Dict, ttl: Optional[float] = None) -> Tuple[str, str, float]:
+        """Row for write_cache_entries, expiring `ttl` seconds from now"""
+        return key, json.dumps(value), time.time() + (self.ttl if ttl is None else ttl)
+
+    def set(self, key: str, value: Dict, ttl: Optional[float] = None):
+        try:
+            write_cache_entries([self.entry(key, value, ttl)])
+        except Exception as e:
+            print(f"Claim cache write error: {e}")
+
+    def purge_expired(self) -> int:
+        from database_helper import database_connection
+        with database_connection() as conn:
+            deleted = conn.execute("DELETE FROM claim_cache WHERE expires_at < ?", (time.time(),)).rowcount
+            conn.commit()
+        return deleted
+
+    def clear(self):
+        from database_helper import database_connection
+        with database_connection() as conn:
+            conn.execute("DELETE FROM claim_cache")
+            conn.commit()
+
+
+def write_cache_entries(entries: List[Tuple[str, str, float]]):
+    """Store (cache_key, json_value, expires_at) rows in one transaction"""
+    from database_helper import database_connection
+    with database_connection() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO claim_cache (cache_key, value, expires_at) VALUES (?, ?, ?)", entries
+        )
+        conn.commit()
+
+
+class ClaimCache:
+    """
+    Two-tier claim cache: lookups hit memory first, then SQLite (if enabled),
+    promoting SQLite hits back into memory.
+    """
+
+    def __init__(self, memory: Optional[MemoryCache] = None, persistent: Optional[SQLiteCache] = None):
+        self.memory = memory or MemoryCache()
+        self.persistent = persistent
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        tier = "memory"
+        value = self.memory.get(key)
+        if value is None and self.persistent is not None:
+            tier = "sqlite"
+            value = self.persistent.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        if value is None:
+            self.misses += 1
+            CACHE_LOOKUPS.inc(result="miss")
+        else:
+            self.hits += 1
+            CACHE_LOOKUPS.inc(result=tier)
+        return value
+
+    def set(self, key: str, value: Dict):
+        self.memory.set(key, value)
+        if self.persistent is not None:
+            # The memory tier already answers repeats in this worker; the shared tier can lag
+            from write_behind import get_write_behind
+            get_write_behind().submit('cache', self.persistent.entry(key, value))
+
+    def clear(self):
+        self.memory.clear()
+        if self.persistent is not None:
+            self.persistent.clear()
+
+    def stats(self) -> Dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'memory_entries': len(self.memory),
+            'sqlite_enabled': self.persistent is not None
+        }
+
+
+_claim_cache: Optional[ClaimCache] = None
+_claim_cache_lock = threading.Lock()
+
+
+def get_claim_cache() -> ClaimCache:
+    """Process-wide claim cache configured from the environment"""
+    global _claim_cache
+    if _claim_cache is None:
+        with _claim_cache_lock:
+            if _claim_cache is None:
+                _claim_cache = ClaimCache(persistent=SQLiteCache() if CACHE_SQLITE_ENABLED else None)
+    return _claim_cache
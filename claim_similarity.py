@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate claim detection for Echo Mind
+A MinHash/LSH index over claims stored in fact_checks, so reworded viral
+claims ("5G towers spread covid" / "covid is spread by 5G towers") can reuse a
+stored verdict instead of a new model call.
+
+Usage:
+  python claim_similarity.py rebuild   - Rebuild the index snapshot from the database
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from text_utils import normalize_claim
+
+# Similarity configuration (override with environment variables)
+NEAR_DUPLICATE_ENABLED = os.environ.get('ECHO_MIND_NEAR_DUP_ENABLED', '1').lower() in ('1', 'true', 'yes')
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get('ECHO_MIND_NEAR_DUP_THRESHOLD', 0.8))
+INDEX_SNAPSHOT_PATH = Path(os.environ.get('ECHO_MIND_CLAIM_INDEX', Path(__file__).parent / "claim_index.json"))
+
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16  # 16 bands x 4 rows: pairs above ~0.5 Jaccard become candidates
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Verdicts that are worth reusing for another claim
+REUSABLE_VERDICTS = {'Trustworthy', 'Suspicious', 'False', 'Mixed'}
+
+# Filler words dropped before comparison (negations are kept - they flip a claim)
+SIMILARITY_STOP_WORDS = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'by', 'of', 'in', 'on', 'at', 'to', 'for', 'with', 'from', 'that', 'this', 'it', 'its',
+    'as', 'has', 'have', 'had', 'do', 'does', 'did', 'will', 'would', 'can', 'could', 'so',
+    'very', 'really', 'just', 'also', 'which', 'who', 'what'
+}
+
+
+def claim_tokens(text: str) -> FrozenSet[str]:
+    """Order-independent token set of a claim, with stop words and plural 's' removed"""
+    tokens = set()
+    for word in normalize_claim(text).split():
+        if word in SIMILARITY_STOP_WORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        tokens.add(word)
+    return frozenset(tokens)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """Deterministic MinHash signatures using universal hashing"""
+
+    def __init__(self, num_permutations: int = NUM_PERMUTATIONS, seed: int = 1):
+        rng = random.Random(seed)
+        self.permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_permutations)
+        ]
+
+    @staticmethod
+    def _token_hash(token: str) -> int:
+        return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+    def signature(self, tokens: FrozenSet[str]) -> Tuple[int, ...]:
+        hashes = [self._token_hash(t) for t in tokens] or [0]
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self.permutations
+        )
+
+
+class ClaimIndex:
+    """
+    MinHash/LSH index of stored claims. Candidates share at least one LSH band;
+    they are confirmed with the exact Jaccard similarity of their token sets.
+    """
+
+    def __init__(self, num_permutations: int = NUM_PERMUTATIONS, bands: int = LSH_BANDS):
+        if num_permutations % bands:
+            raise ValueError("num_permutations must be divisible by bands")
+        self.hasher = MinHasher(num_permutations)
+        self.bands = bands
+        self.rows_per_band = num_permutations // bands
+        self.max_id = 0
+        self._tokens: Dict[int, FrozenSet[str]] = {}
+        self._buckets = [defaultdict(set) for _ in range(bands)]
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        r = self.rows_per_band
+        return [signature[i * r:(i + 1) * r] for i in range(self.bands)]
+
+    def add(self, row_id: int, claim: str, tokens: Optional[FrozenSet[str]] = None):
+        if tokens is None:
+            tokens = claim_tokens(claim)
+        if not tokens:
+            return
+        signature = self.hasher.signature(tokens)
+        with self._lock:
+            self._tokens[row_id] = tokens
+            for band, key in zip(self._buckets, self._band_keys(signature)):
+                band[key].add(row_id)
+            self.max_id = max(self.max_id, row_id)
+
+    def query(self, claim: str, threshold: float = NEAR_DUPLICATE_THRESHOLD) -> Optional[Tuple[int, float]]:
+        """Return (row_id, similarity) of the most similar indexed claim above threshold"""
+        tokens = claim_tokens(claim)
+        if not tokens:
+            return None
+        signature = self.hasher.signature(tokens)
+        with self._lock:
+            candidates = set()
+            for band, key in zip(self._buckets, self._band_keys(signature)):
+                candidates.update(band.get(key, ()))
+            best = None
+            for row_id in candidates:
+                similarity = jaccard(tokens, self._tokens[row_id])
+                # Prefer the newest row on ties - it reflects the latest context
+                if similarity >= threshold and (best is None or (similarity, row_id) > (best[1], best[0])):
+                    best = (row_id, similarity)
+        return best
+
+    def add_rows_from_database(self, after_id: int = 0) -> int:
+        """Index fact_checks rows with id > after_id; returns the number added"""
+        from database_helper import database_connection
+        placeholders = ', '.join('?' for _ in REUSABLE_VERDICTS)
+        with database_connection() as conn:
+            rows = conn.execute(
+                f"SELECT id, claim FROM fact_checks WHERE id > ? AND verdict IN ({placeholders}) ORDER BY id",
+                (after_id, *REUSABLE_VERDICTS)
+            ).fetchall()
+        for row in rows:
+            self.add(row['id'], row['claim'])
+        return len(rows)
+
+    def save(self, path: Path = INDEX_SNAPSHOT_PATH):
+        """Write a snapshot (token sets + max_id) that can be reloaded without re-reading every row"""
+        with self._lock:
+            data = {
+                'max_id': self.max_id,
+                'num_permutations': len(self.hasher.permutations),
+                'bands': self.bands,
+                'claims': {str(k): sorted(v) for k, v in self._tokens.items()}
+            }
+        tmp_path = Path(str(path) + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path = INDEX_SNAPSHOT_PATH) -> 'ClaimIndex':
+        with open(path, 'r') as f:
+            data = json.load(f)
+        index = cls(data['num_permutations'], data['bands'])
+        for row_id, tokens in data['claims'].items():
+            index.add(int(row_id), '', tokens=frozenset(tokens))
+        index.max_id = data['max_id']
+        return index
+
+
+def build_index_from_database(path: Optional[Path] = INDEX_SNAPSHOT_PATH) -> ClaimIndex:
+    """Offline rebuild: index every reusable row and (optionally) write a snapshot"""
+    index = ClaimIndex()
+    index.add_rows_from_database()
+    if path is not None:
+        index.save(path)
+    return index
+
+
+_claim_index: Optional[ClaimIndex] = None
+_claim_index_lock = threading.Lock()
+
+
+def _on_fact_check_inserted(row_id: int, claim: str, verdict: str, source: str):
+    if _claim_index is not None and verdict in REUSABLE_VERDICTS:
+        _claim_index.add(row_id, claim)
+
+
+def get_claim_index() -> ClaimIndex:
+    """
+    Process-wide index: loaded from the snapshot when present (then caught up
+    with newer rows), otherwise built from the database. New inserts are
+    indexed incrementally through a database_helper insert listener.
+    """
+    global _claim_index
+    if _claim_index is None:
+        with _claim_index_lock:
+            if _claim_index is None:
+                from database_helper import register_insert_listener
+                index = None
+                if INDEX_SNAPSHOT_PATH.exists():
+                    try:
+                        index = ClaimIndex.load(INDEX_SNAPSHOT_PATH)
+                    except Exception as e:
+                        print(f"Warning: Could not load claim index snapshot: {e}")
+                if index is None:
+                    index = ClaimIndex()
+                index.add_rows_from_database(after_id=index.max_id)
+                _claim_index = index
+                register_insert_listener(_on_fact_check_inserted)
+    return _claim_index
+
+
+def find_similar_claim(claim: str, threshold: float = NEAR_DUPLICATE_THRESHOLD) -> Optional[Dict]:
+    """
+    Look up a stored fact-check that is a near-duplicate of the claim.
+    Returns the stored row plus its similarity, or None.
+    """
+    if not NEAR_DUPLICATE_ENABLED or not claim or not claim.strip():
+        return None
+    try:
+        match = get_claim_index().query(claim, threshold)
+        if match is None:
+            return None
+        row_id, similarity = match
+        from database_helper import database_connection
+        with database_connection() as conn:
+            row = conn.execute(
+                "SELECT id, claim, verdict, source, url, explanation, score FROM fact_checks WHERE id = ?",
+                (row_id,)
+            ).fetchone()
+        # Rows indexed before a failed analysis overwrote their verdict
+        if row is None or row['verdict'] not in REUSABLE_VERDICTS:
+            return None
+        result = dict(row)
+        result['similarity'] = round(similarity, 3)
+        return result
+    except Exception as e:
+        print(f"Near-duplicate lookup error: {e}")
+        return None
+
+
+def main():
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == 'rebuild':
+        index = build_index_from_database()
+        print(f"✅ Indexed {len(index)} claims (max id {index.max_id}) -> {INDEX_SNAPSHOT_PATH}")
+    else:
+        print("Usage: python claim_similarity.py rebuild")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Process-wide Google Cloud clients for Echo Mind
+Vertex AI is initialized and each GenerativeModel / the BigQuery client is
+created once per process, on first use or by warm() at startup, so their
+HTTP/gRPC channels are reused across requests. The Google SDKs are only
+imported when a client is first needed.
+
+Tests can swap in local fakes:
+    set_client_manager(ClientManager(model_factory=FakeModel, bigquery_factory=FakeClient))
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+PROJECT_ID = os.environ.get('ECHO_MIND_PROJECT_ID', "echo-mind-472808")
+LOCATION = os.environ.get('ECHO_MIND_LOCATION', "asia-south1")  # Mumbai, India - Better for Indian context and reduced latency
+GEMINI_MODEL = "gemini-2.5-pro"  # Using Gemini 2.5 Pro for enhanced fact-checking capabilities
+
+# Warm-up sends a count_tokens request so the model's gRPC channel is open before the first claim
+WARMUP_PING = os.environ.get('ECHO_MIND_WARMUP_PING', '1').lower() in ('1', 'true', 'yes')
+
+
+def _default_model_factory(model_name: str, **kwargs):
+    from vertexai.generative_models import GenerativeModel
+    return GenerativeModel(model_name, **kwargs)
+
+
+def _default_bigquery_factory(project: str):
+    from google.cloud import bigquery
+    return bigquery.Client(project=project)
+
+
+class ClientManager:
+    """
+    Lazily created, shared model and BigQuery clients.
+    Pass `model_factory` / `bigquery_factory` to use stand-ins (e.g. in tests);
+    Vertex AI is only initialized when the default model factory is used.
+    """
+
+    def __init__(self, project: str = PROJECT_ID, location: str = LOCATION,
+                 model_factory: Optional[Callable] = None, bigquery_factory: Optional[Callable] = None):
+        self.project = project
+        self.location = location
+        self._model_factory = model_factory or _default_model_factory
+        self._bigquery_factory = bigquery_factory or _default_bigquery_factory
+        self._uses_vertex = model_factory is None
+        self._vertex_initialized = False
+        self._models: Dict[tuple, object] = {}
+        self._bigquery = None
+        self._lock = threading.RLock()
+        self._ready = threading.Event()
+        self._warmup_thread = None
+        self.warmup_seconds: Optional[float] = None
+        self.warmup_error: Optional[str] = None
+
+    def _init_vertex(self):
+        if self._vertex_initialized or not self._uses_vertex:
+            return
+        import vertexai
+        vertexai.init(project=self.project, location=self.location)
+        self._vertex_initialized = True
+        print(f"✅ Vertex AI initialized for project: {self.project}")
+
+    def model(self, model_name: str = GEMINI_MODEL, **kwargs):
+        """Shared GenerativeModel for this name and constructor arguments"""
+        key = (model_name, repr(sorted(kwargs.items())))
+        model = self._models.get(key)
+        if model is None:
+            with self._lock:
+                model = self._models.get(key)
+                if model is None:
+                    self._init_vertex()
+                    model = self._model_factory(model_name, **kwargs)
+                    self._models[key] = model
+        return model
+
+    def bigquery(self):
+        """Shared BigQuery client"""
+        if self._bigquery is None:
+            with self._lock:
+                if self._bigquery is None:
+                    self._bigquery = self._bigquery_factory(self.project)
+        return self._bigquery
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def warm(self, model_name: str = GEMINI_MODEL, bigquery: bool = True, preload: Sequence[str] = (),
+             model_kwargs: Optional[Dict] = None):
+        """
+        Create the clients (and open the model channel) ahead of the first
+        request, after importing any `preload` modules. `model_kwargs` must
+        match what requests pass to model() so the same instance is warmed.
+        """
+        from startup import timed, timed_import
+        started = time.monotonic()
+        try:
+            for module_name in preload:
+                timed_import(module_name)
+            with timed("create model client"):
+                model = self.model(model_name, **(model_kwargs or {}))
+            if WARMUP_PING and hasattr(model, 'count_tokens'):
+                with timed("model channel ping"):
+                    model.count_tokens("ping")
+            if bigquery:
+                with timed("create BigQuery client"):
+                    self.bigquery()
+            self.warmup_error = None
+        except Exception as e:
+            # Requests still create whatever is missing on first use
+            self.warmup_error = str(e)
+            print(f"⚠️ Client warm-up failed: {e}")
+        finally:
+            self.warmup_seconds = round(time.monotonic() - started, 3)
+            self._ready.set()
+
+    def start_warmup(self, **kwargs):
+        """Run warm() on a daemon thread so startup isn't blocked on the network"""
+        with self._lock:
+            if self._warmup_thread is not None:
+                return
+            self._warmup_thread = threading.Thread(
+                target=self.warm, kwargs=kwargs, name="client-warmup", daemon=True)
+            self._warmup_thread.start()
+
+    def status(self) -> Dict:
+        return {
+            'ready': self.ready,
+            'warmup_seconds': self.warmup_seconds,
+            'warmup_error': self.warmup_error,
+            'models': len(self._models),
+            'bigquery': self._bigquery is not None
+        }
+
+
+_client_manager: Optional[ClientManager] = None
+_client_manager_lock = threading.Lock()
+
+
+def get_client_manager() -> ClientManager:
+    """Process-wide client manager"""
+    global _client_manager
+    if _client_manager is None:
+        with _client_manager_lock:
+            if _client_manager is None:
+                _client_manager = ClientManager()
+    return _client_manager
+
+
+def set_client_manager(manager: Optional[ClientManager]):
+    """Replace the process-wide manager (e.g. with one built from local fakes)"""
+    global _client_manager
+    with _client_manager_lock:
+        _client_manager = manager
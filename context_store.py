@@ -0,0 +1,98 @@
+"""
+Memoized loader for current_context.json
+The auto-updater rewrites the file at most a few times a day, so it is parsed
+once and reloaded only when its mtime/size changes. Per-category, date-sorted
+views are built at load time instead of on every request.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+CONTEXT_FILE = os.environ.get('ECHO_MIND_CONTEXT_FILE', 'current_context.json')
+
+
+class ContextSnapshot:
+    """One parsed version of the context file plus its pre-built views"""
+
+    def __init__(self, data: Dict, file_stamp=None):
+        self.data = data
+        self.file_stamp = file_stamp
+        # Version stamp written by the auto-updater; falls back to the file stamp
+        self.version = data.get('last_updated') or (f"{file_stamp[0]}:{file_stamp[1]}" if file_stamp else "")
+
+        # category -> updates, newest first
+        self.updates_by_category: Dict[str, List[Dict]] = {
+            category: sorted(updates.values(), key=lambda u: u.get('date', ''), reverse=True)
+            for category, updates in data.get('categorized_updates', {}).items()
+        }
+        self.political_updates: Dict[str, Dict] = {
+            key: update for key, update in data.get('comprehensive_updates', {}).items()
+            if update.get('category') == 'politics' or update.get('type', '').endswith('_update')
+        }
+        self.trusted_source_count = len(data.get('trusted_sources', []))
+
+
+_EMPTY_SNAPSHOT = ContextSnapshot({})
+
+
+class ContextStore:
+    """Thread-safe, mtime-aware cache of the auto-updater context file"""
+
+    def __init__(self, path: str = CONTEXT_FILE):
+        self.path = path
+        self._snapshot = _EMPTY_SNAPSHOT
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def snapshot(self) -> ContextSnapshot:
+        """The current context, re-parsed only if the file changed since the last load"""
+        stamp = self._stat()
+        snapshot = self._snapshot
+        if stamp == snapshot.file_stamp:
+            return snapshot
+        with self._lock:
+            if stamp == self._snapshot.file_stamp:
+                return self._snapshot
+            if stamp is None:
+                self._snapshot = _EMPTY_SNAPSHOT
+                return self._snapshot
+            try:
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                self._snapshot = ContextSnapshot(data, stamp)
+                self.loads += 1
+            except Exception as e:
+                # Keep serving the last good data; retry once the file changes again
+                print(f"Warning: Could not load current context: {e}")
+                self._snapshot = ContextSnapshot(self._snapshot.data, stamp)
+            return self._snapshot
+
+    def get(self) -> Dict:
+        return self.snapshot().data
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = _EMPTY_SNAPSHOT
+
+
+_context_store: Optional[ContextStore] = None
+_context_store_lock = threading.Lock()
+
+
+def get_context_store() -> ContextStore:
+    """Process-wide context store"""
+    global _context_store
+    if _context_store is None:
+        with _context_store_lock:
+            if _context_store is None:
+                _context_store = ContextStore()
+    return _context_store
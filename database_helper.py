@@ -1,18 +1,35 @@
+import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+from text_utils import claim_hash
 
 # Database file path
-DB_PATH = Path(__file__).parent / "factchecks.db"
+DB_PATH = Path(os.environ.get('ECHO_MIND_DB_PATH', Path(__file__).parent / "factchecks.db"))
 
-def get_database_connection():
-    """Get a connection to the SQLite database"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row  # Enable column access by name
-    
-    # Create table if it doesn't exist
-    cursor = conn.cursor()
-    cursor.execute("""
+# Connection pool and SQLite tuning (override with environment variables)
+POOL_SIZE = int(os.environ.get('ECHO_MIND_SQLITE_POOL_SIZE', 8))
+POOL_TIMEOUT = float(os.environ.get('ECHO_MIND_SQLITE_POOL_TIMEOUT', 10))
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('ECHO_MIND_SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('ECHO_MIND_SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'cache_size': int(os.environ.get('ECHO_MIND_SQLITE_CACHE_SIZE', -16000)),  # negative = KiB
+    'mmap_size': int(os.environ.get('ECHO_MIND_SQLITE_MMAP_SIZE', 128 * 1024 * 1024)),
+    'busy_timeout': int(os.environ.get('ECHO_MIND_SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    'temp_store': 'MEMORY',
+}
+
+# Verdicts of failed analyses: never stored, and never allowed to replace a stored verdict
+UNSTORED_VERDICTS = ('Error', 'NoText', 'Unknown')
+_UNSTORED_SQL = ', '.join(f"'{v}'" for v in UNSTORED_VERDICTS)
+
+
+def _create_base_tables(conn):
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS fact_checks (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             claim TEXT NOT NULL,
@@ -23,176 +40,677 @@ def get_database_connection():
             created_at DATETIME DEFAULT CURRENT_TIMESTAMP
         )
     """)
-    conn.commit()
-    
+
+
+def _create_fts_index(conn):
+    """FTS5 index over claim + explanation, kept in sync with fact_checks by triggers"""
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS fact_checks_fts USING fts5(
+                claim, explanation,
+                content='fact_checks', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        # SQLite built without FTS5 - searches fall back to LIKE
+        print(f"Warning: full-text index unavailable: {e}")
+        return
+    conn.executescript("""
+        CREATE TRIGGER IF NOT EXISTS fact_checks_fts_insert AFTER INSERT ON fact_checks BEGIN
+            INSERT INTO fact_checks_fts(rowid, claim, explanation)
+            VALUES (new.id, new.claim, new.explanation);
+        END;
+        CREATE TRIGGER IF NOT EXISTS fact_checks_fts_delete AFTER DELETE ON fact_checks BEGIN
+            INSERT INTO fact_checks_fts(fact_checks_fts, rowid, claim, explanation)
+            VALUES ('delete', old.id, old.claim, old.explanation);
+        END;
+        CREATE TRIGGER IF NOT EXISTS fact_checks_fts_update AFTER UPDATE OF claim, explanation ON fact_checks BEGIN
+            INSERT INTO fact_checks_fts(fact_checks_fts, rowid, claim, explanation)
+            VALUES ('delete', old.id, old.claim, old.explanation);
+            INSERT INTO fact_checks_fts(rowid, claim, explanation)
+            VALUES (new.id, new.claim, new.explanation);
+        END;
+    """)
+    # Index rows written before the FTS table existed
+    conn.execute("INSERT INTO fact_checks_fts(fact_checks_fts) VALUES ('rebuild')")
+
+
+def _create_claim_cache_table(conn):
+    """Persistent tier of the analyze_claim result cache (see claim_cache.py)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS claim_cache (
+            cache_key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_claim_cache_expires ON claim_cache(expires_at)")
+
+
+def _add_claim_hash(conn):
+    """
+    Normalized-claim hash with a unique (claim_hash, source) index, so
+    duplicates are found by index lookup. Existing rows are backfilled, then
+    each group of duplicates is folded into its latest successful row: the
+    group's size becomes its hit_count and its newest created_at its last_seen.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(fact_checks)")}
+    if 'claim_hash' not in columns:
+        conn.execute("ALTER TABLE fact_checks ADD COLUMN claim_hash TEXT")
+    rows = conn.execute("SELECT id, claim FROM fact_checks WHERE claim_hash IS NULL").fetchall()
+    conn.executemany(
+        "UPDATE fact_checks SET claim_hash = ? WHERE id = ?",
+        [(claim_hash(row[1]), row[0]) for row in rows]
+    )
+    # The hit tracking columns (migration 5) are needed now to keep the repeat counts
+    _add_hit_tracking(conn)
+    conn.execute("DROP TABLE IF EXISTS temp.claim_groups")
+    conn.execute(f"""
+        CREATE TEMP TABLE claim_groups AS
+        SELECT claim_hash, source, COUNT(*) AS hits, MAX(created_at) AS last_seen,
+               COALESCE(MAX(CASE WHEN verdict NOT IN ({_UNSTORED_SQL}) THEN id END), MAX(id)) AS keep_id
+        FROM fact_checks GROUP BY claim_hash, source HAVING COUNT(*) > 1
+    """)
+    conn.execute("""
+        UPDATE fact_checks SET hit_count = claim_groups.hits, last_seen = claim_groups.last_seen
+        FROM claim_groups WHERE fact_checks.id = claim_groups.keep_id
+    """)
+    conn.execute("""
+        DELETE FROM fact_checks
+        WHERE (claim_hash, source) IN (SELECT claim_hash, source FROM claim_groups)
+        AND id NOT IN (SELECT keep_id FROM claim_groups)
+    """)
+    conn.execute("DROP TABLE claim_groups")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_fact_checks_claim_hash ON fact_checks(claim_hash, source)")
+
+
+def _add_hit_tracking(conn):
+    """hit_count / last_seen so repeated claims update one row instead of adding duplicates"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(fact_checks)")}
+    if 'hit_count' not in columns:
+        conn.execute("ALTER TABLE fact_checks ADD COLUMN hit_count INTEGER NOT NULL DEFAULT 1")
+    if 'last_seen' not in columns:
+        conn.execute("ALTER TABLE fact_checks ADD COLUMN last_seen DATETIME")
+    conn.execute("UPDATE fact_checks SET last_seen = created_at WHERE last_seen IS NULL")
+
+
+def _add_score(conn):
+    """Confidence score of the app's own analyses, reported again when a near-duplicate reuses the verdict"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(fact_checks)")}
+    if 'score' not in columns:
+        conn.execute("ALTER TABLE fact_checks ADD COLUMN score INTEGER")
+
+
+def _add_snapshot_sync(conn):
+    """Generation of the BigQuery snapshot sync that last wrote a row (NULL for rows from other paths)"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(fact_checks)")}
+    if 'snapshot_sync' not in columns:
+        conn.execute("ALTER TABLE fact_checks ADD COLUMN snapshot_sync INTEGER")
+
+
+def _create_user_state_table(conn):
+    """Per-user gamification state (see user_state.py)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_state (
+            user_key TEXT PRIMARY KEY,
+            points INTEGER NOT NULL DEFAULT 0,
+            badges TEXT NOT NULL DEFAULT '[]',
+            analyses INTEGER NOT NULL DEFAULT 0,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+# Ordered schema migrations, tracked with PRAGMA user_version
+MIGRATIONS = [
+    (1, _create_base_tables),
+    (2, _create_fts_index),
+    (3, _create_claim_cache_table),
+    (4, _add_claim_hash),
+    (5, _add_hit_tracking),
+    (6, _create_user_state_table),
+    (7, _add_score),
+    (8, _add_snapshot_sync),
+]
+
+
+def _table_exists(conn, name: str) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone()
+    return row is not None
+
+
+def _initialize_schema(conn):
+    """Create tables and apply pending migrations (runs once per pool)"""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target, migration in MIGRATIONS:
+        if version >= target:
+            continue
+        try:
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
+            version = target
+        except sqlite3.OperationalError as e:
+            # Keep the older schema and retry on next start
+            conn.rollback()
+            print(f"Warning: database migration {target} skipped: {e}")
+            break
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of long-lived SQLite connections.
+    Connections are opened lazily up to max_size, tuned with SQLITE_PRAGMAS once,
+    and handed out one borrower at a time so Flask workers never reconnect per call.
+    """
+
+    def __init__(self, db_path, max_size: int = POOL_SIZE, pragmas: Optional[Dict] = None,
+                 timeout: float = POOL_TIMEOUT):
+        self.db_path = Path(db_path)
+        self.max_size = max(1, max_size)
+        self.pragmas = dict(SQLITE_PRAGMAS if pragmas is None else pragmas)
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # Schema setup happens exactly once, before any connection is handed out
+        conn = self._connect()
+        self._all.append(conn)
+        _initialize_schema(conn)
+        self.has_fts = _table_exists(conn, 'fact_checks_fts')
+        self._idle.put(conn)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            # Reserve the slot under the lock so concurrent borrowers can't overshoot max_size
+            can_grow = len(self._all) < self.max_size
+            if can_grow:
+                conn = self._connect()
+                self._all.append(conn)
+        if can_grow:
+            return conn
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise RuntimeError(f"Timed out waiting for a database connection ({self.max_size} in use)")
+
+    def _release(self, conn):
+        if self._closed:
+            conn.close()
+            return
+        if conn.in_transaction:
+            # Never hand an open transaction to the next borrower
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a with-block"""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def close(self):
+        """Close every connection owned by the pool"""
+        self._closed = True
+        with self._lock:
+            connections, self._all = self._all, []
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_connection_pool() -> ConnectionPool:
+    """Return the process-wide connection pool, creating it (and the schema) on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+    return _pool
+
+
+def initialize_database() -> ConnectionPool:
+    """Open the pool and run schema setup eagerly (call once at startup)"""
+    return get_connection_pool()
+
+
+def configure_database(db_path=None, **pool_options) -> ConnectionPool:
+    """Point the helpers at another database file and/or pool settings"""
+    global DB_PATH, _pool
+    with _pool_lock:
+        if db_path is not None:
+            DB_PATH = Path(db_path)
+        if _pool is not None:
+            _pool.close()
+        _pool = ConnectionPool(DB_PATH, **pool_options)
+    return _pool
+
+
+def close_database_connections():
+    """Close all pooled connections (e.g. on worker shutdown)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+# Callbacks run after a fact-check row is inserted: fn(row_id, claim, verdict, source)
+_insert_listeners = []
+
+
+def register_insert_listener(listener):
+    """Subscribe to new fact_checks rows (e.g. to keep an in-memory index up to date)"""
+    if listener not in _insert_listeners:
+        _insert_listeners.append(listener)
+
+
+def _notify_insert(row_id: int, claim: str, verdict: str, source: str):
+    for listener in list(_insert_listeners):
+        try:
+            listener(row_id, claim, verdict, source)
+        except Exception as e:
+            print(f"Insert listener error: {e}")
+
+
+def database_connection():
+    """Context manager yielding a pooled connection: `with database_connection() as conn:`"""
+    return get_connection_pool().connection()
+
+
+def get_database_connection():
+    """
+    Get a standalone connection to the SQLite database.
+    Prefer `database_connection()`, which reuses pooled connections.
+    """
+    pool = get_connection_pool()
+    conn = sqlite3.connect(pool.db_path, timeout=pool.timeout)
+    conn.row_factory = sqlite3.Row  # Enable column access by name
+    for name, value in pool.pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
     return conn
 
-def search_fact_checks(search_text: str, limit: int = 3) -> List[str]:
+# Common stop words ignored when building search terms
+SEARCH_STOP_WORDS = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'a', 'an'}
+
+# bm25 column weights for (claim, explanation) - matches in the claim count most
+FTS_RANK_WEIGHTS = (10.0, 1.0)
+
+
+def _extract_search_terms(search_text: str, max_terms: int = 5) -> List[str]:
+    """Lower-cased search terms without stop words or quotes, most relevant first"""
+    words = search_text.lower().split()
+    terms = [word.replace("'", "").replace('"', '').replace(',', '') for word in words if len(word) > 2 and word not in SEARCH_STOP_WORDS]
+    return [term for term in terms if term][:max_terms]
+
+
+def _build_fts_query(search_text: str, search_terms: List[str]) -> str:
     """
-    Search for fact-checks related to the given text
-    Returns formatted strings with claim, verdict, source, and URL
+    FTS5 MATCH expression: the exact phrase OR any term (as a prefix, so
+    'vaccine' also finds 'vaccines'). Every token is quoted so user input can't
+    inject FTS operators.
     """
-    if not search_text or not search_text.strip():
-        return []
+    def quote(token):
+        return '"' + token.replace('"', '""') + '"'
+
+    parts = []
+    phrase = ' '.join(search_text.split())
+    if len(phrase.split()) > 1:
+        parts.append(quote(phrase))
+    parts.extend(quote(term) + '*' for term in search_terms)
+    return ' OR '.join(parts)
+
+
+def _format_fact_check(row) -> str:
+    result = f"{row['claim']} — {row['verdict']} ({row['source']})"
+    if row['url']:
+        result += f" {row['url']}"
+    return result
+
+
+def _search_fact_checks_fts(conn, search_text: str, search_terms: List[str], limit: int):
+    claim_weight, explanation_weight = FTS_RANK_WEIGHTS
+    return conn.execute(f"""
+        SELECT f.claim, f.verdict, f.source, f.url, f.explanation
+        FROM fact_checks_fts
+        JOIN fact_checks f ON f.id = fact_checks_fts.rowid
+        WHERE fact_checks_fts MATCH ?
+        ORDER BY bm25(fact_checks_fts, {claim_weight}, {explanation_weight}), LENGTH(f.claim)
+        LIMIT ?
+    """, (_build_fts_query(search_text, search_terms), limit)).fetchall()
+
+
+def _search_fact_checks_like(conn, search_text: str, search_terms: List[str], limit: int):
+    """LIKE-based search, used when FTS5 is unavailable"""
+    # Parameters for exact phrase match
+    exact_phrase = f"%{search_text.lower()}%"
+    params = [exact_phrase, exact_phrase]
     
-    try:
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        
-        # Create search terms from the input text
-        words = search_text.lower().split()
-        # Clean up words and remove common stop words
-        stop_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'a', 'an'}
-        search_terms = [word.replace("'", "").replace('"', '').replace(',', '') for word in words if len(word) > 2 and word.lower() not in stop_words]
-        
-        # Build dynamic query for better matching - prioritize multiple word matches
-        query = """
+    # Build scoring for multiple words and conditions
+    word_conditions = []
+    word_scoring = []
+    
+    for i, term in enumerate(search_terms):
+        word_conditions.append("LOWER(claim) LIKE ?")
+        word_scoring.append(f"CASE WHEN LOWER(claim) LIKE ? THEN {10-i*2} ELSE 0 END")
+        params.append(f"%{term}%")
+        params.append(f"%{term}%")
+    
+    if word_scoring:
+        # Prioritize exact phrase matches, then multiple word matches
+        query = f"""
         SELECT claim, verdict, source, url, explanation,
                CASE 
                    WHEN LOWER(claim) LIKE ? THEN 100  -- Exact phrase match
-                   ELSE (
-                       {} -- Multiple word match scoring
-                   )
+                   ELSE ({" + ".join(word_scoring)})
                END as relevance_score
         FROM fact_checks
-        WHERE LOWER(claim) LIKE ? OR ({})
+        WHERE LOWER(claim) LIKE ? OR ({" OR ".join(word_conditions)})
         ORDER BY relevance_score DESC, LENGTH(claim)
         LIMIT ?
         """
+    else:
+        # Fallback if no good search terms
+        query = """
+        SELECT claim, verdict, source, url, explanation, 0 as relevance_score
+        FROM fact_checks
+        WHERE LOWER(claim) LIKE ?
+        ORDER BY LENGTH(claim)
+        LIMIT ?
+        """
+        params = [exact_phrase]
+    
+    params.append(limit)
+    return conn.execute(query, params).fetchall()
+
+
+def search_fact_checks(search_text: str, limit: int = 3) -> List[str]:
+    """
+    Search for fact-checks related to the given text
+    Returns formatted strings with claim, verdict, source, and URL
+    """
+    if not search_text or not search_text.strip():
+        return []
+    
+    try:
+        search_terms = _extract_search_terms(search_text)
+        pool = get_connection_pool()
         
-        # Parameters for exact phrase match
-        exact_phrase = f"%{search_text.lower()}%"
-        params = [exact_phrase, exact_phrase]
-        
-        # Build scoring for multiple words and conditions
-        word_conditions = []
-        word_scoring = []
-        
-        for i, term in enumerate(search_terms[:5]):  # Use up to 5 most relevant words
-            word_conditions.append("LOWER(claim) LIKE ?")
-            word_scoring.append(f"CASE WHEN LOWER(claim) LIKE ? THEN {10-i*2} ELSE 0 END")
-            params.append(f"%{term}%")
-            params.append(f"%{term}%")
-        
-        # Format the query with scoring logic
-        if word_scoring:
-            query = query.format(
-                " + ".join(word_scoring),
-                " OR ".join(word_conditions)
-            )
-        else:
-            # Fallback if no good search terms
-            query = """
-            SELECT claim, verdict, source, url, explanation, 0 as relevance_score
-            FROM fact_checks
-            WHERE LOWER(claim) LIKE ?
-            ORDER BY LENGTH(claim)
-            LIMIT ?
-            """
-            params = [exact_phrase]
-        
-        params.append(limit)
-        
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        
-        # Format results
-        formatted_results = []
-        for row in results:
-            result = f"{row['claim']} — {row['verdict']} ({row['source']})"
-            if row['url']:
-                result += f" {row['url']}"
-            formatted_results.append(result)
+        with pool.connection() as conn:
+            if pool.has_fts and search_terms:
+                # Ranked full-text search (BM25) instead of scanning with LIKE
+                results = _search_fact_checks_fts(conn, search_text, search_terms, limit)
+            else:
+                results = _search_fact_checks_like(conn, search_text, search_terms, limit)
         
-        conn.close()
-        return formatted_results
+        return [_format_fact_check(row) for row in results]
         
     except Exception as e:
         print(f"SQLite search error: {e}")
         return []
 
+def search_fact_checks_batch(search_texts: List[str], limit: int = 3) -> List[List[str]]:
+    """
+    Search fact-checks for many texts at once with a single set-based FTS query.
+    Returns one list of formatted strings per input text, in input order.
+    """
+    results = [[] for _ in search_texts]
+    try:
+        pool = get_connection_pool()
+        queries = []
+        unranked = []
+        for idx, text in enumerate(search_texts):
+            if not text or not text.strip():
+                continue
+            terms = _extract_search_terms(text)
+            if pool.has_fts and terms:
+                queries.append((idx, _build_fts_query(text, terms)))
+            else:
+                unranked.append((idx, text, terms))
+        
+        with pool.connection() as conn:
+            if queries:
+                claim_weight, explanation_weight = FTS_RANK_WEIGHTS
+                values = ', '.join('(?, ?)' for _ in queries)
+                params = [value for query in queries for value in query]
+                rows = conn.execute(f"""
+                    WITH queries(idx, q) AS (VALUES {values})
+                    SELECT idx, claim, verdict, source, url FROM (
+                        SELECT queries.idx AS idx, f.claim AS claim, f.verdict AS verdict,
+                               f.source AS source, f.url AS url,
+                               ROW_NUMBER() OVER (
+                                   PARTITION BY queries.idx
+                                   ORDER BY bm25(fact_checks_fts, {claim_weight}, {explanation_weight}), LENGTH(f.claim)
+                               ) AS rank
+                        FROM queries
+                        JOIN fact_checks_fts ON fact_checks_fts MATCH queries.q
+                        JOIN fact_checks f ON f.id = fact_checks_fts.rowid
+                    )
+                    WHERE rank <= ?
+                    ORDER BY idx, rank
+                """, params + [limit]).fetchall()
+                for row in rows:
+                    results[row['idx']].append(_format_fact_check(row))
+            
+            for idx, text, terms in unranked:
+                results[idx] = [_format_fact_check(row) for row in _search_fact_checks_like(conn, text, terms, limit)]
+        
+        return results
+        
+    except Exception as e:
+        print(f"SQLite batch search error: {e}")
+        return results
+
 def get_all_claims(limit: int = 10) -> List[Dict]:
     """Get all claims from the database for testing purposes"""
     try:
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, claim, verdict, source, url, explanation, created_at
-            FROM fact_checks
-            ORDER BY created_at DESC
-            LIMIT ?
-        """, (limit,))
-        
-        results = cursor.fetchall()
-        claims = [dict(row) for row in results]
+        with database_connection() as conn:
+            results = conn.execute("""
+                SELECT id, claim, verdict, source, url, explanation, created_at
+                FROM fact_checks
+                ORDER BY created_at DESC
+                LIMIT ?
+            """, (limit,)).fetchall()
         
-        conn.close()
-        return claims
+        return [dict(row) for row in results]
         
     except Exception as e:
         print(f"Error fetching claims: {e}")
         return []
 
-def add_fact_check(claim: str, verdict: str, source: str, url: str = None, explanation: str = None) -> bool:
-    """Add a new fact-check to the database"""
+# Upsert SET clause: a failed verdict keeps the stored verdict and explanation
+_REFRESH_VERDICT = f"""verdict = CASE WHEN excluded.verdict IN ({_UNSTORED_SQL})
+                    THEN fact_checks.verdict ELSE excluded.verdict END,
+                explanation = CASE WHEN excluded.verdict IN ({_UNSTORED_SQL})
+                    THEN fact_checks.explanation
+                    ELSE COALESCE(excluded.explanation, fact_checks.explanation) END,
+                score = CASE WHEN excluded.verdict IN ({_UNSTORED_SQL})
+                    THEN fact_checks.score ELSE excluded.score END"""
+
+def _analysis_score(analysis_result: dict) -> Optional[int]:
+    """The analysis' 0-100 confidence, or None when it has none (e.g. "N/A")"""
+    score = analysis_result.get("score")
+    return int(score) if isinstance(score, (int, float)) and not isinstance(score, bool) else None
+
+def upsert_fact_check(claim: str, verdict: str, source: str, url: str = None,
+                      explanation: str = None, refresh: bool = True, score: int = None) -> Optional[Dict]:
+    """
+    Insert a fact-check, or - if the same normalized claim is already stored
+    for this source - bump its hit_count and last_seen. With refresh=True the
+    stored verdict/explanation/url/score are replaced by the new ones, unless
+    the new verdict is a failure (UNSTORED_VERDICTS).
+    Returns {'id', 'hit_count', 'inserted'}, or None on error.
+    """
+    refresh_columns = f""",
+                {_REFRESH_VERDICT},
+                url = COALESCE(excluded.url, fact_checks.url)""" if refresh else ""
     try:
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO fact_checks (claim, verdict, source, url, explanation)
-            VALUES (?, ?, ?, ?, ?)
-        """, (claim, verdict, source, url, explanation))
-        
-        conn.commit()
-        conn.close()
-        return True
-        
+        with database_connection() as conn:
+            row = conn.execute(f"""
+                INSERT INTO fact_checks (claim, claim_hash, verdict, source, url, explanation, score, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(claim_hash, source) DO UPDATE SET
+                    hit_count = fact_checks.hit_count + 1,
+                    last_seen = CURRENT_TIMESTAMP{refresh_columns}
+                RETURNING id, hit_count
+            """, (claim, claim_hash(claim), verdict, source, url, explanation, score)).fetchone()
+            conn.commit()
     except Exception as e:
         print(f"Error adding fact-check: {e}")
-        return False
+        return None
+    
+    inserted = row['hit_count'] == 1
+    if inserted:
+        _notify_insert(row['id'], claim, verdict, source)
+    return {'id': row['id'], 'hit_count': row['hit_count'], 'inserted': inserted}
+
+def add_fact_check(claim: str, verdict: str, source: str, url: str = None, explanation: str = None) -> bool:
+    """Add a new fact-check to the database (repeats update the existing row)"""
+    return upsert_fact_check(claim, verdict, source, url, explanation) is not None
         
 def add_fact_check_to_database(fact_check_data: dict) -> bool:
     """
     Add a fact-check from auto-updater with enhanced data structure
     """
-    try:
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        
-        # Check if this claim already exists (avoid duplicates)
-        cursor.execute(
-            "SELECT id FROM fact_checks WHERE LOWER(claim) = LOWER(?) AND source = ?",
-            (fact_check_data['claim'], fact_check_data['source'])
-        )
-        existing = cursor.fetchone()
-        
-        if existing:
-            print(f"Skipping duplicate: {fact_check_data['claim'][:50]}...")
-            conn.close()
-            return True
-        
-        # Insert new fact-check
-        cursor.execute("""
-            INSERT INTO fact_checks (claim, verdict, source, url, explanation)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
-            fact_check_data['claim'],
-            fact_check_data['verdict'],
-            fact_check_data['source'],
-            fact_check_data.get('url', ''),
-            fact_check_data.get('explanation', '')
-        ))
-        
-        conn.commit()
-        conn.close()
+    # A claim already stored for this source keeps its data; only hit_count/last_seen change
+    result = upsert_fact_check(
+        fact_check_data['claim'],
+        fact_check_data['verdict'],
+        fact_check_data['source'],
+        fact_check_data.get('url', ''),
+        fact_check_data.get('explanation', ''),
+        refresh=False
+    )
+    if result is None:
+        return False
+    if result['inserted']:
         print(f"✅ Added: {fact_check_data['claim'][:50]}... - {fact_check_data['verdict']}")
-        return True
-        
+    else:
+        print(f"Skipping duplicate: {fact_check_data['claim'][:50]}...")
+    return True
+
+def _bulk_rows(fact_checks: List[Dict]) -> List[tuple]:
+    """Complete fact-checks as insert parameters, first of each (claim_hash, source) only"""
+    rows = []
+    seen = set()
+    for item in fact_checks:
+        if not item.get('claim') or not item.get('verdict') or not item.get('source'):
+            continue
+        key = (claim_hash(item['claim']), item['source'])
+        if key in seen:
+            continue
+        seen.add(key)
+        rows.append((
+            item['claim'], key[0], item['verdict'], item['source'],
+            item.get('url') or '', item.get('explanation') or ''
+        ))
+    return rows
+
+def bulk_add_fact_checks(fact_checks: List[Dict]) -> Dict[str, int]:
+    """
+    Add many fact-checks with one executemany in a single transaction.
+    Duplicates within the batch are dropped in memory; a row already stored
+    for the same normalized claim and source keeps its data and only has
+    hit_count/last_seen updated, as in add_fact_check_to_database. Returns
+    inserted/updated/skipped counts.
+    """
+    rows = _bulk_rows(fact_checks)
+    
+    try:
+        with database_connection() as conn:
+            # Take the write lock up front so the id range below is ours alone
+            conn.execute("BEGIN IMMEDIATE")
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM fact_checks").fetchone()[0]
+            conn.executemany("""
+                INSERT INTO fact_checks (claim, claim_hash, verdict, source, url, explanation, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(claim_hash, source) DO UPDATE SET
+                    hit_count = fact_checks.hit_count + 1,
+                    last_seen = CURRENT_TIMESTAMP
+            """, rows)
+            inserted = conn.execute(
+                "SELECT id, claim, verdict, source FROM fact_checks WHERE id > ? ORDER BY id", (last_id,)
+            ).fetchall()
+            conn.commit()
     except Exception as e:
-        print(f"Error adding fact-check to database: {e}")
-        return False
+        print(f"Error bulk adding fact-checks: {e}")
+        return {'inserted': 0, 'updated': 0, 'skipped': len(fact_checks), 'error': str(e)}
+    
+    for row in inserted:
+        _notify_insert(row['id'], row['claim'], row['verdict'], row['source'])
+    return {
+        'inserted': len(inserted),
+        'updated': len(rows) - len(inserted),
+        'skipped': len(fact_checks) - len(rows)
+    }
+
+def sync_snapshot_fact_checks(fact_checks: List[Dict]) -> Dict[str, int]:
+    """
+    Make the rows written by the BigQuery snapshot sync match `fact_checks`
+    (the whole table) in one transaction: new rows are inserted, existing
+    ones take the snapshot's verdict, url and explanation, and rows an
+    earlier sync wrote that are no longer in the table are deleted.
+    Returns inserted/updated/deleted counts.
+    """
+    rows = _bulk_rows(fact_checks)
+    
+    try:
+        with database_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM fact_checks").fetchone()[0]
+            generation = conn.execute(
+                "SELECT COALESCE(MAX(snapshot_sync), 0) + 1 FROM fact_checks"
+            ).fetchone()[0]
+            conn.executemany("""
+                INSERT INTO fact_checks (claim, claim_hash, verdict, source, url, explanation, snapshot_sync, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(claim_hash, source) DO UPDATE SET
+                    verdict = excluded.verdict,
+                    url = excluded.url,
+                    explanation = excluded.explanation,
+                    snapshot_sync = excluded.snapshot_sync
+            """, [row + (generation,) for row in rows])
+            inserted = conn.execute(
+                "SELECT id, claim, verdict, source FROM fact_checks WHERE id > ? ORDER BY id", (last_id,)
+            ).fetchall()
+            # An empty result is more likely a broken export than an emptied table: keep the old rows
+            deleted = conn.execute(
+                "DELETE FROM fact_checks WHERE snapshot_sync < ?", (generation,)
+            ).rowcount if rows else 0
+            conn.commit()
+    except Exception as e:
+        print(f"Error syncing snapshot fact-checks: {e}")
+        return {'inserted': 0, 'updated': 0, 'deleted': 0, 'error': str(e)}
+    
+    for row in inserted:
+        _notify_insert(row['id'], row['claim'], row['verdict'], row['source'])
+    return {'inserted': len(inserted), 'updated': len(rows) - len(inserted), 'deleted': deleted}
+
+# Source recorded for the app's own analyses
+ANALYSIS_SOURCE = "Echo Mind AI"
 
 def save_analysis_to_database(claim: str, analysis_result: dict) -> bool:
     """
@@ -203,47 +721,97 @@ def save_analysis_to_database(claim: str, analysis_result: dict) -> bool:
         # Extract relevant data from analysis result
         verdict = analysis_result.get("classification", "Unknown")
         explanation = analysis_result.get("explanation", "No explanation available.")
-        source = "Echo Mind AI"
+        source = ANALYSIS_SOURCE
+        if verdict in UNSTORED_VERDICTS:
+            return False
         
-        # Save to database using existing function
-        success = add_fact_check(
+        # Re-submitted claims update the existing row (hit_count, last_seen, latest verdict)
+        result = upsert_fact_check(
             claim=claim,
             verdict=verdict,
             source=source,
-            explanation=explanation
+            explanation=explanation,
+            score=_analysis_score(analysis_result)
         )
         
-        if success:
+        if result is None:
+            return False
+        if result['inserted']:
             print(f"✅ Added new analysis to database: '{claim}' - {verdict}")
-        return success
+        else:
+            print(f"🔁 Updated analysis in database (seen {result['hit_count']} times): '{claim}' - {verdict}")
+        return True
         
     except Exception as e:
         print(f"Error saving analysis to database: {e}")
         return False
 
+def save_analyses_to_database(analyses: List[Tuple[str, dict]]) -> int:
+    """
+    Save many (claim, analysis_result) pairs in one transaction, with the same
+    upsert as save_analysis_to_database. Used by the write-behind queue;
+    raises on error so the caller can count the failed batch.
+    Returns the number of new rows.
+    """
+    rows = []
+    with database_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for claim, analysis_result in analyses:
+                verdict = analysis_result.get("classification", "Unknown")
+                if verdict in UNSTORED_VERDICTS:
+                    continue
+                row = conn.execute(f"""
+                    INSERT INTO fact_checks (claim, claim_hash, verdict, source, url, explanation, score, last_seen)
+                    VALUES (?, ?, ?, ?, NULL, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(claim_hash, source) DO UPDATE SET
+                        hit_count = fact_checks.hit_count + 1,
+                        last_seen = CURRENT_TIMESTAMP,
+                        {_REFRESH_VERDICT}
+                    RETURNING id, hit_count
+                """, (claim, claim_hash(claim), verdict, ANALYSIS_SOURCE,
+                      analysis_result.get("explanation", "No explanation available."),
+                      _analysis_score(analysis_result))).fetchone()
+                rows.append((row['id'], row['hit_count'], claim, verdict))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    
+    inserted = 0
+    for row_id, hit_count, claim, verdict in rows:
+        if hit_count == 1:
+            inserted += 1
+            _notify_insert(row_id, claim, verdict, ANALYSIS_SOURCE)
+    print(f"✅ Saved {len(rows)} analyses to database ({inserted} new, {len(rows) - inserted} updated)")
+    return inserted
+
 def get_database_stats() -> Dict:
     """Get statistics about the database"""
     try:
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        
-        # Total count
-        cursor.execute("SELECT COUNT(*) as total FROM fact_checks")
-        total = cursor.fetchone()['total']
-        
-        # Count by verdict
-        cursor.execute("""
-            SELECT verdict, COUNT(*) as count 
-            FROM fact_checks 
-            GROUP BY verdict
-        """)
-        verdicts = dict(cursor.fetchall())
-        
-        conn.close()
+        with database_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Total count
+            cursor.execute("SELECT COUNT(*) as total FROM fact_checks")
+            total = cursor.fetchone()['total']
+            
+            # Count by verdict
+            cursor.execute("""
+                SELECT verdict, COUNT(*) as count 
+                FROM fact_checks 
+                GROUP BY verdict
+            """)
+            verdicts = {row['verdict']: row['count'] for row in cursor.fetchall()}
+            
+            # Submissions answered by an existing row instead of a new one
+            cursor.execute("SELECT COALESCE(SUM(hit_count - 1), 0) AS repeats FROM fact_checks")
+            repeat_submissions = cursor.fetchone()['repeats']
         
         return {
             'total_claims': total,
             'verdicts': verdicts,
+            'repeat_submissions': repeat_submissions,
             'database_path': str(DB_PATH),
             'database_exists': DB_PATH.exists()
         }
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+BigQuery evidence lookups for Echo Mind
+Keeps one warm BigQuery client and a fixed, parameterized query text (so
+BigQuery's own result cache can serve repeats), caches results per key-term
+set with a TTL, and can instead sync a local snapshot of the BigQuery table
+into SQLite so request-time lookups never leave the process. Only one
+process per database file runs the periodic sync: gunicorn workers compete
+for a file lock, and the others retry in case its holder exits.
+
+Usage:
+  python evidence_store.py sync   - Copy the BigQuery fact-check table into SQLite once
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server, always the sync leader
+    fcntl = None
+
+from claim_cache import MemoryCache
+from resilience import BIGQUERY
+
+PROJECT_ID = "echo-mind-472808"
+DATASET_ID = "factchecks"
+TABLE_ID = "fact_checks"
+
+# Evidence configuration (override with environment variables)
+# 'bigquery': query BigQuery per request (cached); 'snapshot': serve from the SQLite copy only
+EVIDENCE_MODE = os.environ.get('ECHO_MIND_EVIDENCE_MODE', 'bigquery').lower()
+EVIDENCE_CACHE_TTL = int(os.environ.get('ECHO_MIND_EVIDENCE_CACHE_TTL', 3600))
+EVIDENCE_CACHE_SIZE = int(os.environ.get('ECHO_MIND_EVIDENCE_CACHE_SIZE', 4096))
+SNAPSHOT_SYNC_INTERVAL = int(os.environ.get('ECHO_MIND_SNAPSHOT_SYNC_INTERVAL', 6 * 3600))
+SNAPSHOT_SOURCE_SUFFIX = os.environ.get('ECHO_MIND_SNAPSHOT_SOURCE_SUFFIX', '')
+# Lock file electing the syncing process (default: next to the SQLite database)
+SNAPSHOT_LOCK_PATH = os.environ.get('ECHO_MIND_SNAPSHOT_LOCK', '')
+SNAPSHOT_LEADER_RETRY = float(os.environ.get('ECHO_MIND_SNAPSHOT_LEADER_RETRY', 60))
+
+# Set-based BigQuery search: every (claim index, key term) pair in one job.
+# Rows matching all of a claim's terms rank first (score 100), any term next (50).
+BATCH_QUERY = f"""
+WITH terms AS (
+    SELECT t.idx, t.term FROM UNNEST(@terms) AS t
+),
+term_counts AS (
+    SELECT idx, COUNT(*) AS n FROM terms GROUP BY idx
+),
+matches AS (
+    SELECT t.idx, f.claim, f.verdict, f.source, f.url, COUNT(*) AS matched
+    FROM `{PROJECT_ID}.{DATASET_ID}.{TABLE_ID}` AS f
+    JOIN terms AS t ON STRPOS(LOWER(f.claim), t.term) > 0
+    GROUP BY t.idx, f.claim, f.verdict, f.source, f.url
+),
+ranked AS (
+    SELECT m.idx, m.claim, m.verdict, m.source, m.url,
+           IF(m.matched = c.n, 100, 50) AS relevance_score,
+           ROW_NUMBER() OVER (PARTITION BY m.idx ORDER BY m.matched DESC) AS rank
+    FROM matches AS m JOIN term_counts AS c USING (idx)
+)
+SELECT idx, claim, verdict, source, url, relevance_score
+FROM ranked
+WHERE rank <= @limit
+ORDER BY idx, rank
+"""
+
+SNAPSHOT_QUERY = f"""
+SELECT claim, verdict, source, url
+FROM `{PROJECT_ID}.{DATASET_ID}.{TABLE_ID}`
+WHERE claim IS NOT NULL AND verdict IS NOT NULL
+"""
+
+
+class LookupCancelled(RuntimeError):
+    """The caller no longer needs the lookup (not a BigQuery failure, so never retried)"""
+
+
+def wait_for_job(job, timeout, cancel_event=None):
+    """Waits for a BigQuery job, cancelling it on timeout or when cancel_event is set"""
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        cancelled = cancel_event is not None and cancel_event.is_set()
+        if remaining <= 0 or cancelled:
+            try:
+                job.cancel()
+            except Exception:
+                pass
+            if cancelled:
+                raise LookupCancelled("BigQuery job cancelled: evidence no longer needed")
+            raise TimeoutError(f"BigQuery job cancelled after {timeout:.1f}s")
+        try:
+            return job.result(timeout=min(remaining, 0.5))
+        except FuturesTimeoutError:
+            continue
+        except Exception as e:
+            # google.api_core raises its own timeout types when the wait expires
+            if type(e).__name__ in ('TimeoutError', 'DeadlineExceeded', 'RetryError') and time.monotonic() < deadline:
+                continue
+            raise
+
+
+class EvidenceStore:
+    """
+    BigQuery evidence lookups with a warm client and a per-term-set result cache.
+    Pass `client` to use a stand-in for bigquery.Client (e.g. in tests).
+    """
+
+    def __init__(self, client=None, mode: str = EVIDENCE_MODE,
+                 cache_ttl: float = EVIDENCE_CACHE_TTL, cache_size: int = EVIDENCE_CACHE_SIZE):
+        self._client = client
+        self._client_lock = threading.Lock()
+        self.mode = mode
+        self.cache = MemoryCache(max_entries=cache_size, ttl=cache_ttl)
+        self._jobs_lock = threading.Lock()
+        self.jobs = 0
+        self._sync_thread = None
+        self._stop_sync = threading.Event()
+        self._sync_lock_file = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from clients import get_client_manager
+                    self._client = get_client_manager().bigquery()
+        return self._client
+
+    @property
+    def uses_bigquery(self) -> bool:
+        return self.mode != 'snapshot'
+
+    @staticmethod
+    def _cache_key(terms: Sequence[str], top_k: int) -> str:
+        return f"{top_k}:" + "\x1f".join(sorted(set(terms)))
+
+    def search(self, term_sets: List[List[str]], top_k: int = 3, timeout: float = 10,
+               cancel_event: Optional[threading.Event] = None) -> List[List[str]]:
+        """
+        Formatted evidence strings per term set, in order. Cached term sets are
+        answered locally; the rest share a single BigQuery job. Raises on failure.
+        """
+        results: List[Optional[List[str]]] = [None] * len(term_sets)
+        missing = []
+        for idx, terms in enumerate(term_sets):
+            if not terms:
+                results[idx] = []
+                continue
+            cached = self.cache.get(self._cache_key(terms, top_k))
+            if cached is not None:
+                results[idx] = cached
+            else:
+                missing.append(idx)
+
+        if missing:
+            fetched = self._query(
+                [term_sets[idx] for idx in missing], top_k, timeout, cancel_event)
+            for idx, evidence in zip(missing, fetched):
+                results[idx] = evidence
+                self.cache.set(self._cache_key(term_sets[idx], top_k), evidence)
+        return results
+
+    def _query(self, term_sets, top_k, timeout, cancel_event):
+        from google.cloud import bigquery
+        term_params = [
+            bigquery.StructQueryParameter(
+                None,
+                bigquery.ScalarQueryParameter("idx", "INT64", idx),
+                bigquery.ScalarQueryParameter("term", "STRING", term.lower())
+            )
+            for idx, terms in enumerate(term_sets) for term in terms
+        ]
+        job_config = bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ArrayQueryParameter("terms", "STRUCT", term_params),
+            bigquery.ScalarQueryParameter("limit", "INT64", top_k)
+        ])
+        deadline = time.monotonic() + timeout
+
+        def run_job():
+            # Each attempt (retries included) waits only for what is left of the deadline
+            with self._jobs_lock:
+                self.jobs += 1
+            job = self.client.query(BATCH_QUERY, job_config=job_config)
+            return list(wait_for_job(job, max(0.0, deadline - time.monotonic()), cancel_event))
+
+        results = [[] for _ in term_sets]
+        for r in BIGQUERY.call(run_job, timeout=timeout):
+            if r.relevance_score >= 50:
+                results[r.idx].append(f"{r.claim} — {r.verdict} ({r.source}) {r.url}")
+        return results
+
+    def sync_snapshot(self, timeout: float = 600) -> Dict:
+        """Bring the local SQLite copy of the BigQuery fact-check table up to date"""
+        from database_helper import sync_snapshot_fact_checks
+        started = time.monotonic()
+        job = self.client.query(SNAPSHOT_QUERY)
+        rows = [
+            {
+                'claim': r.claim,
+                'verdict': r.verdict,
+                'source': f"{r.source}{SNAPSHOT_SOURCE_SUFFIX}",
+                'url': r.url or '',
+                'explanation': ''
+            }
+            for r in wait_for_job(job, timeout)
+        ]
+        stats = sync_snapshot_fact_checks(rows)
+        stats['duration_seconds'] = round(time.monotonic() - started, 2)
+        print(f"✅ Synced BigQuery snapshot: {stats}")
+        return stats
+
+    def acquire_sync_lock(self, path=None) -> bool:
+        """Become (or stay) the one process that syncs the snapshot; False if another holds the lock"""
+        if self._sync_lock_file is not None or fcntl is None:
+            return True
+        if path is None:
+            from database_helper import DB_PATH
+            path = SNAPSHOT_LOCK_PATH or f"{DB_PATH}.snapshot.lock"
+        lock_file = open(Path(path), 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._sync_lock_file = lock_file
+        print(f"🔒 Process {os.getpid()} syncs the BigQuery snapshot")
+        return True
+
+    def release_sync_lock(self):
+        if self._sync_lock_file is not None:
+            self._sync_lock_file.close()  # closing the file releases the lock
+            self._sync_lock_file = None
+
+    def start_snapshot_sync(self, interval: float = SNAPSHOT_SYNC_INTERVAL,
+                            leader_retry: float = SNAPSHOT_LEADER_RETRY, lock_path=None):
+        """
+        Run sync_snapshot now and then every `interval` seconds on a daemon
+        thread, while this process holds the sync lock. Other processes check
+        for the lock every `leader_retry` seconds and take over if it is freed.
+        """
+        if self._sync_thread is not None and self._sync_thread.is_alive():
+            return
+
+        def loop():
+            while not self._stop_sync.is_set():
+                try:
+                    leader = self.acquire_sync_lock(lock_path)
+                except OSError as e:
+                    print(f"BigQuery snapshot lock error: {e}")
+                    leader = False
+                if not leader:
+                    self._stop_sync.wait(leader_retry)
+                    continue
+                try:
+                    self.sync_snapshot()
+                except Exception as e:
+                    print(f"BigQuery snapshot sync error: {e}")
+                self._stop_sync.wait(interval)
+            self.release_sync_lock()
+
+        self._stop_sync.clear()
+        self._sync_thread = threading.Thread(target=loop, name="evidence-snapshot-sync", daemon=True)
+        self._sync_thread.start()
+
+    def stop_snapshot_sync(self):
+        self._stop_sync.set()
+
+
+_evidence_store: Optional[EvidenceStore] = None
+_evidence_store_lock = threading.Lock()
+
+
+def get_evidence_store() -> EvidenceStore:
+    """Process-wide evidence store configured from the environment"""
+    global _evidence_store
+    if _evidence_store is None:
+        with _evidence_store_lock:
+            if _evidence_store is None:
+                _evidence_store = EvidenceStore()
+    return _evidence_store
+
+
+def set_evidence_store(store: Optional[EvidenceStore]):
+    """Replace the process-wide store (e.g. with one wrapping a local BigQuery stand-in)"""
+    global _evidence_store
+    with _evidence_store_lock:
+        _evidence_store = store
+
+
+def main():
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == 'sync':
+        get_evidence_store().sync_snapshot()
+    else:
+        print("Usage: python evidence_store.py sync")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""
+Concurrent feed fetching for the Echo Mind auto-updater
+Feeds are downloaded on a bounded thread pool. Each request is limited by a
+per-feed deadline, retried with exponential backoff on transient failures,
+and spaced per host (instead of one global sleep between feeds).
+Per-feed ETag/Last-Modified values and content hashes are kept in a state
+file so unchanged feeds are answered with a 304 or skipped before parsing.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlparse
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Fetch configuration (override with environment variables)
+FEED_WORKERS = int(os.environ.get('ECHO_MIND_FEED_WORKERS', 8))
+FEED_TIMEOUT = float(os.environ.get('ECHO_MIND_FEED_TIMEOUT', 15))
+FEED_RETRIES = int(os.environ.get('ECHO_MIND_FEED_RETRIES', 2))
+FEED_BACKOFF = float(os.environ.get('ECHO_MIND_FEED_BACKOFF', 1.0))
+HOST_MIN_INTERVAL = float(os.environ.get('ECHO_MIND_FEED_HOST_INTERVAL', 1.0))
+FEED_STATE_FILE = os.environ.get('ECHO_MIND_FEED_STATE', 'feed_state.json')
+MAX_FEED_BYTES = 5 * 1024 * 1024
+
+USER_AGENT = 'EchoMind-AutoUpdater/1.0'
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class FeedFetchError(Exception):
+    def __init__(self, message: str, retryable: bool = True, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+@dataclass
+class FetchResult:
+    name: str
+    url: str
+    status_code: Optional[int] = None
+    content: bytes = b''
+    headers: Mapping[str, str] = field(default_factory=requests.structures.CaseInsensitiveDict)
+    attempts: int = 0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+    @property
+    def content_hash(self) -> str:
+        return hashlib.sha256(self.content).hexdigest()
+
+
+class FeedStateStore:
+    """
+    Per-feed validators, content hash and last parsed items, persisted as JSON.
+    Thread-safe; call save() once after a fetch run.
+    """
+
+    def __init__(self, path: str = FEED_STATE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._feeds: Dict[str, Dict] = {}
+        try:
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    self._feeds = json.load(f).get('feeds', {})
+        except Exception as e:
+            logger.warning(f"Could not load feed state from {path}: {e}")
+
+    def get(self, name: str, url: str) -> Dict:
+        """State for a feed; empty if the feed's URL changed since it was stored"""
+        with self._lock:
+            state = self._feeds.get(name, {})
+            return dict(state) if state.get('url') == url else {}
+
+    def update(self, name: str, url: str, **fields):
+        with self._lock:
+            state = self._feeds.get(name, {})
+            if state.get('url') != url:
+                state = {'url': url}
+            state.update(fields)
+            self._feeds[name] = state
+
+    def save(self):
+        with self._lock:
+            data = json.dumps({'feeds': self._feeds}, indent=2)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+
+def conditional_headers(state: Dict) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since headers from a feed's stored validators"""
+    headers = {}
+    if state.get('etag'):
+        headers['If-None-Match'] = state['etag']
+    if state.get('last_modified'):
+        headers['If-Modified-Since'] = state['last_modified']
+    return headers
+
+
+class HostLimiter:
+    """Allows one request at a time per host, at least `min_interval` seconds apart"""
+
+    def __init__(self, min_interval: float = HOST_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._hosts: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def _host_state(self, host: str) -> list:
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = [threading.Lock(), 0.0]
+            return self._hosts[host]
+
+    def acquire(self, host: str) -> threading.Lock:
+        state = self._host_state(host)
+        host_lock = state[0]
+        host_lock.acquire()
+        wait = state[1] + self.min_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        state[1] = time.monotonic()
+        return host_lock
+
+
+class FeedFetcher:
+    """
+    Bounded-concurrency HTTP fetcher for news feeds.
+    Pass `session_factory` to use a stand-in for requests.Session (e.g. in tests).
+    """
+
+    def __init__(self, workers: int = FEED_WORKERS, timeout: float = FEED_TIMEOUT,
+                 retries: int = FEED_RETRIES, backoff: float = FEED_BACKOFF,
+                 host_interval: float = HOST_MIN_INTERVAL, session_factory=requests.Session):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.hosts = HostLimiter(host_interval)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="feed-fetch")
+        self._session_factory = session_factory
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        # requests.Session is not guaranteed thread-safe; keep one per worker thread
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._session_factory()
+            session.headers['User-Agent'] = USER_AGENT
+            self._local.session = session
+        return session
+
+    def submit(self, fn, *args, **kwargs):
+        return self.executor.submit(fn, *args, **kwargs)
+
+    def _get_once(self, url: str, headers: Dict[str, str]):
+        host = urlparse(url).netloc
+        host_lock = self.hosts.acquire(host)
+        try:
+            # The deadline starts once this host's slot is ours, not while queued behind other feeds
+            deadline = time.monotonic() + self.timeout
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                raise FeedFetchError(str(e))
+            with response:
+                if response.status_code in RETRYABLE_STATUS:
+                    retry_after = response.headers.get('Retry-After')
+                    raise FeedFetchError(
+                        f"HTTP {response.status_code}",
+                        retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None
+                    )
+                if response.status_code >= 400:
+                    raise FeedFetchError(f"HTTP {response.status_code}", retryable=False)
+                # The timeout above is per socket read; enforce the whole-feed deadline while streaming
+                chunks, size = [], 0
+                try:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        chunks.append(chunk)
+                        size += len(chunk)
+                        if size > MAX_FEED_BYTES:
+                            raise FeedFetchError(f"feed larger than {MAX_FEED_BYTES} bytes", retryable=False)
+                        if time.monotonic() > deadline:
+                            raise FeedFetchError("feed deadline exceeded")
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    raise FeedFetchError(str(e))
+                return response.status_code, b''.join(chunks), response.headers
+        finally:
+            host_lock.release()
+
+    def fetch(self, name: str, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """Download one feed with retries; errors are reported on the result, not raised"""
+        result = FetchResult(name=name, url=url)
+        started = time.monotonic()
+        for attempt in range(self.retries + 1):
+            result.attempts = attempt + 1
+            try:
+                result.status_code, result.content, result.headers = self._get_once(url, headers or {})
+                result.error = None
+                break
+            except FeedFetchError as e:
+                result.error = str(e)
+                if not e.retryable or attempt == self.retries:
+                    break
+                delay = e.retry_after if e.retry_after is not None else self.backoff * (2 ** attempt)
+                delay = min(delay, 30) * random.uniform(0.8, 1.2)
+                logger.warning(f"Fetching {name} failed ({e}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+        result.elapsed = round(time.monotonic() - started, 3)
+        return result
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,60 @@
+"""
+Gunicorn configuration for serving Echo Mind in production
+Usage: gunicorn -c gunicorn.conf.py app:app
+
+Workers use gthread: each request runs on its own OS thread. gevent is not
+used because sqlite3 calls (the fact-check database and the SQLite rate
+limit backend) block without yielding, so a lock wait would stall every
+request sharing the worker's event loop; with real threads only the waiting
+request stalls.
+
+Concurrency is set with one number, ECHO_MIND_MAX_CONCURRENCY (default 16),
+which is the request thread count and the base of every worker pool size:
+  - resilience.py call pool: 2 x (3 x with model hedging) - one model call
+    and one BigQuery job per request
+  - evidence pool: 2 x - BigQuery and SQLite lookups
+  - model pool (streams) and batch pool (claim groups): 1 x each
+Accepting more connections than the pools serve only queues work inside the
+worker, where it eats into the model deadline (python -m benchmarks.run
+--scenarios request: p50 560 ms at 16 in flight, 1110 ms at 64 with the same
+pools). Raise ECHO_MIND_MAX_CONCURRENCY only together with the model quota,
+or scale out with ECHO_MIND_WORKERS.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8080)}"
+workers = int(os.environ.get('ECHO_MIND_WORKERS', 1))
+worker_class = 'gthread'
+
+# Maximum concurrent requests per worker process (the pools are sized from the same variable)
+threads = int(os.environ.get('ECHO_MIND_MAX_CONCURRENCY', 16))
+
+# Requests still running on SIGTERM get this long to finish (Cloud Run allows 10s by default)
+graceful_timeout = int(os.environ.get('ECHO_MIND_GRACEFUL_TIMEOUT', 10))
+timeout = int(os.environ.get('ECHO_MIND_WORKER_TIMEOUT', 120))
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('ECHO_MIND_LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    # Check the rate limit backend once in the master, so a missing or unreachable
+    # Redis stops gunicorn with an error instead of crash-looping every worker
+    from rate_limiter import build_backend
+    backend = build_backend()
+    close = getattr(backend, 'close', None)
+    if close is not None:
+        close()
+
+
+def post_worker_init(worker):
+    from app import initialize_app
+    initialize_app()
+
+
+def worker_exit(server, worker):
+    from app import shutdown_app
+    shutdown_app()
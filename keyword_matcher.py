@@ -0,0 +1,171 @@
+"""
+Compiled multi-pattern keyword matcher for Echo Mind
+Every keyword list in topic_keywords.py is compiled into one Aho-Corasick
+automaton, so a text is scanned once for all topics instead of once per
+keyword. Matches respect word boundaries ('ai' no longer matches 'said'); a
+trailing plural 's'/'es' is allowed, and prefix keywords match any word that
+starts with them.
+"""
+
+import threading
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import topic_keywords
+
+# Label namespaces used by the shared matcher
+SEARCH_TOPIC = 'search'
+CATEGORY = 'category'
+NEWS_TOPIC = 'news'
+POLITICS = 'politics'
+PRIORITY = 'priority'
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over (keyword, label) pairs.
+    Add keywords, then call compile() (done lazily on first scan).
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._patterns: List[Tuple[str, str, bool]] = []
+        self._compiled = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def add(self, keyword: str, label: str, prefix: bool = False):
+        """Register a keyword under a label; prefix keywords match the start of longer words"""
+        keyword = keyword.casefold().strip()
+        if not keyword:
+            return
+        state = 0
+        for ch in keyword:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][ch] = next_state
+            state = next_state
+        self._output[state].append(len(self._patterns))
+        self._patterns.append((keyword, label, prefix))
+        self._compiled = False
+
+    def add_group(self, keywords_by_label: Dict[str, List[str]], namespace: str, prefix: bool = False):
+        """Add {name: [keywords]} under labels '<namespace>:<name>'"""
+        for name, keywords in keywords_by_label.items():
+            for keyword in keywords:
+                self.add(keyword, f"{namespace}:{name}", prefix)
+
+    def compile(self):
+        """Build failure links breadth-first"""
+        with self._lock:
+            if self._compiled:
+                return
+            queue = deque()
+            for state in self._goto[0].values():
+                self._fail[state] = 0
+                queue.append(state)
+            while queue:
+                current = queue.popleft()
+                for ch, state in self._goto[current].items():
+                    queue.append(state)
+                    fallback = self._fail[current]
+                    while fallback and ch not in self._goto[fallback]:
+                        fallback = self._fail[fallback]
+                    self._fail[state] = self._goto[fallback].get(ch, 0)
+                    self._output[state] = self._output[state] + self._output[self._fail[state]]
+            self._compiled = True
+
+    @staticmethod
+    def _ends_word(text: str, end: int) -> bool:
+        if end >= len(text) or not _is_word_char(text[end]):
+            return True
+        # Allow simple plurals: 'vaccine' matches 'vaccines', 'match' matches 'matches'
+        for suffix in ('s', 'es'):
+            stop = end + len(suffix)
+            if text.startswith(suffix, end) and (stop >= len(text) or not _is_word_char(text[stop])):
+                return True
+        return False
+
+    def finditer(self, text: str) -> Iterator[Tuple[str, str, int, int]]:
+        """Yield (label, keyword, start, end) for every word-bounded match in the casefolded text"""
+        if not self._compiled:
+            self.compile()
+        text = text.casefold()
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self._patterns
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern_id in output[state]:
+                keyword, label, prefix = patterns[pattern_id]
+                start = i - len(keyword) + 1
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if prefix or self._ends_word(text, i + 1):
+                    yield label, keyword, start, i + 1
+
+    def scan(self, text: str, namespace: Optional[str] = None) -> Dict[str, int]:
+        """
+        Per-label hit counts (distinct keywords matched) in one pass.
+        With a namespace, only its labels are returned, without the prefix.
+        """
+        seen = set()
+        counts: Dict[str, int] = {}
+        prefix = f"{namespace}:" if namespace else None
+        for label, keyword, _, _ in self.finditer(text):
+            if prefix is not None:
+                if not label.startswith(prefix):
+                    continue
+                label = label[len(prefix):]
+            if (label, keyword) not in seen:
+                seen.add((label, keyword))
+                counts[label] = counts.get(label, 0) + 1
+        return counts
+
+
+def first_match(counts: Dict[str, int], order, default: str = 'general') -> str:
+    """The first label in `order` with any hits (keeps the original list-order priority)"""
+    for label in order:
+        if counts.get(label):
+            return label
+    return default
+
+
+def build_shared_matcher() -> KeywordMatcher:
+    matcher = KeywordMatcher()
+    matcher.add_group(topic_keywords.SEARCH_TOPIC_KEYWORDS, SEARCH_TOPIC)
+    matcher.add_group(topic_keywords.CATEGORIES, CATEGORY)
+    matcher.add_group(topic_keywords.NEWS_TOPIC_KEYWORDS, NEWS_TOPIC)
+    for keyword in topic_keywords.POLITICAL_KEYWORDS:
+        matcher.add(keyword, POLITICS)
+    for keyword in topic_keywords.PRIORITY_TERMS:
+        matcher.add(keyword, PRIORITY, prefix=True)
+    matcher.compile()
+    return matcher
+
+
+_matcher: Optional[KeywordMatcher] = None
+_matcher_lock = threading.Lock()
+
+
+def get_keyword_matcher() -> KeywordMatcher:
+    """Process-wide matcher compiled from topic_keywords.py"""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = build_shared_matcher()
+    return _matcher
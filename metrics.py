@@ -0,0 +1,232 @@
+"""
+Latency and event metrics for Echo Mind
+Stages of the analysis pipeline are timed with span() into fixed-bucket
+histograms (p50/p95/p99 are estimated from the buckets), and notable events
+- cache hits, fallbacks, model parse failures - are counted. Everything is
+rendered in the Prometheus text format for the /metrics endpoint.
+
+With ECHO_MIND_METRICS=0, span() returns a shared no-op context manager and
+observe()/inc() return immediately, so instrumented code pays next to nothing.
+"""
+
+import bisect
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+METRICS_ENABLED = os.environ.get('ECHO_MIND_METRICS', '1').lower() in ('1', 'true', 'yes')
+
+# Seconds; spans from sub-millisecond cache lookups up to a slow model call
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+REPORTED_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _label_key(labelnames: Sequence[str], labels: Dict[str, str]) -> Tuple[str, ...]:
+    return tuple(str(labels.get(name, '')) for name in labelnames)
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {','.join(key) or 'total': value for key, value in sorted(self._values.items())}
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set (the Prometheus histogram model)"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum, count, max]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0, value]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+            if value > series[3]:
+                series[3] = value
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Estimate of the q-quantile, interpolated linearly within its bucket (capped at the maximum seen)"""
+        with self._lock:
+            series = self._series.get(_label_key(self.labelnames, labels))
+            if series is None or not series[2]:
+                return None
+            counts, count, largest = list(series[0]), series[2], series[3]
+        rank = q * count
+        cumulative = 0
+        for i, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else largest
+                return min(lower + (upper - lower) * (rank - cumulative) / bucket_count, largest)
+            cumulative += bucket_count
+        return largest
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._series.items())
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def snapshot(self) -> Dict:
+        """{label values: {count, mean, p50, p95, p99}} in seconds"""
+        with self._lock:
+            keys = sorted((key, s[1], s[2]) for key, s in self._series.items())
+        summary = {}
+        for key, total, count in keys:
+            labels = dict(zip(self.labelnames, key))
+            entry = {'count': count, 'mean': round(total / count, 6) if count else None}
+            for q in REPORTED_QUANTILES:
+                estimate = self.quantile(q, **labels)
+                entry[f"p{int(q * 100)}"] = round(estimate, 6) if estimate is not None else None
+            summary[','.join(key) or 'total'] = entry
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+# Pipeline metrics
+STAGE_SECONDS = Histogram(
+    'echo_mind_stage_seconds', 'Time spent in each stage of a claim analysis', ('stage',))
+REQUEST_SECONDS = Histogram(
+    'echo_mind_request_seconds', 'HTTP request latency by endpoint and status', ('endpoint', 'status'))
+STAGE_ERRORS = Counter(
+    'echo_mind_stage_errors_total', 'Stages that ended with an exception', ('stage',))
+CACHE_LOOKUPS = Counter(
+    'echo_mind_claim_cache_lookups_total', 'Claim cache lookups by the tier that answered (or miss)', ('result',))
+FALLBACKS = Counter(
+    'echo_mind_fallbacks_total', 'Degraded paths taken: evidence fallbacks, model timeouts, reused verdicts', ('kind',))
+MODEL_PARSE_FAILURES = Counter(
+    'echo_mind_model_parse_failures_total', 'Model responses that could not be parsed as analyses', ('mode',))
+MODEL_RESPONSE_REPAIRS = Counter(
+    'echo_mind_model_response_repairs_total', 'Model responses parsed only after extracting or repairing their JSON', ('mode', 'how'))
+RESILIENCE_EVENTS = Counter(
+    'echo_mind_resilience_events_total', 'Retries, hedges, deadlines and circuit breaker transitions', ('dependency', 'event'))
+WRITE_BEHIND = Counter(
+    'echo_mind_write_behind_total', 'Background writes: queued, written, failed, or sync when the queue was full', ('kind', 'result'))
+
+REGISTRY = [STAGE_SECONDS, REQUEST_SECONDS, STAGE_ERRORS, CACHE_LOOKUPS, FALLBACKS, MODEL_PARSE_FAILURES,
+            MODEL_RESPONSE_REPAIRS, RESILIENCE_EVENTS, WRITE_BEHIND]
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+@contextmanager
+def _timed_span(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+
+
+def span(stage: str):
+    """Time a pipeline stage: `with span("model_call"): ...`"""
+    if not METRICS_ENABLED:
+        return _NULL_SPAN
+    return _timed_span(stage)
+
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def snapshot() -> Dict:
+    """JSON-friendly view with latency percentiles, e.g. for benchmarks"""
+    return {metric.name: metric.snapshot() for metric in REGISTRY}
+
+
+def reset():
+    for metric in REGISTRY:
+        metric.reset()
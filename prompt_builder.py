@@ -0,0 +1,205 @@
+"""
+Prompt assembly for Echo Mind analyses
+The instructions are identical for every claim, so they are compiled once
+into the model's system instruction (optionally stored as Vertex AI cached
+content). Each request only sends the date/context header, the current
+context lines relevant to the claim - capped by a token budget - and the
+claim itself.
+"""
+
+import hashlib
+import os
+import threading
+from typing import List, Optional, Sequence
+
+from clients import GEMINI_MODEL, get_client_manager
+
+# Prompt configuration (override with environment variables)
+CONTEXT_TOKEN_BUDGET = int(os.environ.get('ECHO_MIND_CONTEXT_TOKEN_BUDGET', 300))
+# Vertex AI context caching has a minimum size, so it is opt-in; the system instruction is used otherwise
+CONTEXT_CACHE_ENABLED = os.environ.get('ECHO_MIND_CONTEXT_CACHE', '0').lower() in ('1', 'true', 'yes')
+CONTEXT_CACHE_TTL = int(os.environ.get('ECHO_MIND_CONTEXT_CACHE_TTL', 3600))
+
+# Prompt sections shared by single-claim and batch analysis
+ANALYSIS_ROLE = "You are an expert fact-checking assistant with comprehensive knowledge across multiple domains. Your job is to provide accurate, detailed analysis of claims with special attention to current events and recent political changes."
+
+ANALYSIS_GUIDELINES = """CRITICAL CONTEXT FOR CURRENT CLAIMS:
+- ALWAYS verify political office holders against the most recent information
+- My knowledge cutoff is around April 2024, so I may not have information about very recent events
+- FOCUS ON INDIAN CONTEXT: Prioritize Indian political, social, and cultural context in analysis
+- Indian Politics Update (2024): Chandrababu Naidu (TDP) is the current CM of Andhra Pradesh since June 2024, NOT Jagan Mohan Reddy
+- For any political claims about "current" office holders, double-check against recent election results
+- Pay special attention to time-sensitive information that may have changed recently
+- For claims about events after April 2024, acknowledge knowledge limitations and suggest verification
+- Indian Regional Context: Consider state-specific politics, languages, cultures, and current affairs
+- Trusted Indian Sources: The Hindu, India Today, Times of India, Indian Express, NDTV, etc.
+
+ANALYSIS INSTRUCTIONS:
+1. Carefully examine the claim for factual accuracy, especially recent political changes
+2. For political claims about current office holders, verify against the most recent information
+3. Consider the context, source credibility, and supporting evidence
+4. Provide a thorough, multi-paragraph explanation (minimum 3-4 sentences)
+5. Include specific details about WHY the claim is classified as it is
+6. Mention any scientific consensus, expert opinions, or reliable sources that support or contradict the claim
+7. If the claim is false or suspicious, explain what makes it problematic and provide the correct current information
+8. If the claim is trustworthy, explain what evidence supports it
+9. For outdated information, clearly state what the current accurate information is
+
+CLASSIFICATION RULES:
+- **Trustworthy**: Factually accurate claims supported by credible sources, scientific consensus, or established facts
+- **Suspicious**: Claims that lack sufficient evidence, are misleading, or contain partial truths mixed with speculation
+- **False**: Claims that are demonstrably incorrect, debunked by experts, contain clear misinformation, OR are outdated political information
+- **SPECIAL**: Political office holder claims must be verified against current (2024) information
+- If the text is from trusted news outlets (BBC, Reuters, The Hindu, NY Times, etc.), lean towards Trustworthy unless the content itself is clearly problematic"""
+
+RESPONSE_FIELDS = """- "classification": one of [Trustworthy, Suspicious, False]
+- "explanation": a detailed, comprehensive explanation (3-5 sentences minimum) that thoroughly explains your reasoning, includes relevant context, provides specific details about why this classification was chosen, and if applicable, states the current correct information
+- "score": confidence score from 0-100 (where 100 means completely certain)
+- "tips": array of 2-4 specific, actionable tips for fact-checking similar claims, especially emphasizing verification of current information for political claims"""
+
+ANALYSIS_REMINDER = "IMPORTANT: Make the explanation detailed and educational. Don't just state the classification - explain the reasoning, context, provide current accurate information when relevant, and give valuable insights that help users understand the topic better."
+
+SYSTEM_INSTRUCTION = f"""{ANALYSIS_ROLE}
+
+{ANALYSIS_GUIDELINES}
+
+Every analysis is a JSON object with these keys:
+{RESPONSE_FIELDS}
+
+{ANALYSIS_REMINDER}"""
+
+# Constructor arguments of the shared analysis model (also used by the startup warm-up)
+ANALYSIS_MODEL_KWARGS = {'system_instruction': SYSTEM_INSTRUCTION}
+
+SINGLE_RESPONSE_FORMAT = "Respond with a single JSON object."
+BATCH_RESPONSE_FORMAT = (
+    "Respond with a JSON array containing one object per claim, each with an extra key "
+    "\"id\": the number of the claim in square brackets above."
+)
+
+# Changes whenever the instructions do, so cached analyses from an older prompt are not reused
+PROMPT_VERSION = hashlib.sha256(
+    "\n".join((SYSTEM_INSTRUCTION, SINGLE_RESPONSE_FORMAT, BATCH_RESPONSE_FORMAT)).encode('utf-8')
+).hexdigest()[:8]
+
+# search_current_info lines that repeat the context header or carry no claim-specific information
+_REDUNDANT_CONTEXT_PREFIXES = (
+    "Current Date:",
+    "Data last updated:",
+    "Query Topic Detected:",
+    "For current information about",
+    "Check official government websites",
+    "Political information changes frequently",
+    "Unable to fetch current information",
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)"""
+    return len(text) // 4 + 1
+
+
+def select_context_lines(lines: Optional[Sequence[str]], budget: int = CONTEXT_TOKEN_BUDGET) -> List[str]:
+    """
+    Current-context lines worth sending to the model, in their original
+    (most relevant first) order, until the token budget is spent.
+    """
+    selected = []
+    remaining = budget
+    for line in lines or []:
+        if line.startswith(_REDUNDANT_CONTEXT_PREFIXES):
+            continue
+        cost = estimate_tokens(line)
+        if cost > remaining:
+            break
+        selected.append(line)
+        remaining -= cost
+    return selected
+
+
+def _context_section(context_info: str, context_lines: Sequence[str]) -> str:
+    section = f"CURRENT CONTEXT:\n{context_info}"
+    if context_lines:
+        section += "\n" + "\n".join(context_lines)
+    return section
+
+
+def build_claim_prompt(text: str, context_info: str, current_info: Optional[Sequence[str]] = None) -> str:
+    """Per-request part of a single-claim analysis"""
+    return f"""{_context_section(context_info, select_context_lines(current_info))}
+
+Claim to analyze:
+{text}
+
+{SINGLE_RESPONSE_FORMAT}"""
+
+
+def build_batch_prompt(texts: Sequence[str], context_info: str,
+                       current_infos: Optional[Sequence[Optional[Sequence[str]]]] = None) -> str:
+    """Per-request part of a batch analysis; the context budget is shared across the claims"""
+    current_infos = current_infos or [None] * len(texts)
+    per_claim_budget = max(CONTEXT_TOKEN_BUDGET // max(len(texts), 1), 40)
+    numbered_claims = []
+    for i, (text, current_info) in enumerate(zip(texts, current_infos), 1):
+        numbered_claims.append(f"[{i}] {' '.join(text.split())}")
+        lines = select_context_lines(current_info, per_claim_budget)
+        if lines:
+            numbered_claims.append(f"    Context: {'; '.join(lines)}")
+    claims_block = "\n".join(numbered_claims)
+    return f"""{_context_section(context_info, [])}
+
+Claims to analyze (analyze each claim independently):
+{claims_block}
+
+{BATCH_RESPONSE_FORMAT}"""
+
+
+class _CachedModel:
+    """A model bound to Vertex AI cached content holding SYSTEM_INSTRUCTION, recreated before it expires"""
+
+    def __init__(self):
+        self._model = None
+        self._expires_at = 0.0
+        self._disabled = False
+        self._lock = threading.Lock()
+
+    def get(self):
+        import time
+        if self._disabled:
+            return None
+        if self._model is not None and time.time() < self._expires_at - 60:
+            return self._model
+        with self._lock:
+            if self._model is not None and time.time() < self._expires_at - 60:
+                return self._model
+            try:
+                import datetime
+                from vertexai.generative_models import GenerativeModel
+                from vertexai.preview import caching
+                get_client_manager().model(GEMINI_MODEL)  # initializes Vertex AI once
+                cached_content = caching.CachedContent.create(
+                    model_name=GEMINI_MODEL,
+                    system_instruction=SYSTEM_INSTRUCTION,
+                    ttl=datetime.timedelta(seconds=CONTEXT_CACHE_TTL)
+                )
+                self._model = GenerativeModel.from_cached_content(cached_content=cached_content)
+                self._expires_at = time.time() + CONTEXT_CACHE_TTL
+                print(f"✅ Cached analysis instructions on Vertex AI for {CONTEXT_CACHE_TTL}s")
+            except Exception as e:
+                # e.g. below the minimum cacheable size - fall back to the system instruction for good
+                print(f"⚠️ Context caching unavailable, using system instruction: {e}")
+                self._disabled = True
+                self._model = None
+            return self._model
+
+
+_cached_model = _CachedModel()
+
+
+def get_analysis_model():
+    """Shared model with the analysis instructions as its static prefix"""
+    if CONTEXT_CACHE_ENABLED:
+        model = _cached_model.get()
+        if model is not None:
+            return model
+    return get_client_manager().model(GEMINI_MODEL, **ANALYSIS_MODEL_KWARGS)
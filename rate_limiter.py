@@ -0,0 +1,247 @@
+"""
+Request rate limiting for the Echo Mind API
+Sliding-window counters: each key keeps a count for the current and previous
+fixed window, and a request is allowed while
+
+    previous_count * (unexpired share of the previous window) + current_count <= limit
+
+Every decision is a constant number of O(1) operations on a pluggable
+backend, so the limit can be shared between threads (memory), gunicorn
+workers on one machine (SQLite) or every instance of the service (Redis).
+Counters for idle keys expire after two windows.
+
+Tests can swap in the in-memory Redis client from benchmarks/fakes.py:
+    set_rate_limiter(RateLimiter(RedisBackend(FakeRedis()), limit=5, window=60))
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+# Rate limit configuration (override with environment variables)
+RATE_LIMIT = int(os.environ.get('ECHO_MIND_RATE_LIMIT', 100))
+RATE_LIMIT_WINDOW = int(os.environ.get('ECHO_MIND_RATE_LIMIT_WINDOW', 3600))
+REDIS_URL = os.environ.get('ECHO_MIND_REDIS_URL', '')
+# memory | sqlite | redis; defaults to redis when a URL is configured, otherwise SQLite
+RATE_LIMIT_BACKEND = os.environ.get('ECHO_MIND_RATE_LIMIT_BACKEND', 'redis' if REDIS_URL else 'sqlite')
+RATE_LIMIT_DB = Path(os.environ.get('ECHO_MIND_RATE_LIMIT_DB', Path(__file__).parent / "rate_limits.db"))
+MAX_MEMORY_KEYS = int(os.environ.get('ECHO_MIND_RATE_LIMIT_MAX_KEYS', 100000))
+
+
+@dataclass
+class RateDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int = 0  # seconds until a request would be allowed again
+
+
+class MemoryBackend:
+    """
+    Per-process counters; idle keys are evicted in least-recently-used order,
+    so memory is bounded by the number of keys active in the last two windows
+    (and by max_keys).
+    """
+
+    def __init__(self, max_keys: int = MAX_MEMORY_KEYS):
+        self.max_keys = max_keys
+        self._counters: "OrderedDict[str, list]" = OrderedDict()  # key -> [window, current, previous]
+        self._lock = threading.Lock()
+
+    def _evict(self, window: int):
+        while self._counters:
+            key, counter = next(iter(self._counters.items()))
+            if counter[0] >= window - 1 and len(self._counters) <= self.max_keys:
+                break
+            del self._counters[key]
+
+    def increment(self, key: str, window: int, ttl: int) -> Tuple[int, int]:
+        with self._lock:
+            counter = self._counters.pop(key, None)
+            if counter is None or counter[0] < window - 1:
+                counter = [window, 0, 0]
+            elif counter[0] == window - 1:
+                counter = [window, 0, counter[1]]
+            counter[1] += 1
+            self._counters[key] = counter  # most recently used last
+            self._evict(window)
+            return counter[1], counter[2]
+
+    def decrement(self, key: str, window: int, ttl: int):
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is not None and counter[0] == window and counter[1] > 0:
+                counter[1] -= 1
+
+    def __len__(self):
+        return len(self._counters)
+
+
+class SQLiteBackend:
+    """
+    Counters in a small SQLite file shared by every process on the machine.
+    Each update is a single atomic statement, so concurrent workers never
+    lose counts; expired windows are deleted once per window per process.
+    """
+
+    def __init__(self, path=RATE_LIMIT_DB, timeout: float = 5.0):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS rate_windows (
+                key TEXT NOT NULL,
+                window INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (key, window)
+            ) WITHOUT ROWID
+        ''')
+        self._last_eviction = None
+
+    def increment(self, key: str, window: int, ttl: int) -> Tuple[int, int]:
+        with self._lock:
+            if self._last_eviction != window:
+                self._conn.execute("DELETE FROM rate_windows WHERE window < ?", (window - 1,))
+                self._last_eviction = window
+            current = self._conn.execute('''
+                INSERT INTO rate_windows (key, window, count) VALUES (?, ?, 1)
+                ON CONFLICT(key, window) DO UPDATE SET count = count + 1
+                RETURNING count
+            ''', (key, window)).fetchone()[0]
+            row = self._conn.execute(
+                "SELECT count FROM rate_windows WHERE key = ? AND window = ?", (key, window - 1)
+            ).fetchone()
+            return current, row[0] if row else 0
+
+    def decrement(self, key: str, window: int, ttl: int):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE rate_windows SET count = count - 1 WHERE key = ? AND window = ? AND count > 0",
+                (key, window)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisBackend:
+    """
+    Counters in Redis (or anything speaking its INCR/DECR/EXPIRE/GET commands),
+    shared by every instance of the service. Keys expire on their own.
+    Pass a client, e.g. redis.Redis.from_url(url) or a local fake.
+    """
+
+    def __init__(self, client, prefix: str = 'echo-mind:rate'):
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, key: str, window: int) -> str:
+        return f"{self.prefix}:{key}:{window}"
+
+    def increment(self, key: str, window: int, ttl: int) -> Tuple[int, int]:
+        pipe = self.client.pipeline()
+        pipe.incr(self._key(key, window))
+        pipe.expire(self._key(key, window), ttl)
+        pipe.get(self._key(key, window - 1))
+        current, _, previous = pipe.execute()
+        return int(current), int(previous or 0)
+
+    def decrement(self, key: str, window: int, ttl: int):
+        # Should the key expire in between, DECR recreates it: give it the TTL again
+        pipe = self.client.pipeline()
+        pipe.decr(self._key(key, window))
+        pipe.expire(self._key(key, window), ttl)
+        pipe.execute()
+
+    def close(self):
+        self.client.close()
+
+
+class RateLimiter:
+    """Sliding-window limiter of `limit` requests per `window` seconds per key"""
+
+    def __init__(self, backend, limit: int = RATE_LIMIT, window: int = RATE_LIMIT_WINDOW, clock=time.time):
+        self.backend = backend
+        self.limit = limit
+        self.window = window
+        self.clock = clock
+
+    def hit(self, key: str) -> RateDecision:
+        """Count one request for `key` if it is within the limit"""
+        now = self.clock()
+        window = int(now // self.window)
+        elapsed = now - window * self.window
+        previous_weight = 1 - elapsed / self.window
+        ttl = 2 * self.window  # counters outlive the window they count and the one after it
+        try:
+            current, previous = self.backend.increment(key, window, ttl)
+        except Exception as e:
+            # Don't take the API down with the limiter's storage
+            print(f"⚠️ Rate limiter unavailable, allowing request: {e}")
+            return RateDecision(True, self.limit, self.limit)
+
+        estimated = previous * previous_weight + current
+        if estimated <= self.limit:
+            return RateDecision(True, self.limit, int(self.limit - estimated))
+
+        # Rejected requests don't count against the caller
+        try:
+            self.backend.decrement(key, window, ttl)
+        except Exception as e:
+            print(f"⚠️ Rate limiter could not release a rejected request: {e}")
+        current -= 1
+        if previous and current < self.limit:
+            # Wait until enough of the previous window has slid out
+            free_at = self.window * (1 - (self.limit - current - 1) / previous)
+            retry_after = free_at - elapsed
+        else:
+            retry_after = self.window - elapsed
+        return RateDecision(False, self.limit, 0, max(1, math.ceil(retry_after)))
+
+
+def build_backend(name: str = RATE_LIMIT_BACKEND):
+    """The configured backend; raises if it can't be used (Redis is pinged first)"""
+    if name == 'memory':
+        return MemoryBackend()
+    if name == 'sqlite':
+        return SQLiteBackend()
+    if name == 'redis':
+        import redis
+        client = redis.Redis.from_url(REDIS_URL or 'redis://localhost:6379/0')
+        client.ping()
+        return RedisBackend(client)
+    raise ValueError(f"Unknown rate limit backend: {name}")
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Process-wide rate limiter. Raises if the configured backend is
+    unavailable: a per-process fallback would silently multiply the limit
+    by the number of workers and instances.
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter(build_backend())
+    return _rate_limiter
+
+
+def set_rate_limiter(limiter: Optional[RateLimiter]):
+    """Replace the process-wide limiter (e.g. with one using a local fake backend)"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        _rate_limiter = limiter
@@ -0,0 +1,334 @@
+"""
+Resilience for Echo Mind's calls to Vertex AI and BigQuery
+Every call through a Dependency gets:
+  - a deadline: the caller gets an answer or CallTimeoutError in time, and
+    attempts still running are abandoned to a bounded worker pool
+  - retries with full-jitter exponential backoff on transient errors (quota,
+    unavailable, deadline, connection), never sleeping past the deadline
+  - optional hedging: if an attempt is still running after the recent p95
+    latency, one duplicate is started and the first answer wins
+  - a circuit breaker: after `failure_threshold` consecutive transient
+    failures, calls fail fast with CircuitOpenError for `reset_timeout`
+    seconds, then one probe call decides whether to close it again
+Streamed generations can't go through call(): stream_with_deadline gives
+them the deadline and Dependency.guard() the breaker bookkeeping.
+
+analysis_engine answers from database evidence alone while the model's
+breaker is open (see evidence_only_analysis there).
+
+Tests can inject faults with the local fakes in benchmarks/fakes.py
+(FaultInjector) and a fake clock:
+    CircuitBreaker("model", failure_threshold=2, reset_timeout=5, clock=fake_clock)
+"""
+
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+from metrics import RESILIENCE_EVENTS
+
+# Requests in flight per worker process (gunicorn's threads); pool sizes derive from it
+MAX_CONCURRENCY = int(os.environ.get('ECHO_MIND_MAX_CONCURRENCY', 16))
+
+# Resilience configuration (override with environment variables)
+MODEL_CALL_TIMEOUT = float(os.environ.get('ECHO_MIND_MODEL_CALL_TIMEOUT', os.environ.get('ECHO_MIND_MODEL_TIMEOUT', 60)))
+MODEL_RETRIES = int(os.environ.get('ECHO_MIND_MODEL_RETRIES', 2))
+MODEL_HEDGE_ENABLED = os.environ.get('ECHO_MIND_MODEL_HEDGE', '0').lower() in ('1', 'true', 'yes')
+BIGQUERY_RETRIES = int(os.environ.get('ECHO_MIND_BIGQUERY_RETRIES', 1))
+RETRY_BASE_DELAY = float(os.environ.get('ECHO_MIND_RETRY_BASE_DELAY', 0.5))
+RETRY_MAX_DELAY = float(os.environ.get('ECHO_MIND_RETRY_MAX_DELAY', 4))
+HEDGE_QUANTILE = float(os.environ.get('ECHO_MIND_HEDGE_QUANTILE', 0.95))
+HEDGE_MIN_SAMPLES = int(os.environ.get('ECHO_MIND_HEDGE_MIN_SAMPLES', 20))
+BREAKER_FAILURES = int(os.environ.get('ECHO_MIND_BREAKER_FAILURES', 5))
+BREAKER_RESET = float(os.environ.get('ECHO_MIND_BREAKER_RESET', 30))
+# One model call and one BigQuery job per request in flight, plus a hedge per model call if enabled
+RESILIENCE_WORKERS = int(os.environ.get('ECHO_MIND_RESILIENCE_WORKERS', MAX_CONCURRENCY * (3 if MODEL_HEDGE_ENABLED else 2)))
+
+# google.api_core / gRPC / requests exception class names worth another attempt
+TRANSIENT_ERRORS = {
+    'TooManyRequests', 'ResourceExhausted', 'ServiceUnavailable', 'InternalServerError', 'BadGateway',
+    'GatewayTimeout', 'DeadlineExceeded', 'Aborted', 'RetryError', 'TimeoutError', 'Timeout',
+    'ConnectionError', 'ConnectionResetError', 'ConnectTimeout', 'ReadTimeout', 'CallTimeoutError',
+}
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """The dependency's circuit breaker is open; the call was not attempted"""
+
+
+class CallTimeoutError(FuturesTimeoutError):
+    """No attempt finished before the call's deadline"""
+
+
+def is_transient(error: BaseException) -> bool:
+    """Errors that say nothing about the request itself: retry, and count against the breaker"""
+    if type(error).__name__ in TRANSIENT_ERRORS or isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, 'code', None)
+    code = code() if callable(code) else code
+    return getattr(code, 'value', code) in TRANSIENT_STATUS_CODES
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker: closed -> open -> half_open (one probe) -> closed"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURES, reset_timeout: float = BREAKER_RESET,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str):
+        self.state = state
+        RESILIENCE_EVENTS.inc(dependency=self.name, event=state)
+        print(f"🔌 {self.name} circuit breaker {state.replace('_', '-')}")
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now (in half-open state, only the single probe)"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if self.clock() - self.opened_at < self.reset_timeout:
+                    return False
+                self._transition(self.HALF_OPEN)
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probe_in_flight = False
+            if self.state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                self.opened_at = self.clock()
+                self._transition(self.OPEN)
+
+    def release(self):
+        """Give back a probe that ended without telling anything about the dependency"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != self.CLOSED
+
+    def status(self) -> Dict:
+        return {'state': self.state, 'consecutive_failures': self.failures}
+
+
+class LatencyWindow:
+    """Recent successful call durations, for the hedging threshold"""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float, min_samples: int = HEDGE_MIN_SAMPLES) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < max(1, min_samples):
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+_executor = ThreadPoolExecutor(max_workers=RESILIENCE_WORKERS, thread_name_prefix="echo-mind-call")
+
+
+class Dependency:
+    """Deadlines, jittered retries, optional hedging and a circuit breaker for one remote service"""
+
+    def __init__(self, name: str, timeout: float, retries: int = 0, hedge: bool = False,
+                 breaker: Optional[CircuitBreaker] = None, base_delay: float = RETRY_BASE_DELAY,
+                 max_delay: float = RETRY_MAX_DELAY, hedge_quantile: float = HEDGE_QUANTILE,
+                 rng: Optional[random.Random] = None):
+        self.name = name
+        self.timeout = timeout
+        self.retries = retries
+        self.hedge = hedge
+        self.breaker = breaker or CircuitBreaker(name)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_quantile = hedge_quantile
+        self.latencies = LatencyWindow()
+        self._rng = rng or random.Random()
+
+    def backoff(self, retry: int) -> float:
+        """Full jitter: uniform between 0 and the capped exponential delay"""
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** retry)))
+
+    def hedge_delay(self) -> Optional[float]:
+        return self.latencies.quantile(self.hedge_quantile) if self.hedge else None
+
+    def call(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+        """
+        fn(*args, **kwargs) within `timeout` seconds (default: the dependency's).
+        Raises CircuitOpenError without calling fn while the breaker is open,
+        CallTimeoutError at the deadline, or the last error once retries are
+        spent (non-transient errors are raised straight away).
+        """
+        if not self.breaker.allow():
+            RESILIENCE_EVENTS.inc(dependency=self.name, event="rejected")
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit breaker open)")
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        retry = 0
+        while True:
+            try:
+                result = self._attempt(fn, args, kwargs, deadline)
+            except Exception as e:
+                transient = is_transient(e)
+                if isinstance(e, CallTimeoutError):
+                    RESILIENCE_EVENTS.inc(dependency=self.name, event="deadline")
+                if not transient:
+                    self.breaker.release()
+                    raise
+                delay = self.backoff(retry)
+                if retry >= self.retries or time.monotonic() + delay >= deadline:
+                    self.breaker.record_failure()
+                    raise
+                retry += 1
+                RESILIENCE_EVENTS.inc(dependency=self.name, event="retry")
+                print(f"⏳ {self.name} call failed ({type(e).__name__}: {e}); retry {retry} in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    def _attempt(self, fn, args, kwargs, deadline):
+        """One attempt (plus at most one hedge), waited for until the deadline"""
+        def timed():
+            started = time.monotonic()
+            result = fn(*args, **kwargs)
+            self.latencies.add(time.monotonic() - started)
+            return result
+
+        pending = {_executor.submit(timed)}
+        hedge_at = self.hedge_delay()
+        hedged = None
+        error = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            wait_for = remaining if hedge_at is None or hedged is not None else min(remaining, hedge_at)
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if future is hedged:
+                    RESILIENCE_EVENTS.inc(dependency=self.name, event="hedge_won")
+                return result
+            if error is not None and not pending:
+                raise error
+            if not done and hedged is None and hedge_at is not None and time.monotonic() < deadline:
+                # Still waiting past the usual p95: race a duplicate request
+                RESILIENCE_EVENTS.inc(dependency=self.name, event="hedge")
+                hedged = _executor.submit(timed)
+                pending.add(hedged)
+        for future in pending:
+            future.cancel()
+        if error is not None:
+            raise error
+        raise CallTimeoutError(f"{self.name} call exceeded its {self.timeout:.1f}s deadline")
+
+    @contextmanager
+    def guard(self):
+        """
+        Breaker bookkeeping for calls that can't go through call(), such as
+        streamed generations: raises CircuitOpenError when open, records the
+        outcome of the block.
+        """
+        if not self.breaker.allow():
+            RESILIENCE_EVENTS.inc(dependency=self.name, event="rejected")
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit breaker open)")
+        try:
+            yield
+        except Exception as e:
+            if is_transient(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.release()
+            raise
+        self.breaker.record_success()
+
+    def status(self) -> Dict:
+        return {**self.breaker.status(), 'hedge_after': self.hedge_delay()}
+
+
+def stream_with_deadline(fn: Callable, *args, deadline: float, name: str = "stream", **kwargs) -> Iterator:
+    """
+    Items of the iterable fn(*args, **kwargs) until `deadline` (monotonic),
+    then CallTimeoutError, even while the stream sends nothing. The stream is
+    read on its own daemon thread, so a caller that gives up frees its worker
+    at once; the abandoned read stops with the stream's next item or error.
+    Errors from the stream are raised to the caller.
+    """
+    items = queue.Queue()
+    stop = threading.Event()
+    end = object()
+
+    def read():
+        try:
+            for item in fn(*args, **kwargs):
+                if stop.is_set():
+                    return
+                items.put((item, None))
+        except Exception as e:
+            items.put((end, e))
+            return
+        items.put((end, None))
+
+    threading.Thread(target=read, name=f"echo-mind-{name}", daemon=True).start()
+    try:
+        while True:
+            try:
+                item, error = items.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                RESILIENCE_EVENTS.inc(dependency=name, event="deadline")
+                raise CallTimeoutError(f"{name} stream exceeded its deadline") from None
+            if item is end:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+MODEL = Dependency('model', MODEL_CALL_TIMEOUT, retries=MODEL_RETRIES, hedge=MODEL_HEDGE_ENABLED)
+BIGQUERY = Dependency('bigquery', float(os.environ.get('ECHO_MIND_BIGQUERY_TIMEOUT', 10)), retries=BIGQUERY_RETRIES)
+
+
+def status() -> Dict:
+    """Breaker state of each dependency, for /health"""
+    return {'model': MODEL.status(), 'bigquery': BIGQUERY.status()}
@@ -0,0 +1,466 @@
+"""
+Parsing of model responses for Echo Mind
+Analyses are requested in Vertex AI's structured-output mode (JSON constrained
+to ANALYSIS_SCHEMA / BATCH_SCHEMA), so a response is normally valid JSON as
+it stands. Whatever still comes back wrapped in prose or markdown fences,
+truncated, or with the usual hand-written-JSON defects (trailing commas,
+single quotes, Python literals, raw newlines in strings) is extracted and
+repaired here rather than wasting the call.
+
+  extract_json(text)      - the first JSON object/array in text, repaired if needed
+  parse_analysis(text)    - one validated analysis dict ("repaired" set if it needed repair)
+  parse_batch(text, n)    - n analyses by claim id (None where unusable)
+  JsonValueScanner        - finds where the first JSON value ends in streamed text
+  JsonFieldStream         - decodes one string field out of streamed JSON
+"""
+
+import json
+import os
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+STRUCTURED_OUTPUT_ENABLED = os.environ.get('ECHO_MIND_STRUCTURED_OUTPUT', '1').lower() in ('1', 'true', 'yes')
+
+CLASSIFICATIONS = ("Trustworthy", "Suspicious", "False")
+# Brackets in the response tried as the start of the JSON value (prose can contain stray ones)
+MAX_JSON_CANDIDATES = 8
+
+ANALYSIS_PROPERTIES = {
+    "classification": {"type": "string", "enum": list(CLASSIFICATIONS)},
+    "explanation": {"type": "string"},
+    "score": {"type": "integer"},
+    "tips": {"type": "array", "items": {"type": "string"}},
+}
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": ANALYSIS_PROPERTIES,
+    "required": ["classification", "explanation", "score", "tips"],
+}
+BATCH_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {"id": {"type": "integer"}, **ANALYSIS_PROPERTIES},
+        "required": ["id", "classification", "explanation", "score", "tips"],
+    },
+}
+
+
+class ResponseParseError(ValueError):
+    """The model response holds no usable analysis"""
+
+
+_generation_configs: Dict[bool, object] = {}
+
+
+def generation_config(batch: bool = False):
+    """generate_content() config requesting JSON that matches the analysis schema, or None if disabled"""
+    if not STRUCTURED_OUTPUT_ENABLED:
+        return None
+    config = _generation_configs.get(batch)
+    if config is None:
+        schema = BATCH_SCHEMA if batch else ANALYSIS_SCHEMA
+        try:
+            from vertexai.generative_models import GenerationConfig
+            config = GenerationConfig(response_mime_type="application/json", response_schema=schema)
+        except ImportError:
+            config = {"response_mime_type": "application/json", "response_schema": schema}
+        _generation_configs[batch] = config
+    return config
+
+
+class JsonValueScanner:
+    """
+    Tracks streamed text until the first complete JSON object or array.
+    feed() returns True once it is complete; text is then that value alone,
+    so trailing commentary never has to be generated or parsed. With
+    `accept`, a complete value that does not parse or that accept(value)
+    rejects is skipped and scanning goes on after it.
+    """
+
+    def __init__(self, openers: str = "{[", accept: Optional[Callable[[object], bool]] = None):
+        self.openers = openers
+        self.accept = accept
+        self.start = None
+        self.end = None
+        self._buffer = []
+        self._length = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def complete(self) -> bool:
+        return self.end is not None
+
+    @property
+    def text(self) -> str:
+        """The value so far (complete or not), or everything fed if no value started"""
+        buffer = "".join(self._buffer)
+        if self.start is None:
+            return buffer
+        return buffer[self.start:self.end]
+
+    def feed(self, chunk: str) -> bool:
+        if self.complete or not chunk:
+            return self.complete
+        offset = self._length
+        self._buffer.append(chunk)
+        self._length += len(chunk)
+        for i, ch in enumerate(chunk):
+            if self.start is None:
+                if ch in self.openers:
+                    self.start = offset + i
+                    self._depth = 1
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    if self._accepts(offset + i + 1):
+                        self.end = offset + i + 1
+                        return True
+                    self.start = None
+        return False
+
+    def _accepts(self, end: int) -> bool:
+        if self.accept is None:
+            return True
+        try:
+            return bool(self.accept(json.loads("".join(self._buffer)[self.start:end])))
+        except ValueError:
+            return False
+
+
+_BARE_WORDS = {'True': 'true', 'False': 'false', 'None': 'null'}
+_WORD = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+_KEY_FOLLOWS = re.compile(r'\s*:')
+
+
+def repair_json(text: str) -> str:
+    """
+    Rewrite the first JSON value in text as valid JSON where possible:
+    single-quoted strings, raw control characters in strings, trailing
+    commas, Python True/False/None and (at the end of truncated output)
+    unterminated strings and brackets. Anything after the value is dropped.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    # Output length and open brackets after each complete member, for truncated output
+    safe_points: List[Tuple[int, Tuple[str, ...]]] = []
+    quote = None
+    escaped = False
+    i = 0
+    started = False
+    while i < len(text):
+        ch = text[i]
+        if quote is not None:
+            if escaped:
+                escaped = False
+                if ch not in '"\\/bfnrtu':
+                    # Not a JSON escape (\' in single-quoted strings): keep the character
+                    out.pop()
+                    out.append(ch if ch == "'" else '\\\\' + ch)
+                else:
+                    out.append(ch)
+            elif ch == '\\':
+                escaped = True
+                out.append(ch)
+            elif ch == quote:
+                quote = None
+                out.append('"')
+            elif ch == '"':
+                out.append('\\"')  # inside a single-quoted string
+            elif ch in '“”' and quote == '“':
+                quote = None
+                out.append('"')
+            elif ch == '\n':
+                out.append('\\n')
+            elif ch == '\r':
+                out.append('\\r')
+            elif ch == '\t':
+                out.append('\\t')
+            elif ch < ' ':
+                out.append(f'\\u{ord(ch):04x}')
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if not started:
+            if ch in '{[':
+                started = True
+                stack.append('}' if ch == '{' else ']')
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch in '"\'“':
+            quote = ch
+            out.append('"')
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+            out.append(ch)
+        elif ch in '}]':
+            _strip_trailing_comma(out)
+            if stack:
+                stack.pop()
+            out.append(ch)
+            if not stack:
+                return "".join(out)
+        elif ch == ',':
+            safe_points.append((len(out), tuple(stack)))
+            out.append(ch)
+        elif ch.isalpha() or ch == '_':
+            word = _WORD.match(text, i).group()
+            i += len(word)
+            if word not in _BARE_WORDS and _KEY_FOLLOWS.match(text, i):
+                out.append(f'"{word}"')  # unquoted key
+            else:
+                out.append(_BARE_WORDS.get(word, word))
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    if not started:
+        return text
+    # Truncated: close what is open, or cut back to the last complete member
+    if quote is not None:
+        if escaped:
+            out.pop()
+        out.append('"')
+    _strip_trailing_comma(out)
+    candidate = "".join(out) + "".join(reversed(stack))
+    try:
+        json.loads(candidate)
+        return candidate
+    except ValueError:
+        pass
+    for length, open_stack in reversed(safe_points):
+        candidate = "".join(out[:length]) + "".join(reversed(open_stack))
+        try:
+            json.loads(candidate)
+            return candidate
+        except ValueError:
+            continue
+    return candidate
+
+
+def _strip_trailing_comma(out: List[str]):
+    j = len(out) - 1
+    while j >= 0 and out[j].isspace():
+        j -= 1
+    if j >= 0 and out[j] in (',', ':'):
+        del out[j:]
+
+
+def extract_json(text: str, openers: str = "{[",
+                 accept: Optional[Callable[[object], bool]] = None) -> Tuple[object, str]:
+    """
+    The first JSON value in a model response (that accept(value) allows, if
+    given) and how it was obtained: "clean" (the whole text), "extracted"
+    (cut out of surrounding prose or fences) or "repaired". Raises
+    ResponseParseError if nothing usable parses.
+    """
+    if text is None or not text.strip():
+        raise ResponseParseError("Model returned an empty response.")
+    stripped = text.strip()
+    if stripped[0] in openers:
+        try:
+            value = json.loads(stripped)
+            if accept is None or accept(value):
+                return value, "clean"
+        except ValueError:
+            pass
+
+    starts = [i for i, ch in enumerate(text) if ch in openers][:MAX_JSON_CANDIDATES]
+    if not starts:
+        raise ResponseParseError("No JSON found in model response.")
+    error = None
+    skip_until = 0
+    for start in starts:
+        if start < skip_until:
+            continue  # nested inside a candidate that already failed
+        scanner = JsonValueScanner(openers)
+        if scanner.feed(text[start:]):
+            try:
+                value = json.loads(scanner.text)
+            except ValueError:
+                pass
+            else:
+                if accept is None or accept(value):
+                    return value, "extracted"
+                # Valid JSON of the wrong shape: the value may be nested in it, or follow it
+                error = error or ResponseParseError("JSON in model response has an unexpected shape")
+                continue
+        try:
+            value = json.loads(repair_json(text[start:]))
+            if accept is None or accept(value):
+                return value, "repaired"
+            error = error or ResponseParseError("Repaired JSON in model response has an unexpected shape")
+        except ValueError as e:
+            error = error or e
+        skip_until = start + scanner.end if scanner.complete else len(text)
+    raise ResponseParseError(f"Unrepairable JSON in model response: {error}")
+
+
+def normalize_analysis(item) -> Dict:
+    """
+    An analysis with a known classification, a non-empty explanation, an
+    integer 0-100 score and a list of string tips. Raises ResponseParseError
+    if the classification, explanation or score is missing or unusable.
+    """
+    if not isinstance(item, dict):
+        raise ResponseParseError(f"Expected a JSON object, got {type(item).__name__}")
+    label = str(item.get("classification", "")).strip().strip('*').strip().lower()
+    classification = next((c for c in CLASSIFICATIONS if c.lower() == label), None)
+    if classification is None:
+        raise ResponseParseError(f"Unknown classification: {item.get('classification')!r}")
+
+    explanation = item.get("explanation")
+    if explanation is None or not str(explanation).strip():
+        raise ResponseParseError("Analysis has no explanation")
+    try:
+        score = max(0, min(100, int(round(float(item["score"])))))
+    except (KeyError, TypeError, ValueError, OverflowError):
+        raise ResponseParseError(f"Analysis has no usable score: {item.get('score')!r}")
+
+    analysis = dict(item)
+    analysis["classification"] = classification
+    analysis["explanation"] = str(explanation)
+    analysis["score"] = score
+    tips = item.get("tips", [])
+    if isinstance(tips, str):
+        tips = [tips]
+    analysis["tips"] = [str(tip) for tip in tips if tip] if isinstance(tips, list) else []
+    return analysis
+
+
+def is_analysis(value) -> bool:
+    """Whether a parsed JSON value is a usable analysis"""
+    try:
+        normalize_analysis(value)
+        return True
+    except ResponseParseError:
+        return False
+
+
+def _is_batch(value) -> bool:
+    if isinstance(value, dict):
+        value = value.get("results", [value])
+    return isinstance(value, list) and any(isinstance(item, dict) and "id" in item for item in value)
+
+
+def parse_analysis(text: str) -> Tuple[Dict, str]:
+    """
+    One analysis from a single-claim response, and how it was extracted.
+    Only objects are considered (so "[1]" in prose is never taken for the
+    answer), and objects that are not analyses are skipped. A repaired
+    analysis may have been cut short, so it is marked "repaired" and not
+    stored or cached.
+    """
+    value, how = extract_json(text, "{", accept=is_analysis)
+    analysis = normalize_analysis(value)
+    if how == "repaired":
+        analysis["repaired"] = True
+    return analysis, how
+
+
+def parse_batch(text: str, count: int) -> Tuple[List[Optional[Dict]], str]:
+    """
+    Analyses for a batch response of `count` claims, in claim order (the
+    model numbers them from 1 in "id"); None where an answer is missing or
+    invalid.
+    """
+    value, how = extract_json(text, "[{", accept=_is_batch)
+    if isinstance(value, dict):
+        value = value.get("results", [value])
+    if not isinstance(value, list):
+        raise ResponseParseError(f"Expected a JSON array, got {type(value).__name__}")
+
+    analyses: List[Optional[Dict]] = [None] * count
+    for item in value:
+        try:
+            position = int(item.pop("id")) - 1
+            analysis = normalize_analysis(item)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            continue
+        if how == "repaired":
+            analysis["repaired"] = True
+        if 0 <= position < count:
+            analyses[position] = analysis
+    return analyses, how
+
+
+class JsonFieldStream:
+    """
+    Incrementally decodes one string field (e.g. "explanation") out of JSON
+    text that arrives in chunks. feed() returns the newly decoded characters.
+    """
+    _ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+    _VALUE_START = re.compile(r'\s*:\s*"')
+
+    def __init__(self, field):
+        self.key = f'"{field}"'
+        self.buffer = ""
+        self.position = None  # first undecoded character of the value
+        self.done = False
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        if self.done:
+            return ""
+        if self.position is None:
+            key_at = self.buffer.find(self.key)
+            match = self._VALUE_START.match(self.buffer, key_at + len(self.key)) if key_at >= 0 else None
+            if match is None:
+                return ""
+            self.position = match.end()
+
+        buffer, i, decoded = self.buffer, self.position, []
+        while i < len(buffer):
+            ch = buffer[i]
+            if ch == '"':
+                self.done = True
+                break
+            if ch != '\\':
+                decoded.append(ch)
+                i += 1
+                continue
+            if i + 1 >= len(buffer):
+                break  # escape split across chunks
+            if buffer[i + 1] != 'u':
+                decoded.append(self._ESCAPES.get(buffer[i + 1], buffer[i + 1]))
+                i += 2
+                continue
+            if i + 6 > len(buffer):
+                break
+            try:
+                code = int(buffer[i + 2:i + 6], 16)
+            except ValueError:
+                code = 0xFFFD
+            if 0xD800 <= code <= 0xDBFF:
+                # Surrogate pair: wait for the low half so the character is emitted whole
+                if i + 12 > len(buffer):
+                    break
+                try:
+                    low = int(buffer[i + 8:i + 12], 16)
+                    code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                    i += 6
+                except ValueError:
+                    code = 0xFFFD
+            decoded.append(chr(code))
+            i += 6
+        self.position = i
+        return "".join(decoded)
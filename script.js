@@ -134,6 +134,60 @@ function initializeDemoFunctionality() {
         `;
     }
 
+    // Shown while the streamed analysis arrives; filled in by the stream event handlers
+    function displayStreamingResult() {
+        return `
+            <div class="demo-result" style="text-align: left;">
+                <h3>🟡 Analyzing...</h3>
+                <div id="streamPersonalization" style="margin: 1rem 0; padding: 1rem; background: #ebf4ff; border-radius: 8px; border-left: 4px solid #4299e1;"></div>
+                
+                <div style="margin: 1.5rem 0;">
+                    <h4 style="margin-bottom: 0.75rem; color: #2d3748;">📋 Detailed Analysis:</h4>
+                    <div id="streamExplanation" style="background: #ffffff; padding: 1rem; border-radius: 8px; border: 1px solid #e2e8f0; line-height: 1.6; white-space: pre-wrap;">Waiting for the AI model...</div>
+                </div>
+                
+                <div style="margin: 1.5rem 0;">
+                    <h4 style="margin-bottom: 0.75rem; color: #2d3748;">📌 Supporting Evidence:</h4>
+                    <div id="streamEvidence" style="background: #f7fafc; padding: 1rem; border-radius: 8px; border: 1px solid #e2e8f0;">Searching fact-check databases...</div>
+                </div>
+            </div>
+        `;
+    }
+
+    // Points and badges are stored per browser session on the server
+    function getSessionId() {
+        let sessionId = localStorage.getItem('echoMindSessionId');
+        if (!sessionId) {
+            sessionId = (crypto.randomUUID ? crypto.randomUUID() : `${Date.now()}-${Math.random().toString(36).slice(2)}`);
+            localStorage.setItem('echoMindSessionId', sessionId);
+        }
+        return sessionId;
+    }
+
+    // Reads a Server-Sent Events response body, calling onEvent(name, data) per message
+    async function readEventStream(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const message = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                let event = 'message';
+                let data = '';
+                message.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) event = line.slice(6).trim();
+                    else if (line.startsWith('data:')) data += line.slice(5).trim();
+                });
+                if (data) onEvent(event, JSON.parse(data));
+            }
+        }
+    }
+
     function displayError(errorMessage) {
         return `
             <div class="demo-result" style="border-left-color: #e53e3e;">
@@ -182,11 +236,12 @@ function initializeDemoFunctionality() {
         
         try {
             console.log('🚀 Starting API call with hardcoded key - no prompt should appear!');
-            const response = await fetch('https://echo-mind-191043917366.us-central1.run.app/analyze', {
+            const response = await fetch('https://echo-mind-191043917366.us-central1.run.app/analyze/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
-                    'X-API-Key': 'gdo4N6BnLrvu9MOaH25Ml5M8msPjVf9tsez24Dq8eRI'
+                    'X-API-Key': 'gdo4N6BnLrvu9MOaH25Ml5M8msPjVf9tsez24Dq8eRI',
+                    'X-Session-Id': getSessionId()
                 },
                 body: JSON.stringify({ claim: claim }),
             });
@@ -196,9 +251,38 @@ function initializeDemoFunctionality() {
                 throw new Error(`Server responded with status: ${response.status}. ${errorText}`);
             }
 
-            const data = await response.json();
-            console.log('Analysis result:', data); // For debugging
-            demoOutput.innerHTML = displayAnalysisResult(data);
+            // Render each part of the analysis as soon as the server sends it
+            demoOutput.innerHTML = displayStreamingResult();
+            let explanationStarted = false;
+            let finished = false;
+            await readEventStream(response, (event, data) => {
+                if (event === 'meta') {
+                    document.getElementById('streamPersonalization').innerHTML = `
+                        <strong>📊 Personalized Guidance:</strong><br>
+                        <span style="font-weight: bold;">Topic Category:</span> ${data.category}<br><br>
+                        <em>${data.tip}</em>
+                    `;
+                } else if (event === 'evidence') {
+                    document.getElementById('streamEvidence').textContent = data.evidence.length
+                        ? data.evidence.join('; ')
+                        : 'No matching fact-checks found in the database yet.';
+                } else if (event === 'explanation') {
+                    const explanation = document.getElementById('streamExplanation');
+                    if (!explanationStarted) {
+                        explanation.textContent = '';
+                        explanationStarted = true;
+                    }
+                    explanation.textContent += data.text;
+                } else if (event === 'result') {
+                    console.log('Analysis result:', data); // For debugging
+                    demoOutput.innerHTML = displayAnalysisResult(data);
+                    finished = true;
+                }
+            });
+
+            if (!finished) {
+                throw new Error('The connection closed before the analysis finished.');
+            }
 
         } catch (error) {
             console.error('Fetch Error:', error);
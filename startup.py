@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Startup timing for Echo Mind
+Records how long the lazily imported modules and startup steps take so
+slow cold starts can be traced to a specific SDK or step.
+
+Usage:
+  python startup.py   - Print an import-time breakdown of the app's heavy modules
+"""
+
+import importlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict
+
+PROCESS_STARTED = time.time()
+
+# Modules worth reporting, in the order the app would load them
+HEAVY_MODULES = [
+    'flask',
+    'app',
+    'analysis_engine',
+    'vertexai.generative_models',
+    'google.cloud.bigquery',
+    'feedparser',
+]
+
+_timings: Dict[str, float] = OrderedDict()
+_timings_lock = threading.Lock()
+
+
+def record(label: str, seconds: float):
+    with _timings_lock:
+        _timings[label] = round(seconds * 1000, 1)
+
+
+@contextmanager
+def timed(label: str):
+    """Time a startup step into the report"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(label, time.perf_counter() - started)
+
+
+def timed_import(module_name: str):
+    """Import a module, recording the time only when this call actually loaded it"""
+    if module_name in sys.modules:
+        # import_module waits if another thread is still initializing the module
+        return importlib.import_module(module_name)
+    with timed(f"import {module_name}"):
+        return importlib.import_module(module_name)
+
+
+def report() -> Dict:
+    """Milliseconds per recorded step, plus process uptime"""
+    with _timings_lock:
+        steps = dict(_timings)
+    return {
+        'uptime_seconds': round(time.time() - PROCESS_STARTED, 3),
+        'steps_ms': steps
+    }
+
+
+def main():
+    print("Import time (ms, incremental - shared dependencies count toward the first module that needs them):")
+    for module_name in HEAVY_MODULES:
+        label = f"import {module_name}"
+        try:
+            timed_import(module_name)
+        except Exception as e:
+            print(f"  {module_name:<30} unavailable ({e.__class__.__name__}: {e})")
+            continue
+        ms = report()['steps_ms'].get(label)
+        print(f"  {module_name:<30} {ms:>8.1f}" if ms is not None else f"  {module_name:<30} already loaded")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,17 @@
+"""
+Shared test setup: the repository root on sys.path, and a throwaway database,
+claim index and synchronous writes for every test session.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+_scratch = Path(tempfile.mkdtemp(prefix="echo-mind-tests-"))
+os.environ.setdefault('ECHO_MIND_DB_PATH', str(_scratch / "factchecks.db"))
+os.environ.setdefault('ECHO_MIND_CLAIM_INDEX', str(_scratch / "claim_index.json"))
+os.environ.setdefault('ECHO_MIND_WRITE_BEHIND', '0')
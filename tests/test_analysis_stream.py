@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+import analysis_engine
+from analysis_engine import MODEL_TIMEOUT_ANALYSIS, stream_misinformation_detector
+from benchmarks.fakes import FakeGenerativeModel, Latency
+from resilience import MODEL
+
+
+@pytest.fixture
+def model(monkeypatch):
+    def install(**kwargs):
+        fake = FakeGenerativeModel("fake", **kwargs)
+        monkeypatch.setattr(analysis_engine, 'get_analysis_model', lambda: fake)
+        return fake
+    yield install
+    MODEL.breaker.record_success()  # don't leak the timeout into other tests
+
+
+def test_stream_returns_the_parsed_analysis(model):
+    model(latency=Latency(base=0.05))
+    pieces = []
+    analysis = stream_misinformation_detector("The moon landing was staged", pieces.append,
+                                              deadline=time.monotonic() + 2)
+    assert analysis["classification"] != "Error"
+    assert "".join(pieces).startswith("```json")
+
+
+def test_stalled_stream_gives_up_at_the_deadline(model):
+    model(latency=Latency(base=5), first_chunk_fraction=1.0)  # nothing arrives for 5 s
+    pieces = []
+    started = time.monotonic()
+    analysis = stream_misinformation_detector("The moon landing was staged", pieces.append,
+                                              deadline=time.monotonic() + 0.2)
+    assert time.monotonic() - started < 1
+    assert analysis is MODEL_TIMEOUT_ANALYSIS
+    assert pieces == []
+
+
+def test_no_time_left_skips_the_call(model):
+    fake = model()
+    assert stream_misinformation_detector("claim", print, deadline=time.monotonic() - 1) is MODEL_TIMEOUT_ANALYSIS
+    assert fake.calls == 0
@@ -0,0 +1,78 @@
+import pytest
+
+import analysis_engine
+import claim_similarity
+from claim_similarity import ClaimIndex, build_index_from_database, find_similar_claim, get_claim_index
+from database_helper import close_database_connections, configure_database, save_analysis_to_database
+from evidence_store import EvidenceStore, get_evidence_store, set_evidence_store
+
+STORED = "5G towers spread covid"
+REWORDED = "Covid is spread by 5G towers"
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    configure_database(tmp_path / "factchecks.db")
+    monkeypatch.setattr(claim_similarity, 'INDEX_SNAPSHOT_PATH', tmp_path / "claim_index.json")
+    monkeypatch.setattr(claim_similarity, '_claim_index', None)
+    yield
+    close_database_connections()
+
+
+def save(claim, verdict="False", score=85):
+    assert save_analysis_to_database(claim, {"classification": verdict, "explanation": "Debunked.", "score": score})
+
+
+def test_index_updates_as_analyses_are_saved(database):
+    index = get_claim_index()
+    assert len(index) == 0
+    save(STORED)
+    assert len(index) == 1
+
+    match = find_similar_claim(REWORDED)
+    assert match["claim"] == STORED
+    assert match["verdict"] == "False"
+    assert match["similarity"] == 1.0
+
+
+def test_failed_analyses_are_not_indexed(database):
+    index = get_claim_index()
+    assert not save_analysis_to_database(STORED, {"classification": "Error", "explanation": "Timed out."})
+    assert len(index) == 0
+    assert find_similar_claim(REWORDED) is None
+
+
+def test_threshold(database):
+    save(STORED)
+    partial = "5G towers spread covid across europe"  # 4 of 6 tokens shared
+    assert find_similar_claim("Vaccines cause autism") is None
+    assert find_similar_claim(partial) is None
+    assert find_similar_claim(partial, threshold=0.6)["claim"] == STORED
+
+
+def test_analyze_claim_reuses_the_stored_verdict(database, monkeypatch):
+    save(STORED, score=85)
+
+    def no_model_call(*args, **kwargs):
+        raise AssertionError("near-duplicates must not call the model")
+
+    monkeypatch.setattr(analysis_engine, 'misinformation_detector_and_explainer', no_model_call)
+    previous_store = get_evidence_store()
+    set_evidence_store(EvidenceStore(mode='snapshot'))
+    try:
+        result = analysis_engine.analyze_claim(REWORDED, save_to_database=False, use_cache=False)
+    finally:
+        set_evidence_store(previous_store)
+
+    assert result["classification"] == "False"
+    assert result["score"] == 85  # the stored analysis' confidence, not the similarity
+    assert result["matched_claim"]["similarity"] == 1.0
+
+
+def test_offline_rebuild(database, tmp_path):
+    save(STORED)
+    save("Vaccines cause autism", verdict="Suspicious")
+    build_index_from_database(tmp_path / "rebuilt.json")
+    index = ClaimIndex.load(tmp_path / "rebuilt.json")
+    assert len(index) == 2
+    assert index.query(REWORDED)[1] == 1.0
@@ -0,0 +1,139 @@
+import threading
+
+import pytest
+
+from benchmarks.fakes import FakeBigQueryClient, FaultInjector, Latency, ServiceUnavailable
+from database_helper import close_database_connections, configure_database, database_connection
+from evidence_store import EvidenceStore, fcntl
+from resilience import BIGQUERY
+
+ROWS = [
+    {'claim': "5G towers spread COVID-19", 'verdict': "False", 'source': "Reuters", 'url': "https://example.org/5g"},
+    {'claim': "Vaccines cause autism", 'verdict': "False", 'source': "CDC", 'url': "https://example.org/vaccines"},
+    {'claim': "Drinking water keeps you hydrated", 'verdict': "True", 'source': "WHO", 'url': "https://example.org/water"},
+]
+
+
+@pytest.fixture
+def bigquery():
+    """Evidence searches build real query parameters, so they need google-cloud-bigquery"""
+    pytest.importorskip("google.cloud.bigquery")
+    yield
+    BIGQUERY.breaker.record_success()  # don't leak failures into other tests
+
+
+@pytest.fixture
+def database(tmp_path):
+    configure_database(tmp_path / "factchecks.db")
+    yield
+    close_database_connections()
+
+
+def stored_rows():
+    with database_connection() as conn:
+        return {(row['claim'], row['source']): dict(row) for row in conn.execute(
+            "SELECT claim, verdict, source, url, hit_count FROM fact_checks")}
+
+
+class CountingStore(EvidenceStore):
+    def __init__(self):
+        super().__init__(client=FakeBigQueryClient(), mode='snapshot')
+        self.syncs = 0
+        self.synced = threading.Event()
+
+    def sync_snapshot(self, timeout: float = 600):
+        self.syncs += 1
+        self.synced.set()
+        return {}
+
+
+@pytest.mark.skipif(fcntl is None, reason="file locks need fcntl")
+def test_only_one_store_holds_the_sync_lock(tmp_path):
+    lock = tmp_path / "snapshot.lock"
+    first, second = EvidenceStore(mode='snapshot'), EvidenceStore(mode='snapshot')
+    assert first.acquire_sync_lock(lock)
+    assert first.acquire_sync_lock(lock)  # re-entrant for the holder
+    assert not second.acquire_sync_lock(lock)
+    first.release_sync_lock()
+    assert second.acquire_sync_lock(lock)
+    second.release_sync_lock()
+
+
+@pytest.mark.skipif(fcntl is None, reason="file locks need fcntl")
+def test_follower_takes_over_when_leader_stops(tmp_path):
+    lock = tmp_path / "snapshot.lock"
+    leader, follower = CountingStore(), CountingStore()
+    leader.start_snapshot_sync(interval=60, leader_retry=0.05, lock_path=lock)
+    assert leader.synced.wait(2)
+    follower.start_snapshot_sync(interval=60, leader_retry=0.05, lock_path=lock)
+    assert not follower.synced.wait(0.3)
+
+    leader.stop_snapshot_sync()
+    assert follower.synced.wait(2)
+    follower.stop_snapshot_sync()
+    assert leader.syncs == 1 and follower.syncs == 1
+
+
+def test_search_runs_one_job_for_many_term_sets(bigquery):
+    client = FakeBigQueryClient(rows=ROWS)
+    store = EvidenceStore(client=client)
+    results = store.search([["5g", "covid-19"], ["vaccines", "autism"], [], ["unicorns"]])
+    assert client.jobs == 1
+    assert results[0] == ["5G towers spread COVID-19 — False (Reuters) https://example.org/5g"]
+    assert results[1][0].startswith("Vaccines cause autism")
+    assert results[2] == [] and results[3] == []
+
+
+def test_repeated_term_sets_are_cached(bigquery):
+    client = FakeBigQueryClient(rows=ROWS)
+    store = EvidenceStore(client=client)
+    first = store.search([["vaccines", "autism"]])
+    second = store.search([["autism", "vaccines"]])  # same set, other order
+    assert first == second
+    assert client.jobs == 1
+
+
+def test_slow_jobs_hit_the_deadline(bigquery):
+    store = EvidenceStore(client=FakeBigQueryClient(rows=ROWS, latency=Latency(base=2)))
+    with pytest.raises(TimeoutError):
+        store.search([["water"]], timeout=0.2)
+
+
+def test_failures_are_raised_after_retries(bigquery):
+    client = FakeBigQueryClient(rows=ROWS, faults=FaultInjector(error_rate=1.0, errors=(ServiceUnavailable,)))
+    store = EvidenceStore(client=client)
+    with pytest.raises(ServiceUnavailable):
+        store.search([["water"]])
+    assert client.jobs == 1 + BIGQUERY.retries
+
+
+def test_sync_updates_changed_rows_and_removes_deleted_ones(database):
+    stats = EvidenceStore(client=FakeBigQueryClient(rows=ROWS), mode='snapshot').sync_snapshot()
+    assert (stats['inserted'], stats['updated'], stats['deleted']) == (3, 0, 0)
+
+    changed = [dict(ROWS[0], verdict="Misleading", url="https://example.org/5g-update"), ROWS[1]]
+    stats = EvidenceStore(client=FakeBigQueryClient(rows=changed), mode='snapshot').sync_snapshot()
+    assert (stats['inserted'], stats['updated'], stats['deleted']) == (0, 2, 1)
+
+    rows = stored_rows()
+    assert set(rows) == {("5G towers spread COVID-19", "Reuters"), ("Vaccines cause autism", "CDC")}
+    updated = rows[("5G towers spread COVID-19", "Reuters")]
+    assert updated['verdict'] == "Misleading"
+    assert updated['url'] == "https://example.org/5g-update"
+    assert updated['hit_count'] == 1  # a sync is not a sighting
+
+
+def test_sync_leaves_rows_from_other_sources(database):
+    from database_helper import add_fact_check
+    assert add_fact_check("Drinking water keeps you hydrated", "True", "Echo Mind AI")
+    EvidenceStore(client=FakeBigQueryClient(rows=ROWS), mode='snapshot').sync_snapshot()
+    EvidenceStore(client=FakeBigQueryClient(rows=ROWS[:1]), mode='snapshot').sync_snapshot()
+    assert set(stored_rows()) == {
+        ("5G towers spread COVID-19", "Reuters"), ("Drinking water keeps you hydrated", "Echo Mind AI")}
+
+
+def test_empty_snapshot_keeps_the_stored_rows(database):
+    EvidenceStore(client=FakeBigQueryClient(rows=ROWS), mode='snapshot').sync_snapshot()
+    stats = EvidenceStore(client=FakeBigQueryClient(rows=[]), mode='snapshot').sync_snapshot()
+    assert stats['deleted'] == 0
+    assert len(stored_rows()) == 3
@@ -0,0 +1,139 @@
+import sqlite3
+
+import pytest
+
+from database_helper import (MIGRATIONS, ConnectionPool, add_fact_check_to_database, bulk_add_fact_checks,
+                             close_database_connections, configure_database, database_connection,
+                             save_analysis_to_database)
+
+BASELINE_SCHEMA = """
+    CREATE TABLE fact_checks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        claim TEXT NOT NULL,
+        verdict TEXT NOT NULL,
+        source TEXT NOT NULL,
+        url TEXT,
+        explanation TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    """A database as the app wrote it before migrations existed, with duplicate claims"""
+    path = tmp_path / "baseline.db"
+    conn = sqlite3.connect(path)
+    conn.execute(BASELINE_SCHEMA)
+    conn.executemany(
+        "INSERT INTO fact_checks (claim, verdict, source, explanation, created_at) VALUES (?, ?, ?, ?, ?)",
+        [
+            ("Vaccines cause autism", "Suspicious", "Echo Mind AI", "first", "2024-01-01 10:00:00"),
+            ("Vaccines cause autism!", "False", "Echo Mind AI", "latest good", "2024-01-02 10:00:00"),
+            ("vaccines  cause AUTISM", "Error", "Echo Mind AI", "failed", "2024-01-03 10:00:00"),
+            ("Vaccines cause autism", "False", "Snopes", "other source", "2024-01-01 12:00:00"),
+            ("The earth is round", "Trustworthy", "Echo Mind AI", "single", "2024-01-04 10:00:00"),
+        ]
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_migrations_reach_latest_version(baseline_db):
+    pool = ConnectionPool(baseline_db, max_size=1)
+    try:
+        with sqlite3.connect(baseline_db) as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == MIGRATIONS[-1][0]
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(fact_checks)")}
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    finally:
+        pool.close()
+    assert {'claim_hash', 'hit_count', 'last_seen'} <= columns
+    assert {'claim_cache', 'user_state'} <= tables
+
+
+def test_duplicates_fold_into_latest_successful_row(baseline_db):
+    pool = ConnectionPool(baseline_db, max_size=1)
+    pool.close()
+    with sqlite3.connect(baseline_db) as conn:
+        conn.row_factory = sqlite3.Row
+        rows = {(row['source'], row['explanation']): dict(row) for row in conn.execute(
+            "SELECT verdict, source, explanation, hit_count, last_seen FROM fact_checks")}
+
+    assert set(rows) == {("Echo Mind AI", "latest good"), ("Snopes", "other source"), ("Echo Mind AI", "single")}
+    kept = rows[("Echo Mind AI", "latest good")]
+    assert kept['verdict'] == "False"
+    assert kept['hit_count'] == 3
+    assert kept['last_seen'] == "2024-01-03 10:00:00"
+    assert rows[("Snopes", "other source")]['hit_count'] == 1
+    assert rows[("Echo Mind AI", "single")]['last_seen'] == "2024-01-04 10:00:00"
+
+
+def test_unique_index_merges_later_writes(baseline_db):
+    pool = ConnectionPool(baseline_db, max_size=1)
+    pool.close()
+    with sqlite3.connect(baseline_db) as conn:
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute(
+                "INSERT INTO fact_checks (claim, claim_hash, verdict, source) "
+                "SELECT claim, claim_hash, verdict, source FROM fact_checks WHERE source = 'Snopes'"
+            )
+
+
+def test_migrations_are_idempotent(baseline_db):
+    ConnectionPool(baseline_db, max_size=1).close()
+    ConnectionPool(baseline_db, max_size=1).close()
+    with sqlite3.connect(baseline_db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM fact_checks").fetchone()[0] == 3
+
+
+@pytest.fixture
+def database(tmp_path):
+    configure_database(tmp_path / "factchecks.db")
+    yield
+    close_database_connections()
+
+
+def stored(claim_like):
+    with database_connection() as conn:
+        return [dict(row) for row in conn.execute(
+            "SELECT claim, verdict, source, explanation, hit_count, last_seen FROM fact_checks "
+            "WHERE claim LIKE ? ORDER BY id", (claim_like,))]
+
+
+def test_bulk_add_counts_repeats_on_the_stored_row(database):
+    news = {'claim': "Floods close schools in Assam", 'verdict': "Trustworthy", 'source': "PTI",
+            'url': "https://example.org/floods", 'explanation': "first report"}
+    assert bulk_add_fact_checks([news]) == {'inserted': 1, 'updated': 0, 'skipped': 0}
+    with database_connection() as conn:
+        conn.execute("UPDATE fact_checks SET last_seen = '2024-01-01 00:00:00'")
+        conn.commit()
+
+    repeat = dict(news, claim="Floods close schools in ASSAM!", explanation="second report")
+    other = dict(news, claim="Heatwave warning for Delhi")
+    incomplete = {'claim': "No verdict", 'source': "PTI"}
+    assert bulk_add_fact_checks([repeat, repeat, other, incomplete]) == {'inserted': 1, 'updated': 1, 'skipped': 2}
+
+    [row] = stored("Floods%")
+    assert row['hit_count'] == 2
+    assert row['explanation'] == "first report"  # stored data is kept
+    assert row['last_seen'] > "2024-01-01 00:00:00"
+
+
+def test_single_and_bulk_adds_share_one_row(database):
+    item = {'claim': "Dam breach rumour is false", 'verdict': "False", 'source': "AFP", 'url': ""}
+    assert add_fact_check_to_database(item)
+    bulk_add_fact_checks([item])
+    assert add_fact_check_to_database(dict(item, claim="dam breach rumour is FALSE"))
+    [row] = stored("Dam breach%")
+    assert row['hit_count'] == 3
+
+
+def test_analyses_update_their_row_but_failures_never_overwrite(database):
+    claim = "Drinking bleach cures covid"
+    assert save_analysis_to_database(claim, {"classification": "Suspicious", "explanation": "first"})
+    assert save_analysis_to_database(claim + "!", {"classification": "False", "explanation": "second"})
+    assert not save_analysis_to_database(claim, {"classification": "Error", "explanation": "timed out"})
+    [row] = stored("Drinking bleach%")
+    assert (row['verdict'], row['explanation'], row['hit_count']) == ("False", "second", 2)
@@ -0,0 +1,101 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from feed_fetcher import FeedFetcher, FeedStateStore, conditional_headers
+
+FEED = b"<rss><channel><item><title>Fact check</title></item></channel></rss>"
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    hits = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        count = self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        if self.path == "/feed":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self._send(304)
+            else:
+                self._send(200, FEED, {"ETag": '"v1"'})
+        elif self.path == "/flaky":
+            if count == 1:
+                self._send(503, headers={"Retry-After": "0"})
+            else:
+                self._send(200, FEED)
+        elif self.path == "/slow":
+            time.sleep(1)
+            self._send(200, FEED)
+        else:
+            self._send(404)
+
+
+@pytest.fixture
+def server():
+    FeedHandler.hits = {}
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def fetcher():
+    fetcher = FeedFetcher(workers=2, timeout=0.3, retries=1, backoff=0.01, host_interval=0)
+    yield fetcher
+    fetcher.shutdown()
+
+
+def test_etag_turns_repeat_fetches_into_304(server, fetcher, tmp_path):
+    state = FeedStateStore(str(tmp_path / "feed_state.json"))
+    url = f"{server}/feed"
+
+    first = fetcher.fetch("feed", url, conditional_headers(state.get("feed", url)))
+    assert first.ok and first.status_code == 200 and first.content == FEED
+    state.update("feed", url, etag=first.headers["ETag"], content_hash=first.content_hash)
+    state.save()
+
+    reloaded = FeedStateStore(str(tmp_path / "feed_state.json"))
+    second = fetcher.fetch("feed", url, conditional_headers(reloaded.get("feed", url)))
+    assert second.ok and second.not_modified
+    assert reloaded.get("feed", f"{server}/moved") == {}
+
+
+def test_transient_status_is_retried(server, fetcher):
+    result = fetcher.fetch("flaky", f"{server}/flaky")
+    assert result.ok and result.status_code == 200
+    assert result.attempts == 2
+
+
+def test_client_errors_are_not_retried(server, fetcher):
+    result = fetcher.fetch("missing", f"{server}/missing")
+    assert not result.ok and result.error == "HTTP 404"
+    assert result.attempts == 1
+
+
+def test_slow_feed_times_out(server, fetcher):
+    started = time.monotonic()
+    result = fetcher.fetch("slow", f"{server}/slow")
+    assert not result.ok
+    assert result.attempts == 2
+    assert time.monotonic() - started < 1.5
+
+
+def test_feeds_are_fetched_concurrently(server, fetcher):
+    futures = [fetcher.submit(fetcher.fetch, f"feed{i}", f"{server}/feed") for i in range(4)]
+    assert all(future.result(timeout=5).ok for future in futures)
@@ -0,0 +1,61 @@
+import keyword_matcher
+from keyword_matcher import KeywordMatcher, first_match, get_keyword_matcher
+
+
+def matcher(*keywords, prefix=False):
+    m = KeywordMatcher()
+    for keyword in keywords:
+        m.add(keyword, keyword, prefix)
+    return m
+
+
+def matches(m, text):
+    return [(keyword, text[start:end]) for _, keyword, start, end in m.finditer(text)]
+
+
+def test_matches_respect_word_boundaries():
+    m = matcher("ai", "pm", "app")
+    assert matches(m, "The minister said the AI plan starts at 5pm") == [("ai", "AI")]
+    assert matches(m, "pm: the new app, apps and happy apples") == [("pm", "pm"), ("app", "app"), ("app", "app")]
+    assert matches(m, "Ai_assistant") == []
+
+
+def test_plural_suffixes():
+    m = matcher("vaccine", "match")
+    assert [k for k, _ in matches(m, "Vaccines, matches and vaccinated")] == ["vaccine", "match"]
+
+
+def test_overlapping_keywords_all_match():
+    m = matcher("minister", "prime minister", "chief minister", "he")
+    found = [(keyword, start) for _, keyword, start, _ in m.finditer("The prime minister met the chief minister")]
+    assert found == [("prime minister", 4), ("minister", 10), ("chief minister", 27), ("minister", 33)]
+
+
+def test_failure_links_recover_a_shorter_match():
+    m = matcher("abcd", "bc")
+    assert matches(m, "abc bc") == [("bc", "bc")]
+    assert matches(m, "xabcd abcd") == [("abcd", "abcd")]
+
+
+def test_prefix_keywords_match_longer_words():
+    m = matcher("break", prefix=True)
+    assert matches(m, "Breaking: outbreak") == [("break", "Break")]
+
+
+def test_scan_counts_distinct_keywords_per_label():
+    m = KeywordMatcher()
+    m.add_group({'health': ["covid", "vaccine"], 'politics': ["election"]}, "topic")
+    m.add("covid", "other")
+    text = "Covid vaccine claims: covid again, no election talk"
+    assert m.scan(text, namespace="topic") == {'health': 2, 'politics': 1}
+    assert m.scan(text) == {'topic:health': 2, 'topic:politics': 1, 'other': 1}
+
+
+def test_shared_matcher_no_longer_matches_inside_words():
+    shared = get_keyword_matcher()
+    assert shared.scan("She said it would rain", namespace=keyword_matcher.SEARCH_TOPIC) == {}
+    assert not shared.scan("Meet me at 5pm").get(keyword_matcher.POLITICS)
+    assert shared.scan("The PM called an election").get(keyword_matcher.POLITICS) == 2
+    hits = shared.scan("New AI rules for smartphones", namespace=keyword_matcher.SEARCH_TOPIC)
+    assert first_match(hits, ['politics', 'technology']) == 'technology'
+    assert first_match({}, ['politics']) == 'general'
@@ -0,0 +1,123 @@
+import pytest
+
+import rate_limiter
+from benchmarks.fakes import FakeRedis
+from rate_limiter import MemoryBackend, RateLimiter, RedisBackend, SQLiteBackend
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path, clock):
+    if request.param == "memory":
+        yield MemoryBackend()
+    elif request.param == "redis":
+        yield RedisBackend(FakeRedis(clock))
+    else:
+        backend = SQLiteBackend(tmp_path / "rate_limits.db")
+        yield backend
+        backend.close()
+
+
+def test_limit_within_a_window(backend, clock):
+    clock.now = 10
+    limiter = RateLimiter(backend, limit=3, window=60, clock=clock)
+    decisions = [limiter.hit("1.2.3.4") for _ in range(3)]
+    assert all(d.allowed for d in decisions)
+    assert [d.remaining for d in decisions] == [2, 1, 0]
+
+    rejected = limiter.hit("1.2.3.4")
+    assert not rejected.allowed
+    assert rejected.retry_after == 50  # until the window ends
+    assert limiter.hit("5.6.7.8").allowed  # other keys are counted separately
+
+
+def test_rejected_requests_are_not_counted(backend, clock):
+    limiter = RateLimiter(backend, limit=2, window=60, clock=clock)
+    for _ in range(2):
+        limiter.hit("key")
+    for _ in range(5):
+        assert not limiter.hit("key").allowed
+    clock.now = 120  # two windows later nothing is left
+    assert limiter.hit("key").allowed
+    assert limiter.hit("key").allowed
+
+
+def test_previous_window_slides_out(backend, clock):
+    limiter = RateLimiter(backend, limit=3, window=60, clock=clock)
+    for _ in range(3):
+        assert limiter.hit("key").allowed
+
+    clock.now = 60.5  # the previous window still weighs ~3
+    rejected = limiter.hit("key")
+    assert not rejected.allowed
+    assert rejected.retry_after == 20  # 3 * (1 - 20/60) + 1 <= 3
+
+    clock.now = 80.5
+    assert limiter.hit("key").allowed
+    assert not limiter.hit("key").allowed
+
+
+def test_memory_backend_is_bounded():
+    backend = MemoryBackend(max_keys=2)
+    limiter = RateLimiter(backend, limit=5, window=60, clock=FakeClock(0))
+    for key in ("a", "b", "c", "d"):
+        limiter.hit(key)
+    assert len(backend) == 2
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = tmp_path / "rate_limits.db"
+    first, second = SQLiteBackend(path), SQLiteBackend(path)
+    try:
+        clock = FakeClock(0)
+        assert RateLimiter(first, limit=1, window=60, clock=clock).hit("key").allowed
+        assert not RateLimiter(second, limit=1, window=60, clock=clock).hit("key").allowed
+    finally:
+        first.close()
+        second.close()
+
+
+def test_redis_counters_expire(clock):
+    client = FakeRedis(clock)
+    limiter = RateLimiter(RedisBackend(client), limit=1, window=60, clock=clock)
+    assert limiter.hit("key").allowed
+    assert not limiter.hit("key").allowed
+    assert client.get("echo-mind:rate:key:0") == b"1"  # the rejected request was released
+    assert client.ttl("echo-mind:rate:key:0") == 120
+    clock.now = 120
+    assert client.get("echo-mind:rate:key:0") is None
+
+
+def test_redis_decrement_of_an_expired_key_expires_too(clock):
+    client = FakeRedis(clock)
+    RedisBackend(client).decrement("key", 0, 120)
+    assert client.ttl("echo-mind:rate:key:0") == 120
+
+
+def test_unavailable_backend_fails_loudly(monkeypatch):
+    monkeypatch.setattr(rate_limiter, 'REDIS_URL', 'redis://127.0.0.1:1/0')
+    with pytest.raises(Exception):
+        rate_limiter.build_backend('redis')
+
+    def broken_backend():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(rate_limiter, 'build_backend', broken_backend)
+    rate_limiter.set_rate_limiter(None)
+    try:
+        with pytest.raises(ConnectionError):
+            rate_limiter.get_rate_limiter()
+    finally:
+        rate_limiter.set_rate_limiter(None)
@@ -0,0 +1,203 @@
+import random
+import threading
+import time
+
+import pytest
+
+from benchmarks.fakes import ResourceExhausted, ServiceUnavailable
+from resilience import (CallTimeoutError, CircuitBreaker, CircuitOpenError, Dependency, is_transient,
+                        stream_with_deadline)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Flaky:
+    """Raises the given errors in turn, then returns 'ok'"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def dependency(**kwargs):
+    options = dict(timeout=2, base_delay=0.001, max_delay=0.001, rng=random.Random(0))
+    options.update(kwargs)
+    return Dependency("test", **options)
+
+
+def test_transient_errors():
+    assert is_transient(ServiceUnavailable("down"))
+    assert is_transient(ResourceExhausted("quota"))
+    assert is_transient(TimeoutError())
+    assert not is_transient(ValueError("bad request"))
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=10, clock=FakeClock())
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    breaker.record_success()  # a success resets the count
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_half_open_allows_a_single_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.allow()
+    breaker.record_failure()
+    clock.now = 9.9
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # the probe is still running
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_released_probe_lets_the_next_call_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=1, clock=clock)
+    breaker.allow()
+    breaker.record_failure()
+    clock.now = 1
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_transient_errors_are_retried():
+    fn = Flaky(ServiceUnavailable("down"), ResourceExhausted("quota"))
+    assert dependency(retries=2).call(fn) == "ok"
+    assert fn.calls == 3
+
+
+def test_retry_budget_is_limited():
+    fn = Flaky(*[ServiceUnavailable("down")] * 5)
+    dep = dependency(retries=2)
+    with pytest.raises(ServiceUnavailable):
+        dep.call(fn)
+    assert fn.calls == 3
+    assert dep.breaker.failures == 1
+
+
+def test_other_errors_are_not_retried_or_counted():
+    fn = Flaky(ValueError("bad request"))
+    dep = dependency(retries=2)
+    with pytest.raises(ValueError):
+        dep.call(fn)
+    assert fn.calls == 1
+    assert dep.breaker.failures == 0
+
+
+def test_open_breaker_fails_fast():
+    dep = dependency(breaker=CircuitBreaker("test", failure_threshold=2, reset_timeout=60))
+    for _ in range(2):
+        with pytest.raises(ServiceUnavailable):
+            dep.call(Flaky(ServiceUnavailable("down")))
+    fn = Flaky()
+    with pytest.raises(CircuitOpenError):
+        dep.call(fn)
+    assert fn.calls == 0
+
+
+def test_deadline_abandons_a_stalled_call():
+    release = threading.Event()
+    dep = dependency(timeout=0.2)
+    started = time.monotonic()
+    try:
+        with pytest.raises(CallTimeoutError):
+            dep.call(release.wait, 5)
+    finally:
+        release.set()
+    assert time.monotonic() - started < 1
+
+
+def test_hedge_races_a_slow_attempt():
+    dep = dependency(hedge=True, timeout=5)
+    for _ in range(20):
+        dep.latencies.add(0.01)
+    calls = []
+    lock = threading.Lock()
+
+    def slow_then_fast():
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        if first:
+            time.sleep(2)
+            return "slow"
+        return "fast"
+
+    started = time.monotonic()
+    assert dep.call(slow_then_fast) == "fast"
+    assert time.monotonic() - started < 1
+    assert len(calls) == 2
+
+
+def test_guard_records_the_outcome():
+    dep = dependency(breaker=CircuitBreaker("test", failure_threshold=1, reset_timeout=60))
+    with dep.guard():
+        pass
+    with pytest.raises(ServiceUnavailable):
+        with dep.guard():
+            raise ServiceUnavailable("stream broke")
+    with pytest.raises(CircuitOpenError):
+        with dep.guard():
+            pass
+
+
+def test_stream_yields_every_item():
+    assert list(stream_with_deadline(iter, [1, 2, 3], deadline=time.monotonic() + 1)) == [1, 2, 3]
+
+
+def test_stream_raises_its_errors():
+    def broken():
+        yield 1
+        raise ServiceUnavailable("stream broke")
+
+    stream = stream_with_deadline(broken, deadline=time.monotonic() + 1)
+    assert next(stream) == 1
+    with pytest.raises(ServiceUnavailable):
+        next(stream)
+
+
+def test_stream_deadline_applies_before_the_first_item():
+    release = threading.Event()
+
+    def stalled():
+        release.wait(5)
+        yield "late"
+
+    started = time.monotonic()
+    try:
+        with pytest.raises(CallTimeoutError):
+            list(stream_with_deadline(stalled, deadline=time.monotonic() + 0.2))
+    finally:
+        release.set()
+    assert time.monotonic() - started < 1
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from response_parser import (
+    JsonValueScanner, ResponseParseError, is_analysis, parse_analysis, parse_batch, repair_json
+)
+
+ANALYSIS = '{"classification": "False", "explanation": "Debunked.", "score": 12, "tips": ["Check sources"]}'
+
+
+def test_clean_response():
+    analysis, how = parse_analysis(ANALYSIS)
+    assert how == "clean"
+    assert analysis["classification"] == "False"
+    assert "repaired" not in analysis
+
+
+@pytest.mark.parametrize("text", [
+    f"Note [1]: {ANALYSIS}",
+    f'{{"note": "preamble"}} {ANALYSIS}',
+    f'{{"result": {ANALYSIS}}}',
+    f"```json\n[{ANALYSIS}]\n```",
+])
+def test_analysis_found_past_other_json(text):
+    analysis, how = parse_analysis(text)
+    assert how == "extracted"
+    assert analysis["explanation"] == "Debunked."
+
+
+def test_single_quoted_escapes_are_repaired():
+    analysis, how = parse_analysis("{'classification': 'False', 'explanation': 'it\\'s c:\\\\tmp', 'score': 3}")
+    assert how == "repaired"
+    assert analysis["explanation"] == "it's c:\\tmp"
+    assert analysis["repaired"] is True
+
+
+def test_invalid_escape_keeps_backslash():
+    assert json.loads(repair_json(r"{'path': 'c:\data'}")) == {"path": r"c:\data"}
+
+
+@pytest.mark.parametrize("text", [
+    '{"classification": "False", "score": 3}',
+    '{"classification": "False", "explanation": "No score."}',
+    '{"classification": "False", "explanation": "  ", "score": 3}',
+    '{"classification": "Maybe", "explanation": "x", "score": 3}',
+    '{"classification": "False", "explanation": "cut sho',
+])
+def test_incomplete_analyses_are_rejected(text):
+    with pytest.raises(ResponseParseError):
+        parse_analysis(text)
+
+
+def test_truncated_analysis_is_marked_repaired():
+    analysis, how = parse_analysis('{"classification": "False", "score": 40, "explanation": "cut sho')
+    assert how == "repaired"
+    assert analysis["repaired"] is True
+
+
+def test_batch_skips_bracketed_prose():
+    text = 'Answers [1]: [{"id": 1, "classification": "Trustworthy", "explanation": "Ok.", "score": 90}]'
+    analyses, _ = parse_batch(text, 2)
+    assert analyses[0]["classification"] == "Trustworthy"
+    assert analyses[1] is None
+
+
+def test_scanner_skips_values_that_are_not_analyses():
+    scanner = JsonValueScanner("{", accept=is_analysis)
+    stream = f'Note [1]: {{"draft": true}} {ANALYSIS} and some trailing text'
+    complete = False
+    for i in range(0, len(stream), 5):
+        complete = scanner.feed(stream[i:i + 5])
+        if complete:
+            break
+    assert complete
+    assert json.loads(scanner.text)["explanation"] == "Debunked."
@@ -0,0 +1,135 @@
+import threading
+import time
+
+import pytest
+
+import write_behind
+from database_helper import (close_database_connections, configure_database, database_connection,
+                             save_analyses_to_database)
+from write_behind import WriteBehindQueue, set_write_behind, shutdown_write_behind
+
+
+@pytest.fixture
+def database(tmp_path):
+    configure_database(tmp_path / "factchecks.db")
+    yield
+    close_database_connections()
+
+
+class RecordingHandler:
+    """save_analyses_to_database that records each batch; writer-thread writes wait for `gate`"""
+
+    def __init__(self):
+        self.batches = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, analyses):
+        if threading.current_thread().name == "echo-mind-writer":
+            self.gate.wait(5)
+        self.batches.append(len(analyses))
+        return save_analyses_to_database(analyses)
+
+
+def analysis(n):
+    return f"Claim number {n} about the dam", {"classification": "False", "explanation": f"analysis {n}", "score": 80}
+
+
+def stored_claims():
+    with database_connection() as conn:
+        return {row[0] for row in conn.execute("SELECT claim FROM fact_checks")}
+
+
+def writer(handler, **kwargs):
+    options = dict(max_size=100, batch_size=100, flush_interval=0.05, block_timeout=0.05, enabled=True)
+    options.update(kwargs)
+    return WriteBehindQueue({'analysis': handler}, **options)
+
+
+def test_queued_writes_are_committed_in_one_batch(database):
+    handler = RecordingHandler()
+    queue = writer(handler, flush_interval=0.2)
+    try:
+        for n in range(5):
+            queue.submit('analysis', analysis(n))
+        assert stored_claims() == set()  # nothing written inside the request
+        assert queue.flush(timeout=2)
+        assert stored_claims() == {analysis(n)[0] for n in range(5)}
+        assert handler.batches == [5]
+    finally:
+        queue.close()
+
+
+def test_batches_are_cut_at_batch_size(database):
+    handler = RecordingHandler()
+    queue = writer(handler, batch_size=2, flush_interval=0.5)
+    try:
+        handler.gate.clear()
+        for n in range(5):
+            queue.submit('analysis', analysis(n))
+        handler.gate.set()
+        assert queue.flush(timeout=3)
+        assert sum(handler.batches) == 5 and max(handler.batches) <= 2
+        assert len(stored_claims()) == 5
+    finally:
+        queue.close()
+
+
+def test_full_queue_writes_in_the_request_instead_of_dropping(database):
+    handler = RecordingHandler()
+    handler.gate.clear()  # the writer is stuck on its first batch
+    queue = writer(handler, max_size=1, batch_size=1)
+    try:
+        queue.submit('analysis', analysis(0))  # taken by the writer
+        deadline = time.monotonic() + 2
+        while queue.pending() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        queue.submit('analysis', analysis(1))  # fills the queue
+        started = time.monotonic()
+        queue.submit('analysis', analysis(2))  # no room: written synchronously
+        assert time.monotonic() - started < 1
+        assert stored_claims() == {analysis(2)[0]}
+
+        handler.gate.set()
+        assert queue.flush(timeout=2)
+        assert stored_claims() == {analysis(n)[0] for n in range(3)}
+    finally:
+        handler.gate.set()
+        queue.close()
+
+
+def test_close_drains_pending_writes(database):
+    handler = RecordingHandler()
+    queue = writer(handler, flush_interval=30)  # would otherwise wait 30 s to flush
+    for n in range(3):
+        queue.submit('analysis', analysis(n))
+    started = time.monotonic()
+    assert queue.close(timeout=5)
+    assert time.monotonic() - started < 2
+    assert stored_claims() == {analysis(n)[0] for n in range(3)}
+
+    queue.submit('analysis', analysis(3))  # after shutdown writes go straight to the database
+    assert analysis(3)[0] in stored_claims()
+
+
+def test_shutdown_drains_the_process_queue(database, monkeypatch):
+    monkeypatch.setattr(write_behind, '_write_behind', None)
+    queue = writer(RecordingHandler(), flush_interval=30)
+    set_write_behind(queue)
+    queue.submit('analysis', analysis(0))
+    assert shutdown_write_behind(timeout=5)
+    assert stored_claims() == {analysis(0)[0]}
+
+
+def test_failed_batches_are_not_retried_forever(database):
+    calls = []
+
+    def broken(payloads):
+        calls.append(len(payloads))
+        raise RuntimeError("disk full")
+
+    queue = writer(broken)
+    queue.submit('analysis', analysis(0))
+    assert queue.flush(timeout=2)
+    assert queue.close()
+    assert calls == [1]
@@ -0,0 +1,28 @@
+"""
+Shared text normalization helpers for Echo Mind
+Used wherever two spellings of the same claim must compare equal
+"""
+
+import hashlib
+import re
+import unicodedata
+
+_NON_WORD = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def normalize_claim(text: str) -> str:
+    """
+    Canonical form of a claim: unicode-normalized, lower-cased, punctuation
+    removed and whitespace collapsed.
+    "5G towers  spread COVID!!" -> "5g towers spread covid"
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _NON_WORD.sub(" ", text).replace("_", " ")
+    return " ".join(text.split())
+
+
+def claim_hash(text: str) -> str:
+    """Stable hex digest of the normalized claim"""
+    return hashlib.sha256(normalize_claim(text).encode("utf-8")).hexdigest()
@@ -0,0 +1,91 @@
+"""
+Keyword lists used for topic detection across Echo Mind
+All of them are compiled into the shared matcher in keyword_matcher.py
+"""
+
+# Topic detection for current-information search (analysis_engine.search_current_info)
+SEARCH_TOPIC_KEYWORDS = {
+    'politics': ['cm', 'chief minister', 'prime minister', 'president', 'election', 'government', 'minister', 'parliament', 'assembly'],
+    'health': ['covid', 'vaccine', 'health', 'medical', 'disease', 'treatment', 'hospital', 'doctor', 'medicine', 'healthcare'],
+    'science': ['research', 'study', 'scientist', 'discovery', 'experiment', 'technology', 'innovation', 'space', 'climate change'],
+    'technology': ['tech', 'software', 'app', 'internet', 'cyber', 'data', 'ai', 'artificial intelligence', 'smartphone', 'computer'],
+    'business': ['stock', 'market', 'economy', 'finance', 'investment', 'banking', 'company', 'startup', 'industry'],
+    'sports': ['cricket', 'football', 'hockey', 'tennis', 'olympics', 'ipl', 'fifa', 'world cup', 'player', 'match'],
+    'entertainment': ['movie', 'film', 'bollywood', 'actor', 'actress', 'music', 'netflix', 'celebrity', 'award'],
+    'education': ['school', 'college', 'university', 'student', 'exam', 'jee', 'neet', 'upsc', 'degree']
+}
+
+# Claim categories for personalized tips (analysis_engine.categorize_text)
+CATEGORIES = {
+    "health": ["covid", "vaccine", "cure", "disease", "doctor", "medical", "hospital", "medicine", "healthcare", "treatment"],
+    "politics": ["election", "government", "minister", "policy", "parliament", "assembly", "president", "chief minister"],
+    "science": ["research", "study", "scientist", "discovery", "experiment", "climate change", "global warming", "space", "technology"],
+    "technology": ["tech", "software", "app", "internet", "cyber", "ai", "artificial intelligence", "smartphone", "computer", "data"],
+    "business": ["stock", "market", "crypto", "investment", "economy", "finance", "banking", "company", "startup", "industry"],
+    "sports": ["cricket", "football", "hockey", "tennis", "olympics", "ipl", "fifa", "world cup", "player", "match", "tournament"],
+    "entertainment": ["movie", "film", "bollywood", "actor", "actress", "music", "netflix", "celebrity", "award", "cinema"],
+    "education": ["school", "college", "university", "student", "exam", "jee", "neet", "upsc", "degree", "admission"],
+    "social": ["social media", "viral", "trending", "community", "society", "culture", "religion", "festival"]
+}
+
+# Political keywords to track (India-focused) - news with any of these is politics
+POLITICAL_KEYWORDS = [
+    'chief minister', 'cm', 'prime minister', 'pm', 'president',
+    'election', 'government', 'minister', 'parliament', 'assembly', 'lok sabha', 'rajya sabha',
+    'bjp', 'congress', 'aap', 'trs', 'brs', 'tdp', 'ysrcp', 'dmk', 'aiadmk', 'jdu', 'rjd',
+    # Major Indian States
+    'andhra pradesh', 'telangana', 'karnataka', 'tamil nadu', 'kerala', 'maharashtra',
+    'uttar pradesh', 'bihar', 'west bengal', 'gujarat', 'rajasthan', 'madhya pradesh',
+    'odisha', 'punjab', 'haryana', 'jharkhand', 'assam', 'himachal pradesh', 'uttarakhand',
+    'goa', 'manipur', 'meghalaya', 'nagaland', 'sikkim', 'tripura', 'arunachal pradesh', 'mizoram',
+    # Political Terms
+    'governor', 'cabinet', 'coalition', 'alliance', 'bjp', 'inc', 'modi', 'gandhi',
+    'delhi', 'mumbai', 'kolkata', 'chennai', 'hyderabad', 'bangalore', 'pune', 'ahmedabad'
+]
+
+# Comprehensive topic keywords for broad news coverage (auto_updater.categorize_news)
+NEWS_TOPIC_KEYWORDS = {
+    'health': [
+        'covid', 'vaccine', 'health', 'medical', 'disease', 'treatment', 'hospital', 'doctor',
+        'who', 'fda', 'clinical trial', 'research study', 'medicine', 'therapy', 'diagnosis',
+        'pandemic', 'epidemic', 'mental health', 'ayurveda', 'healthcare', 'pharmacy'
+    ],
+    'science': [
+        'research', 'study', 'scientist', 'discovery', 'experiment', 'technology', 'innovation',
+        'artificial intelligence', 'ai', 'machine learning', 'space', 'nasa', 'isro', 'satellite',
+        'climate change', 'global warming', 'environment', 'renewable energy', 'solar', 'electric'
+    ],
+    'technology': [
+        'tech', 'software', 'app', 'internet', 'cyber', 'data', 'privacy', 'security',
+        'smartphone', 'computer', 'laptop', 'gadget', 'startup', 'google', 'microsoft', 'apple',
+        'facebook', 'meta', 'twitter', 'social media', 'blockchain', 'cryptocurrency', 'bitcoin'
+    ],
+    'business': [
+        'stock', 'market', 'economy', 'finance', 'investment', 'banking', 'inflation', 'gdp',
+        'company', 'corporate', 'industry', 'manufacturing', 'trade', 'export', 'import',
+        'startup', 'funding', 'ipo', 'merger', 'acquisition', 'revenue', 'profit', 'loss'
+    ],
+    'sports': [
+        'cricket', 'football', 'hockey', 'tennis', 'badminton', 'kabaddi', 'olympics', 'asian games',
+        'ipl', 'fifa', 'world cup', 'player', 'team', 'match', 'tournament', 'championship',
+        'coach', 'athlete', 'medal', 'record', 'performance', 'injury', 'retirement'
+    ],
+    'entertainment': [
+        'movie', 'film', 'cinema', 'bollywood', 'hollywood', 'tollywood', 'actor', 'actress',
+        'director', 'music', 'song', 'album', 'concert', 'show', 'tv', 'series', 'web series',
+        'netflix', 'amazon prime', 'celebrity', 'award', 'oscar', 'filmfare', 'box office'
+    ],
+    'education': [
+        'school', 'college', 'university', 'student', 'teacher', 'professor', 'exam', 'result',
+        'admission', 'entrance', 'jee', 'neet', 'upsc', 'degree', 'course', 'syllabus',
+        'education policy', 'scholarship', 'research', 'phd', 'iit', 'iim', 'cbse', 'icse'
+    ],
+    'social': [
+        'social media', 'viral', 'trending', 'influencer', 'youtube', 'instagram', 'tiktok',
+        'community', 'society', 'culture', 'religion', 'festival', 'tradition', 'custom',
+        'discrimination', 'equality', 'justice', 'human rights', 'women empowerment'
+    ]
+}
+
+# High priority evidence terms (analysis_engine.extract_key_terms), matched as word prefixes
+PRIORITY_TERMS = ['covid', 'vaccine', 'virus', 'disease', 'cancer', 'treatment', 'cure', 'medicine', 'doctor', 'health', 'climate', 'global', 'warming', 'election', 'government', 'president', 'minister', 'policy', 'economy', 'market', 'stock', 'crypto', 'bitcoin']
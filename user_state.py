@@ -0,0 +1,127 @@
+"""
+Per-user gamification state for Echo Mind
+Points and badges live in the user_state table of the SQLite database,
+keyed by the caller's session id (or a hash of their API key), so every
+worker and restart sees the same score. Points are added and read back in a
+single UPSERT ... RETURNING statement, so concurrent requests from one user
+each get a distinct starting score without any locking in the app.
+"""
+
+import hashlib
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+
+# Session ids sent by the frontend (X-Session-Id); anything else is ignored
+_SESSION_ID = re.compile(r'^[A-Za-z0-9_-]{8,128}$')
+
+
+@dataclass
+class UserState:
+    user_key: str
+    points: int = 0
+    badges: List[str] = field(default_factory=list)
+    analyses: int = 0
+
+
+def make_user_key(api_key: Optional[str] = None, session_id: Optional[str] = None) -> str:
+    """Storage key for a caller: their session id if valid, else a hash of the API key"""
+    if session_id and _SESSION_ID.match(session_id):
+        return f"session:{session_id}"
+    if api_key:
+        return f"key:{hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]}"
+    return "anonymous"
+
+
+class UserStateStore:
+    """Atomic reads and updates of user_state rows through the shared connection pool"""
+
+    def get(self, user_key: str) -> UserState:
+        from database_helper import database_connection
+        try:
+            with database_connection() as conn:
+                row = conn.execute(
+                    "SELECT points, badges, analyses FROM user_state WHERE user_key = ?", (user_key,)
+                ).fetchone()
+        except Exception as e:
+            print(f"Warning: Could not load user state: {e}")
+            row = None
+        if row is None:
+            return UserState(user_key)
+        return UserState(user_key, row['points'], json.loads(row['badges']), row['analyses'])
+
+    def record_analyses(self, user_key: str, analyses: int, points: int) -> UserState:
+        """
+        Add `analyses` and `points` to the user's totals and return the state
+        from just before this update - the score the analyses start from.
+        """
+        from database_helper import database_connection
+        try:
+            with database_connection() as conn:
+                row = conn.execute('''
+                    INSERT INTO user_state (user_key, points, analyses) VALUES (?, ?, ?)
+                    ON CONFLICT(user_key) DO UPDATE SET
+                        points = points + excluded.points,
+                        analyses = analyses + excluded.analyses,
+                        updated_at = CURRENT_TIMESTAMP
+                    RETURNING points, badges, analyses
+                ''', (user_key, points, analyses)).fetchone()
+                conn.commit()
+        except Exception as e:
+            # Gamification is optional - analyse from a zero score rather than fail the request
+            print(f"Warning: Could not update user state: {e}")
+            return UserState(user_key)
+        return UserState(user_key, row['points'] - points, json.loads(row['badges']), row['analyses'] - analyses)
+
+    def add_badges(self, user_key: str, badges: Iterable[str], known: Iterable[str] = ()):
+        """Merge badges into the user's set (no write if they were all already `known`)"""
+        badges = list(dict.fromkeys(badges))
+        if not set(badges) - set(known):
+            return
+        from database_helper import database_connection
+        try:
+            with database_connection() as conn:
+                # Union with the stored list in the same statement, so concurrent awards aren't lost
+                conn.execute('''
+                    UPDATE user_state SET badges = (
+                        SELECT json_group_array(value) FROM (
+                            SELECT value FROM json_each(user_state.badges)
+                            UNION ALL
+                            SELECT value FROM json_each(?)
+                            WHERE value NOT IN (SELECT value FROM json_each(user_state.badges))
+                        )
+                    ), updated_at = CURRENT_TIMESTAMP
+                    WHERE user_key = ?
+                ''', (json.dumps(badges), user_key))
+                conn.commit()
+        except Exception as e:
+            print(f"Warning: Could not save badges: {e}")
+
+    def reset(self, user_key: str):
+        from database_helper import database_connection
+        with database_connection() as conn:
+            conn.execute("DELETE FROM user_state WHERE user_key = ?", (user_key,))
+            conn.commit()
+
+
+_user_state_store: Optional[UserStateStore] = None
+_user_state_store_lock = threading.Lock()
+
+
+def get_user_state_store() -> UserStateStore:
+    """Process-wide user state store"""
+    global _user_state_store
+    if _user_state_store is None:
+        with _user_state_store_lock:
+            if _user_state_store is None:
+                _user_state_store = UserStateStore()
+    return _user_state_store
+
+
+def set_user_state_store(store: Optional[UserStateStore]):
+    """Replace the process-wide store (e.g. with an in-memory stand-in)"""
+    global _user_state_store
+    with _user_state_store_lock:
+        _user_state_store = store
@@ -0,0 +1,208 @@
+"""
+Write-behind queue for Echo Mind's SQLite writes
+Analysis results and persistent cache entries are handed to a background
+writer instead of being committed inside the request. The writer groups them
+into one transaction per kind, flushing when `batch_size` writes are waiting
+or `flush_interval` seconds after the oldest one arrived.
+
+The queue is bounded. When it is full, a caller waits up to `block_timeout`
+seconds for room and then performs its write synchronously. Under sustained
+overload requests slow down to the database's pace, but no write is dropped.
+Pending writes are drained on shutdown (and at interpreter exit).
+
+Tests can swap in a synchronous writer:
+    set_write_behind(WriteBehindQueue(handlers, enabled=False))
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from metrics import WRITE_BEHIND, span
+
+# Write-behind configuration (override with environment variables)
+WRITE_BEHIND_ENABLED = os.environ.get('ECHO_MIND_WRITE_BEHIND', '1').lower() in ('1', 'true', 'yes')
+WRITE_QUEUE_SIZE = int(os.environ.get('ECHO_MIND_WRITE_QUEUE_SIZE', 1000))
+WRITE_BATCH_SIZE = int(os.environ.get('ECHO_MIND_WRITE_BATCH_SIZE', 100))
+WRITE_FLUSH_INTERVAL = float(os.environ.get('ECHO_MIND_WRITE_FLUSH_INTERVAL', 0.5))
+WRITE_BLOCK_TIMEOUT = float(os.environ.get('ECHO_MIND_WRITE_BLOCK_TIMEOUT', 1.0))
+WRITE_DRAIN_TIMEOUT = float(os.environ.get('ECHO_MIND_WRITE_DRAIN_TIMEOUT', 10))
+
+# Handlers take every pending payload of their kind and write them in one transaction
+BatchHandler = Callable[[List[Any]], Any]
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """Bounded queue of (kind, payload) writes flushed in batches by one background thread"""
+
+    def __init__(self, handlers: Dict[str, BatchHandler], max_size: int = WRITE_QUEUE_SIZE,
+                 batch_size: int = WRITE_BATCH_SIZE, flush_interval: float = WRITE_FLUSH_INTERVAL,
+                 block_timeout: float = WRITE_BLOCK_TIMEOUT, enabled: bool = WRITE_BEHIND_ENABLED):
+        self.handlers = handlers
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self.enabled = enabled
+        self._queue = queue.Queue(maxsize=max(1, max_size))
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, kind: str, payload: Any):
+        """Queue a write; writes synchronously when disabled, closed or still full after block_timeout"""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown write kind: {kind}")
+        if self.enabled and not self._closed and self._ensure_started():
+            try:
+                self._queue.put((kind, payload), timeout=self.block_timeout)
+                WRITE_BEHIND.inc(kind=kind, result="queued")
+                return
+            except queue.Full:
+                print(f"⚠️ Write queue full for {self.block_timeout:.1f}s, writing {kind} in the request")
+        WRITE_BEHIND.inc(kind=kind, result="sync")
+        self._write(kind, [payload])
+
+    def _ensure_started(self) -> bool:
+        if self._thread is None:
+            with self._lock:
+                if self._closed:
+                    return False
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="echo-mind-writer", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+        return True
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                self._queue.task_done()
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    self._queue.task_done()
+                    break
+                batch.append(item)
+            self._flush(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _flush(self, batch):
+        # One transaction per kind, keeping submission order within it
+        by_kind: Dict[str, List[Any]] = OrderedDict()
+        for kind, payload in batch:
+            by_kind.setdefault(kind, []).append(payload)
+        for kind, payloads in by_kind.items():
+            self._write(kind, payloads)
+
+    def _write(self, kind: str, payloads: List[Any]):
+        try:
+            with span("db_write"):
+                self.handlers[kind](payloads)
+            WRITE_BEHIND.inc(len(payloads), kind=kind, result="written")
+        except Exception as e:
+            WRITE_BEHIND.inc(len(payloads), kind=kind, result="failed")
+            print(f"Warning: Could not write {len(payloads)} {kind} record(s): {e}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued write has been committed; False on timeout"""
+        if self._thread is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float = WRITE_DRAIN_TIMEOUT) -> bool:
+        """Stop accepting writes, drain the queue and stop the writer; False if writes were left behind"""
+        with self._lock:
+            if self._closed:
+                return True
+            self._closed = True
+            thread = self._thread
+        if thread is None:
+            return True
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        if thread.is_alive():
+            print(f"⚠️ Write queue not drained after {timeout:.0f}s ({self.pending()} writes pending)")
+            return False
+        # Writes that raced with close() landed behind the stop marker
+        leftovers = []
+        while True:
+            try:
+                leftovers.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            self._queue.task_done()
+        if leftovers:
+            self._flush(leftovers)
+        return True
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'pending': self.pending(),
+            'capacity': self._queue.maxsize,
+            'batch_size': self.batch_size,
+            'flush_interval': self.flush_interval
+        }
+
+
+def _default_handlers() -> Dict[str, BatchHandler]:
+    from claim_cache import write_cache_entries
+    from database_helper import save_analyses_to_database
+    return {
+        'analysis': save_analyses_to_database,
+        'cache': write_cache_entries,
+    }
+
+
+_write_behind: Optional[WriteBehindQueue] = None
+_write_behind_lock = threading.Lock()
+
+
+def get_write_behind() -> WriteBehindQueue:
+    """Process-wide write-behind queue"""
+    global _write_behind
+    if _write_behind is None:
+        with _write_behind_lock:
+            if _write_behind is None:
+                _write_behind = WriteBehindQueue(_default_handlers())
+    return _write_behind
+
+
+def set_write_behind(writer: Optional[WriteBehindQueue]):
+    """Replace the process-wide queue (None builds a fresh default one on next use)"""
+    global _write_behind
+    with _write_behind_lock:
+        _write_behind = writer
+
+
+def shutdown_write_behind(timeout: float = WRITE_DRAIN_TIMEOUT) -> bool:
+    """Drain and stop the process-wide queue if it was ever used"""
+    writer = _write_behind
+    return writer.close(timeout) if writer is not None else True